@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming contributions-page parser against the previous regex path.
+
+Both parsers run over the recorded StatRequest/GitHub/contributions/response.html page. The
+regex reference reproduces the extraction fetch_public_contributions used before the
+streaming parser (DOTALL cell/tooltip pattern, per-cell attribute regex, group then sort).
+"""
+
+import argparse
+import re
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+import bench_support
+
+
+DEFAULT_INPUT = bench_support.STAT_REQUEST_DIR / "GitHub" / "contributions" / "response.html"
+WINDOW = {"from_date": "2025-08-23", "to_date": "2026-08-22"}
+
+
+def parse_with_regex(content, window, parse_tooltip_count):
+    day_pattern = re.compile(
+        r"(<td\b(?=[^>]*ContributionCalendar-day)[^>]*></td>)\s*"
+        r"<tool-tip\b[^>]*>(.*?)</tool-tip>",
+        re.DOTALL,
+    )
+    start_date = date.fromisoformat(window["from_date"])
+    end_date = date.fromisoformat(window["to_date"])
+    grouped_days = defaultdict(list)
+    for match in day_pattern.finditer(content):
+        attrs = dict(re.findall(r'([a-zA-Z0-9_-]+)="([^"]*)"', match.group(1)))
+        raw_date = attrs.get("data-date")
+        if not raw_date:
+            continue
+        day_date = date.fromisoformat(raw_date)
+        if day_date < start_date or day_date > end_date:
+            continue
+        count = parse_tooltip_count(match.group(2))
+        if count is None:
+            count = int(attrs.get("data-level", 0))
+        first_day = day_date - timedelta(days=(day_date.weekday() + 1) % 7)
+        grouped_days[first_day.isoformat()].append({"date": day_date.isoformat(), "contribution_count": count})
+    return [
+        {"first_day": first_day, "days": sorted(grouped_days[first_day], key=lambda day: day["date"])}
+        for first_day in sorted(grouped_days)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    content = args.input.read_text(encoding="utf-8")
+    fetcher = bench_support.load_script("fetch-github-contributions.py")
+    chunk_size = fetcher.PARSE_CHUNK_SIZE
+
+    def streaming(text):
+        chunks = (text[offset:offset + chunk_size] for offset in range(0, len(text), chunk_size))
+        return fetcher.parse_contributions_page(chunks, WINDOW)[0]
+
+    candidates = [
+        ("streaming", streaming),
+        ("regex", lambda text: parse_with_regex(text, WINDOW, fetcher.parse_tooltip_count)),
+    ]
+
+    print(f"{args.input.name}: {len(content)} chars, {args.iterations} iterations")
+    results = {}
+    for name, parse in candidates:
+        weeks, elapsed, peak = bench_support.measure(lambda: parse(content), args.iterations)
+        results[name] = weeks
+        days = sum(len(week["days"]) for week in weeks)
+        total = sum(day["contribution_count"] for week in weeks for day in week["days"])
+        print(f"  {name:<10} {elapsed * 1000:8.2f} ms/parse   peak {peak / 1024:8.1f} KiB   {days} days, {total} contributions")
+
+    if results["streaming"] != results["regex"]:
+        print("Error: parsers disagree on the extracted calendar", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
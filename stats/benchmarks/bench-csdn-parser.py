@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming CSDN profile parser against the previous BeautifulSoup path.
+
+Both parsers run over the recorded StatRequest/CSDN/version2/response.html page. The
+BeautifulSoup reference reproduces the extraction the fetcher used before the streaming
+parser (full tree + find_all + regex fallbacks) and is skipped when bs4 is not installed.
+"""
+
+import argparse
+import importlib.util
+import re
+import sys
+from pathlib import Path
+
+import bench_support
+
+
+DEFAULT_INPUT = bench_support.STAT_REQUEST_DIR / "CSDN" / "version2" / "response.html"
+
+
+def parse_with_beautifulsoup(html_content):
+    from bs4 import BeautifulSoup
+
+    stats = {}
+    soup = BeautifulSoup(html_content, "html.parser")
+    labels = {"总访问量": "views", "原创": "original", "粉丝": "fans"}
+    for num_div in soup.find_all("div", class_="user-profile-statistics-num"):
+        name_div = num_div.find_next_sibling("div", class_="user-profile-statistics-name")
+        if name_div:
+            key = labels.get(name_div.get_text(strip=True))
+            raw = num_div.get_text(strip=True).replace(",", "")
+            if key and raw.isdigit():
+                stats[key] = int(raw)
+    for label, key in labels.items():
+        if key in stats:
+            continue
+        for pattern in (
+            r'class="user-profile-statistics-num"[^>]*>\s*([0-9,]+)\s*</div>\s*'
+            r'<div[^>]*class="user-profile-statistics-name"[^>]*>\s*' + label + r"\s*</div>",
+            r'<div[^>]*class="user-profile-statistics-num"[^>]*>([0-9,]+)</div>\s*'
+            r'<div[^>]*class="user-profile-statistics-name"[^>]*>' + label + r"</div>",
+        ):
+            match = re.search(pattern, html_content)
+            if match:
+                stats[key] = int(match.group(1).replace(",", ""))
+                break
+    for div in soup.find_all("div", class_="aside-common-box-content-text"):
+        span = div.find("span")
+        value = span.get_text(strip=True).replace(",", "") if span else ""
+        if not value.isdigit():
+            continue
+        text = div.get_text(strip=True)
+        if "次点赞" in text and "likes" not in stats:
+            stats["likes"] = int(value)
+        elif "次收藏" in text and "collect" not in stats:
+            stats["collect"] = int(value)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    html_content = args.input.read_text(encoding="utf-8")
+    candidates = [("streaming", bench_support.load_script("fetch-csdn-stats-2.py").parse_csdn_stats)]
+    if importlib.util.find_spec("bs4") is not None:
+        candidates.append(("beautifulsoup", parse_with_beautifulsoup))
+    else:
+        print("bs4 is not installed; skipping the BeautifulSoup reference", file=sys.stderr)
+
+    print(f"{args.input.name}: {len(html_content)} chars, {args.iterations} iterations")
+    results = {}
+    for name, parse in candidates:
+        stats, elapsed, peak = bench_support.measure(lambda: parse(html_content), args.iterations)
+        results[name] = stats
+        print(f"  {name:<14} {elapsed * 1000:8.2f} ms/parse   peak {peak / 1024:8.1f} KiB   {stats}")
+
+    if len({tuple(sorted(stats.items())) for stats in results.values()}) > 1:
+        print("Error: parsers disagree on the extracted stats", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
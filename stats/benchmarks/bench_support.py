@@ -0,0 +1,44 @@
+"""Shared helpers for the stats benchmarks: load hyphenated scripts and time a callable."""
+
+import importlib.util
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+
+STATS_DIR = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = STATS_DIR / "scripts"
+STAT_REQUEST_DIR = STATS_DIR / "StatRequest"
+
+
+def load_script(filename):
+    """Import ``stats/scripts/<filename>`` (hyphenated names included) as a module."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    path = SCRIPTS_DIR / filename
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(func, iterations, repeat=1):
+    """Return ``(result, seconds_per_call, peak_bytes)`` for ``func()``.
+
+    The time is the best of ``repeat`` rounds of ``iterations`` calls, which keeps one noisy
+    round from deciding the figure. Peak memory comes from one extra call under tracemalloc.
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            result = func()
+        elapsed = (time.perf_counter() - started) / iterations
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
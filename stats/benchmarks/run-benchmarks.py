@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Time every parse and render hot path against recorded inputs and compare with stored baselines.
+
+Each benchmark runs over files already in the repository: the StatRequest captures, the
+committed stats/data JSON and stats/config layouts. Per-call time is the best of several
+rounds and peak memory comes from tracemalloc. Results are compared with baselines.json and
+the run fails when any benchmark is slower, or peaks higher, than its baseline by more than
+the threshold. Timings depend on the machine, so refresh the baselines with ``--update`` on
+the machine that runs the comparison.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from xml.etree import ElementTree
+
+import bench_support
+
+
+DEFAULT_BASELINES = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_TIME_THRESHOLD = 1.0
+DEFAULT_MEMORY_THRESHOLD = 0.2
+DEFAULT_REPEAT = 5
+# Each timing round is calibrated to last about this long, so microsecond renders still
+# run enough calls to be measurable.
+ROUND_SECONDS = 0.1
+CONTRIBUTIONS_WINDOW = {"from_date": "2025-08-23", "to_date": "2026-08-22"}
+DATA_DIR = bench_support.STATS_DIR / "data"
+
+
+def graphql_payload(weeks, total):
+    """Shape parsed calendar weeks like the GraphQL contributionCalendar response."""
+    return {
+        "data": {
+            "user": {
+                "contributionsCollection": {
+                    "contributionCalendar": {
+                        "totalContributions": total,
+                        "weeks": [
+                            {
+                                "firstDay": week["first_day"],
+                                "contributionDays": [
+                                    {"date": day["date"], "contributionCount": day["contribution_count"]}
+                                    for day in week["days"]
+                                ],
+                            }
+                            for week in weeks
+                        ],
+                    }
+                }
+            }
+        }
+    }
+
+
+def upstream_stats_card():
+    """The recorded upstream card, with its commits label moved to the current year."""
+    source = (bench_support.STAT_REQUEST_DIR / "GitHub" / "stats-card" / "response.svg").read_text(encoding="utf-8")
+    year = datetime.now(timezone.utc).year
+    return source.replace(">2026 Commits:<", f">{year} Commits:<").encode("utf-8")
+
+
+def read_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def build_benchmarks():
+    """Return ``[(name, callable)]``; loading scripts and inputs happens here, outside the timings."""
+    csdn = bench_support.load_script("fetch-csdn-stats-2.py")
+    contributions = bench_support.load_script("fetch-github-contributions.py")
+    graph = bench_support.load_script("generate-github-contribution-graph.py")
+    stats_card = bench_support.load_script("fetch-github-stats-card.py")
+    cards = bench_support.load_script("generate-svg-cards.py")
+
+    csdn_page = (bench_support.STAT_REQUEST_DIR / "CSDN" / "version2" / "response.html").read_text(encoding="utf-8")
+    contributions_page = (
+        bench_support.STAT_REQUEST_DIR / "GitHub" / "contributions" / "response.html"
+    ).read_text(encoding="utf-8")
+    chunk_size = contributions.PARSE_CHUNK_SIZE
+
+    def parse_contributions():
+        chunks = (
+            contributions_page[offset:offset + chunk_size]
+            for offset in range(0, len(contributions_page), chunk_size)
+        )
+        return contributions.parse_contributions_page(chunks, CONTRIBUTIONS_WINDOW)
+
+    payload = graphql_payload(*parse_contributions())
+    graph_data = graph.load_data(graph.DEFAULT_INPUT)
+    card_source = upstream_stats_card()
+    card_root = ElementTree.fromstring(card_source)
+
+    return [
+        ("csdn-parse", lambda: csdn.parse_csdn_stats(csdn_page)),
+        ("contributions-parse", parse_contributions),
+        (
+            "contributions-graphql-normalize",
+            lambda: contributions.normalize_graphql_payload(payload, "ceilf6", CONTRIBUTIONS_WINDOW),
+        ),
+        ("contribution-graph-main", lambda: graph.render_svg(graph_data, graph.MAIN_LAYOUT)),
+        ("contribution-graph-compact", lambda: graph.render_svg(graph_data, graph.COMPACT_LAYOUT)),
+        ("stats-card-validate", lambda: stats_card.validate_card(card_root)),
+        # validate + replace_right_side_group mutate the tree, so the rewrite starts from bytes.
+        ("stats-card-rewrite", lambda: stats_card.render_card(card_source)),
+        (
+            "stats-card-local",
+            lambda: stats_card.render_local_card(
+                {"stars": 1500, "commits": 12400, "prs": 1200, "issues": 593, "contributed_to": 129}
+            ),
+        ),
+        ("card-blog", lambda stats=read_json(DATA_DIR / "csdn-stats.json"): cards.generate_blog_card(stats)),
+        ("card-vlog", lambda stats=read_json(DATA_DIR / "bilibili-stats.json"): cards.generate_vlog_card(stats)),
+        (
+            "card-huggingface",
+            lambda stats=read_json(DATA_DIR / "huggingface-stats.json"): cards.generate_huggingface_card(stats),
+        ),
+    ]
+
+
+def run(func, repeat):
+    _, once, _ = bench_support.measure(func, 1)
+    iterations = max(1, int(ROUND_SECONDS / once)) if once else 1000
+    _, seconds, peak = bench_support.measure(func, iterations, repeat)
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+def load_baselines(path):
+    try:
+        return read_json(path)
+    except FileNotFoundError:
+        return {"benchmarks": {}}
+
+
+def environment():
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def regressions(name, result, baseline, time_threshold, memory_threshold):
+    found = []
+    if result["seconds"] > baseline["seconds"] * (1 + time_threshold):
+        found.append(f"{name}: {result['seconds'] * 1000:.3f} ms vs baseline {baseline['seconds'] * 1000:.3f} ms")
+    if result["peak_bytes"] > baseline["peak_bytes"] * (1 + memory_threshold):
+        found.append(f"{name}: peak {result['peak_bytes']} B vs baseline {baseline['peak_bytes']} B")
+    return found
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--baselines", type=Path, default=DEFAULT_BASELINES)
+    parser.add_argument("--update", action="store_true", help="Store this run's results as the new baselines.")
+    parser.add_argument("--only", action="append", metavar="NAME", help="Run just this benchmark (repeatable).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timing rounds per benchmark.")
+    parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=DEFAULT_TIME_THRESHOLD,
+        help="Allowed slowdown over the baseline as a fraction (1.0 = twice as slow).",
+    )
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    benchmarks = build_benchmarks()
+    unknown = sorted(set(args.only or ()) - {name for name, _ in benchmarks})
+    if unknown:
+        print(f"Error: unknown benchmarks {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    if args.only:
+        benchmarks = [(name, func) for name, func in benchmarks if name in args.only]
+
+    baselines = load_baselines(args.baselines)
+    if not args.update and baselines.get("environment", environment()) != environment():
+        print(f"Warning: baselines were recorded on {baselines['environment']}, not {environment()}", file=sys.stderr)
+
+    results = {}
+    failures = []
+    for name, func in benchmarks:
+        results[name] = result = run(func, args.repeat)
+        baseline = baselines["benchmarks"].get(name)
+        line = f"  {name:<32} {result['seconds'] * 1000:9.3f} ms   peak {result['peak_bytes'] / 1024:9.1f} KiB"
+        if baseline and not args.update:
+            line += f"   ({result['seconds'] / baseline['seconds'] - 1:+.0%} time, "
+            line += f"{result['peak_bytes'] / max(1, baseline['peak_bytes']) - 1:+.0%} memory)"
+            failures += regressions(name, result, baseline, args.time_threshold, args.memory_threshold)
+        elif not args.update:
+            line += "   (no baseline)"
+        print(line)
+
+    if args.update:
+        baselines["environment"] = environment()
+        baselines["benchmarks"] = {**baselines["benchmarks"], **results}
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baselines for {len(results)} benchmarks written to {args.baselines}")
+        return 0
+    if failures:
+        print("Error: benchmarks regressed past the threshold:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
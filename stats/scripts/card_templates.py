@@ -0,0 +1,101 @@
+"""Compile declarative profile card specs into reusable 340×200 SVG templates.
+
+A spec is a ``title``, ``rows`` of ``(field, label, icon)``, an optional ``value_x`` for the
+value column and an optional ``mark`` drawn on the right (``transform``, ``paths`` or
+ready-made ``markup``, and extra group ``attrs``). ``CardTemplate`` lays the
+whole card out once per spec and theme as a ``str.format`` string with one slot per row,
+so rendering a card only formats the row values and fills the slots.
+"""
+
+from xml.sax.saxutils import escape, quoteattr
+
+
+WIDTH = 340
+HEIGHT = 200
+ROW_HEIGHT = 25.2
+VALUE_X = 100
+
+TOKYO_NIGHT = {
+    "name": "tokyonight",
+    "background": "#1a1b27",
+    "title": "#70a5fd",
+    "text": "#38bdae",
+    "icon": "#bf91f3",
+}
+THEMES = {TOKYO_NIGHT["name"]: TOKYO_NIGHT}
+
+# Octicon path data shared by the row icons and the Vlog mark. Older octicons such as ``repo``
+# draw their holes in the same direction as the outline, so they need ``fill-rule="evenodd"``.
+ICONS = {
+    "people": "M5.5 3.5a2 2 0 1 0 0 4 2 2 0 0 0 0-4zM2 5.5a3.5 3.5 0 1 1 5.898 2.549 5.507 5.507 0 0 1 3.034 4.084.75.75 0 1 1-1.482.235 4.001 4.001 0 0 0-7.9 0 .75.75 0 0 1-1.482-.236A5.507 5.507 0 0 1 3.102 8.05 3.49 3.49 0 0 1 2 5.5zM11 4a.75.75 0 1 0 0 1.5 1.5 1.5 0 0 1 .666 2.844.75.75 0 0 0-.416.672v.352a.75.75 0 0 0 .574.73c1.2.289 2.162 1.2 2.522 2.372a.75.75 0 1 0 1.434-.44 5.01 5.01 0 0 0-2.56-3.012A3 3 0 0 0 11 4z",
+    "star-fill": "M8 .25a.75.75 0 0 1 .673.418l1.882 3.815 4.21.612a.75.75 0 0 1 .416 1.279l-3.046 2.97.719 4.192a.75.75 0 0 1-1.088.791L8 12.347l-3.766 1.98a.75.75 0 0 1-1.088-.79l.72-4.194L.818 6.374a.75.75 0 0 1 .416-1.28l4.21-.611L7.327.668A.75.75 0 0 1 8 .25z",
+    "star": "M8 .25a.75.75 0 01.673.418l1.882 3.815 4.21.612a.75.75 0 01.416 1.279l-3.046 2.97.719 4.192a.75.75 0 01-1.088.791L8 12.347l-3.766 1.98a.75.75 0 01-1.088-.79l.72-4.194L.818 6.374a.75.75 0 01.416-1.28l4.21-.611L7.327.668A.75.75 0 018 .25zm0 2.445L6.615 5.5a.75.75 0 01-.564.41l-3.097.45 2.24 2.184a.75.75 0 01.216.664l-.528 3.084 2.769-1.456a.75.75 0 01.698 0l2.77 1.456-.53-3.084a.75.75 0 01.216-.664l2.24-2.183-3.096-.45a.75.75 0 01-.564-.41L8 2.694v.001z",
+    "eye": "M1.679 7.932c.412-.621 1.242-1.75 2.366-2.717C5.175 4.242 6.527 3.5 8 3.5c1.473 0 2.824.742 3.955 1.715 1.124.967 1.954 2.096 2.366 2.717a.119.119 0 010 .136c-.412.621-1.242 1.75-2.366 2.717C10.825 11.758 9.473 12.5 8 12.5c-1.473 0-2.824-.742-3.955-1.715C2.92 9.818 2.09 8.69 1.679 8.068a.119.119 0 010-.136zM8 2c-1.981 0-3.67.992-4.933 2.078C1.797 5.169.88 6.423.43 7.1a1.619 1.619 0 000 1.798c.45.678 1.367 1.932 2.637 3.024C4.329 13.008 6.019 14 8 14c1.981 0 3.67-.992 4.933-2.078 1.27-1.091 2.187-2.345 2.637-3.023a1.619 1.619 0 000-1.798c-.45-.678-1.367-1.932-2.637-3.023C11.671 2.992 9.981 2 8 2zm0 8a2 2 0 100-4 2 2 0 000 4z",
+    "repo": "M2 2.5A2.5 2.5 0 014.5 0h8.75a.75.75 0 01.75.75v12.5a.75.75 0 01-.75.75h-2.5a.75.75 0 110-1.5h1.75v-2h-8a1 1 0 00-.714 1.7.75.75 0 01-1.072 1.05A2.495 2.495 0 012 11.5v-9zm10.5-1V9h-8c-.356 0-.694.074-1 .208V2.5a1 1 0 011-1h8zM5 12.25v3.25a.25.25 0 00.4.2l1.45-1.087a.25.25 0 01.3 0L8.6 15.7a.25.25 0 00.4-.2v-3.25a.25.25 0 00-.25-.25h-3.5a.25.25 0 00-.25.25z",
+    "device-desktop": "M1.75 1.5A1.75 1.75 0 0 0 0 3.25v7.5c0 .966.784 1.75 1.75 1.75h4.5v1H4.5a.75.75 0 0 0 0 1.5h7a.75.75 0 0 0 0-1.5H9.75v-1h4.5A1.75 1.75 0 0 0 16 10.75v-7.5A1.75 1.75 0 0 0 14.25 1.5H1.75zm0 1.5h12.5a.25.25 0 0 1 .25.25v7.5a.25.25 0 0 1-.25.25H1.75a.25.25 0 0 1-.25-.25v-7.5A.25.25 0 0 1 1.75 3z",
+    "table": "M2 1.25A1.75 1.75 0 0 0 .25 3v10A1.75 1.75 0 0 0 2 14.75h12A1.75 1.75 0 0 0 15.75 13V3A1.75 1.75 0 0 0 14 1.25H2zm0 1.5h12a.25.25 0 0 1 .25.25v2.25h-13V3A.25.25 0 0 1 2 2.75zm-.75 4h13v2.5h-13v-2.5zm0 4h13V13a.25.25 0 0 1-.25.25H2a.25.25 0 0 1-.25-.25v-2.25z",
+    "device-camera-video": "M0 3.75C0 2.784.784 2 1.75 2h12.5c.966 0 1.75.784 1.75 1.75v8.5A1.75 1.75 0 0114.25 14H1.75A1.75 1.75 0 010 12.25v-8.5zm1.75-.25a.25.25 0 00-.25.25v8.5c0 .138.112.25.25.25h12.5a.25.25 0 00.25-.25v-8.5a.25.25 0 00-.25-.25H1.75zM6.5 5.5v5l4-2.5-4-2.5z",
+    "git-commit": "M10.5 7.75a2.5 2.5 0 11-5 0 2.5 2.5 0 015 0zm1.43.75a4.002 4.002 0 01-7.86 0H.75a.75.75 0 110-1.5h3.32a4.001 4.001 0 017.86 0h3.32a.75.75 0 110 1.5h-3.32z",
+    "git-pull-request": "M7.177 3.073L9.573.677A.25.25 0 0110 .854v4.792a.25.25 0 01-.427.177L7.177 3.427a.25.25 0 010-.354zM3.75 2.5a.75.75 0 100 1.5.75.75 0 000-1.5zm-2.25.75a2.25 2.25 0 113 2.122v5.256a2.251 2.251 0 11-1.5 0V5.372A2.25 2.25 0 011.5 3.25zM11 2.5h-1V4h1a1 1 0 011 1v5.628a2.251 2.251 0 101.5 0V5A2.5 2.5 0 0011 2.5zm1 10.25a.75.75 0 111.5 0 .75.75 0 01-1.5 0zM3.75 12a.75.75 0 100 1.5.75.75 0 000-1.5z",
+    "issue-opened": "M8 1.5a6.5 6.5 0 100 13 6.5 6.5 0 000-13zM0 8a8 8 0 1116 0A8 8 0 010 8zm9 3a1 1 0 11-2 0 1 1 0 012 0zm-.25-6.25a.75.75 0 00-1.5 0v3.5a.75.75 0 001.5 0v-3.5z",
+    "squares": "M1.5 1.5h5v5h-5v-5zm1.5 1.5V5h2V3H3zm6.5-1.5h5v5h-5v-5zM11 3v2h2V3h-2zM1.5 9.5h5v5h-5v-5zM3 11v2h2v-2H3zm6.5-1.5h5v5h-5v-5zM11 11v2h2v-2h-2z",
+}
+
+
+def format_number(num):
+    """格式化数字"""
+    if num >= 1000:
+        return f"{num/1000:.1f}k"
+    return f"{num:,}"
+
+
+def _static(markup):
+    return markup.replace("{", "{{").replace("}", "}}")
+
+
+class CardTemplate:
+    def __init__(self, spec, theme=TOKYO_NIGHT):
+        self.spec = spec
+        self.fields = tuple(field for field, _, _ in spec["rows"])
+        text_style = _static(f"fill: {theme['text']}; font-size: 14px;")
+        value_x = spec.get("value_x", VALUE_X)
+        rows = "".join(
+            f'<g transform="translate(0,{round(index * ROW_HEIGHT, 1):g})">'
+            f'<path fill="{theme["icon"]}" fill-rule="evenodd" d="{ICONS[icon]}" />'
+            f'<text x="21" y="14" style="{text_style}">{_static(escape(label))}</text>'
+            f'<text x="{value_x}" y="14" style="{text_style}">{{}}</text></g>'
+            for index, (_, label, icon) in enumerate(spec["rows"])
+        )
+        self._format = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" viewBox="0 0 {WIDTH} {HEIGHT}">\n'
+            "    <style>* {{ font-family: 'Segoe UI', Ubuntu, \"Helvetica Neue\", Sans-Serif }}</style>\n"
+            f'    <rect x="1" y="1" rx="5" ry="5" height="99%" width="{(WIDTH - 2) / WIDTH * 100}%" '
+            f'stroke="{theme["background"]}" stroke-width="1" fill="{theme["background"]}" stroke-opacity="1" />\n'
+            f'    <text x="30" y="40" style="font-size: 18px; fill: {theme["title"]};">{_static(escape(spec["title"]))}</text>\n'
+            f'    <g transform="translate(30,60)">{rows}</g>\n'
+            f"{self._mark(spec.get('mark'), theme)}"
+            "</svg>"
+        ).format
+
+    @staticmethod
+    def _mark(mark, theme):
+        if not mark:
+            return ""
+        attrs = "".join(f" {name}={quoteattr(value)}" for name, value in mark.get("attrs", {}).items())
+        content = mark.get("markup") or "".join(f'<path fill="{theme["icon"]}" d="{d}" />' for d in mark["paths"])
+        return _static(f'    <g transform="{mark["transform"]}"{attrs}>{content}</g>\n')
+
+    def render(self, stats):
+        return self._format(*[format_number(stats.get(field, 0)) for field in self.fields])
+
+
+_compiled = {}
+
+
+def compile_card(spec, theme=TOKYO_NIGHT):
+    """Return the template for ``spec`` in ``theme``, compiling it on first use."""
+    key = (id(spec), theme["name"])
+    template = _compiled.get(key)
+    if template is None or template.spec is not spec:
+        template = _compiled[key] = CardTemplate(spec, theme)
+    return template
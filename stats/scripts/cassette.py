@@ -0,0 +1,157 @@
+"""Record upstream responses into versioned cassettes and replay them without a network.
+
+``http_client`` consults ``active()`` on every request. With ``STATS_HTTP_MODE=record`` each
+response received is appended to the cassette at ``STATS_HTTP_CASSETTE``; with
+``STATS_HTTP_MODE=replay`` requests are answered from it in recorded order and nothing is
+sent, so a fetcher's whole fetch -> parse -> write path runs offline. Requests are matched
+by method, URL (including ``params``, ignoring volatile signing parameters) and a digest of
+the request body, so GraphQL POSTs with different queries or variables replay their own
+responses whatever order they arrive in. Request headers, cookies and ``Set-Cookie`` are
+never written to a cassette.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+FORMAT_VERSION = 2
+MODE_ENV = "STATS_HTTP_MODE"
+PATH_ENV = "STATS_HTTP_CASSETTE"
+MODES = ("record", "replay")
+CASSETTE_DIR = Path(__file__).resolve().parent.parent / "StatRequest" / "cassettes"
+# Bilibili WBI signatures change with the clock; they never identify a different resource.
+VOLATILE_PARAMS = frozenset({"wts", "w_rid"})
+SKIPPED_HEADERS = frozenset({"set-cookie", "content-encoding", "transfer-encoding", "content-length"})
+
+_active = None
+_active_lock = threading.Lock()
+
+
+class CassetteMiss(RuntimeError):
+    """Raised in replay mode for a request the cassette has no (more) responses for."""
+
+
+def body_digest(body):
+    """Short digest of a request body; JSON bodies are canonicalised with their keys sorted."""
+    if body is None:
+        return None
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, bytes):
+        body = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def request_key(method, url, params=None, body=None):
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + [(name, str(value)) for name, value in (params or {}).items()]
+    query = sorted(item for item in query if item[0] not in VOLATILE_PARAMS)
+    key = f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))}"
+    digest = body_digest(body)
+    return key if digest is None else f"{key} body:{digest}"
+
+
+def interaction(key, status, body, headers=None, encoding=None):
+    """Build one cassette entry; ``body`` is stored as text when it is valid UTF-8."""
+    entry = {"request": key, "status": status, "headers": dict(headers or {})}
+    if encoding:
+        entry["encoding"] = encoding
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        entry["body"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        entry["body_base64"] = base64.b64encode(body).decode("ascii")
+    return entry
+
+
+def write_cassette(path, interactions):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "version": FORMAT_VERSION,
+        "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "interactions": interactions,
+    }
+    with NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as handle:
+        json.dump(document, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
+        temporary_path = Path(handle.name)
+    os.replace(temporary_path, path)
+
+
+class Cassette:
+    def __init__(self, path, mode):
+        if mode not in MODES:
+            raise ValueError(f"{MODE_ENV} must be one of {', '.join(MODES)}, not {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.interactions = []
+        self._queues = defaultdict(deque)
+        self._lock = threading.Lock()
+        if mode == "replay":
+            document = json.loads(self.path.read_text(encoding="utf-8"))
+            if document.get("version") != FORMAT_VERSION:
+                raise ValueError(f"{self.path} is cassette format {document.get('version')}, expected {FORMAT_VERSION}")
+            for entry in document["interactions"]:
+                self._queues[entry["request"]].append(entry)
+
+    def replay(self, method, url, params=None, body=None):
+        key = request_key(method, url, params, body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise CassetteMiss(f"{self.path.name} has no recorded response for {key}")
+            # The last response of a key keeps answering, so repeated polling still replays.
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+        return to_response(entry, url)
+
+    def record(self, method, url, params, response, body=None):
+        entry = interaction(
+            request_key(method, url, params, body),
+            response.status_code,
+            response.content,
+            {name: value for name, value in response.headers.items() if name.lower() not in SKIPPED_HEADERS},
+            response.encoding,
+        )
+        with self._lock:
+            self.interactions.append(entry)
+            write_cassette(self.path, self.interactions)
+
+
+def to_response(entry, url):
+    import requests
+
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers = requests.structures.CaseInsensitiveDict(entry.get("headers", {}))
+    response.url = url
+    response.encoding = entry.get("encoding")
+    response._content = (
+        base64.b64decode(entry["body_base64"]) if "body_base64" in entry else entry.get("body", "").encode("utf-8")
+    )
+    response._content_consumed = True
+    return response
+
+
+def active():
+    """Return the cassette selected by the environment, or None for live requests."""
+    global _active
+    mode = os.environ.get(MODE_ENV, "").strip()
+    if not mode:
+        return None
+    path = os.environ.get(PATH_ENV, "").strip()
+    if not path:
+        raise RuntimeError(f"{MODE_ENV}={mode} needs {PATH_ENV} to point at a cassette file")
+    with _active_lock:
+        if _active is None or (_active.path, _active.mode) != (Path(path), mode):
+            _active = Cassette(path, mode)
+        return _active
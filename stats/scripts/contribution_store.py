@@ -0,0 +1,100 @@
+"""Read and write contribution calendar data in the week-grouped or compact columnar layouts.
+
+``weeks`` is the original pretty-printed layout (``weeks[].days[]`` dicts). ``columnar``
+keeps the same header fields but replaces the weeks with a ``start`` date and one count
+per consecutive day. ``binary`` writes that header as JSON and the counts to a little-endian
+``array('I')`` sidecar next to it. Columnar counts are contiguous; a day missing from the
+source data is stored as 0.
+"""
+
+import json
+import sys
+from array import array
+from datetime import date, timedelta
+from pathlib import Path
+
+
+FORMATS = ("weeks", "columnar", "binary")
+HEADER_FIELDS = ("username", "source", "generated_at", "from", "to", "total_contributions")
+COUNTS_SUFFIX = ".counts"
+
+
+def iter_days(data):
+    """Yield ``{"date", "contribution_count"}`` dicts from either layout."""
+    if "counts" in data:
+        start = date.fromisoformat(data["start"])
+        for offset, count in enumerate(data["counts"]):
+            yield {"date": (start + timedelta(days=offset)).isoformat(), "contribution_count": count}
+        return
+    for week in data.get("weeks", []):
+        yield from week.get("days", [])
+
+
+def day_counts(data):
+    """Return ``(start_date, counts)`` with one entry per day; None marks a day missing from ``weeks`` data."""
+    if "counts" in data:
+        return date.fromisoformat(data["start"]), data["counts"]
+
+    by_date = {day["date"]: int(day.get("contribution_count", 0)) for day in iter_days(data)}
+    if not by_date:
+        return None, []
+    ordinals = {date.fromisoformat(day).toordinal(): count for day, count in by_date.items()}
+    first = min(ordinals)
+    counts = [None] * (max(ordinals) - first + 1)
+    for ordinal, count in ordinals.items():
+        counts[ordinal - first] = count
+    return date.fromordinal(first), counts
+
+
+def to_columnar(data):
+    start, counts = day_counts(data)
+    document = {field: data[field] for field in HEADER_FIELDS if field in data}
+    document["start"] = start.isoformat() if start else data.get("from")
+    document["counts"] = [count or 0 for count in counts]
+    return document
+
+
+def counts_path_for(path):
+    return path.with_suffix(COUNTS_SUFFIX)
+
+
+def load(path):
+    """Load ``path`` in any layout; binary sidecar counts come back as an ``array('I')``."""
+    path = Path(path)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    counts_file = data.pop("counts_file", None)
+    if counts_file is not None:
+        counts = array("I")
+        counts.frombytes((path.parent / counts_file).read_bytes())
+        if sys.byteorder != "little":
+            counts.byteswap()
+        data["counts"] = counts
+    return data
+
+
+def stored_format(path):
+    """Return the layout ``path`` was written in, one of ``FORMATS``."""
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    if "counts_file" in document:
+        return "binary"
+    return "columnar" if "counts" in document else "weeks"
+
+
+def write(path, data, fmt="weeks"):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "weeks":
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        return
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown contribution data format: {fmt}")
+
+    document = to_columnar(data)
+    if fmt == "binary":
+        counts = array("I", document.pop("counts"))
+        if sys.byteorder != "little":
+            counts.byteswap()
+        counts_path = counts_path_for(path)
+        counts_path.write_bytes(counts.tobytes())
+        document["counts_file"] = counts_path.name
+    path.write_text(json.dumps(document, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Fetch every profile stats source concurrently and publish each one as soon as it finishes.
+
+Each source is split into independent endpoint calls that share one bounded worker pool,
+so the whole run takes roughly as long as the slowest single request instead of the sum
+of all of them. Results are handed to the existing per-script writers
+(``update_stats_file`` / ``write_atomically``), so file formats and regression checks stay
+exactly as they are when a fetcher runs on its own.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import http_cache
+import snapshot_store
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_WORKERS = 8
+VALIDATORS = http_cache.ValidatorCache()
+SNAPSHOTS = snapshot_store.SnapshotStore()
+
+
+def load_script(filename):
+    """Import a hyphen-named sibling script as a module."""
+    path = SCRIPTS_DIR / filename
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bilibili_endpoints(module):
+    return {
+        "followers": module.fetch_follower_count,
+        # The two login-only calls run in order, so a -101 from the first stops the second.
+        "login": module.fetch_login_stats,
+    }
+
+
+def publish_bilibili(module, results):
+    followers = results["followers"]
+    views, likes, creations = results["login"]
+    if followers is None and views is None and likes is None and creations is None:
+        raise RuntimeError("Failed to fetch any Bilibili data")
+    module.update_stats_file(followers, views, likes, creations)
+
+
+def csdn_endpoints(module):
+    return {"stats": module.fetch_csdn_stats}
+
+
+def publish_csdn(module, results):
+    if not results["stats"]:
+        raise RuntimeError("Failed to fetch CSDN data")
+    module.update_stats_file(results["stats"])
+
+
+def conditional_source(module):
+    conditional = module.DEFAULT_OUTPUT.exists()
+    return lambda: module.load_source(None, module.DEFAULT_URL, VALIDATORS, conditional)
+
+
+def github_endpoints(module):
+    token = os.environ.get("GH_PROFILE_TOKEN", "").strip()
+    if token:
+        # Render the card locally from GraphQL data instead of the upstream card service.
+        return {"stats": lambda: module.fetch_profile_stats(module.DEFAULT_USERNAME, token, SNAPSHOTS)}
+    return {"card": conditional_source(module)}
+
+
+def publish_github(module, results):
+    if "stats" in results:
+        module.write_atomically(module.DEFAULT_OUTPUT, module.render_local_card(results["stats"]))
+        print(f"GitHub stats card rendered locally to {module.DEFAULT_OUTPUT}")
+        return
+    if results["card"] is None:
+        print(f"Upstream stats card not modified; keeping {module.DEFAULT_OUTPUT}")
+        return
+    module.write_atomically(module.DEFAULT_OUTPUT, module.render_card(results["card"], SNAPSHOTS))
+    VALIDATORS.commit(module.DEFAULT_URL)
+    print(f"GitHub stats card written to {module.DEFAULT_OUTPUT}")
+
+
+def huggingface_endpoints(module):
+    return {"overview": conditional_source(module)}
+
+
+def publish_huggingface(module, results):
+    if results["overview"] is None:
+        module.record_unchanged(module.DEFAULT_OUTPUT)
+        print(f"Hugging Face overview not modified; keeping {module.DEFAULT_OUTPUT}")
+        return
+    stats = module.build_stats(results["overview"], SNAPSHOTS)
+    module.write_atomically(module.DEFAULT_OUTPUT, stats)
+    module.record_history(module.DEFAULT_OUTPUT, stats)
+    VALIDATORS.commit(module.DEFAULT_URL)
+    print(f"Hugging Face stats written to {module.DEFAULT_OUTPUT}")
+
+
+SOURCES = {
+    "bilibili": ("fetch-bilibili-stats-1.py", bilibili_endpoints, publish_bilibili),
+    "csdn": ("fetch-csdn-stats-2.py", csdn_endpoints, publish_csdn),
+    "github": ("fetch-github-stats-card.py", github_endpoints, publish_github),
+    "huggingface": ("fetch-huggingface-stats.py", huggingface_endpoints, publish_huggingface),
+}
+
+
+def build_jobs(names):
+    """Load each selected script and return ``(jobs, outcomes)`` for the ones that imported."""
+    jobs = []
+    outcomes = {}
+    for name in names:
+        filename, endpoints, publish = SOURCES[name]
+        try:
+            module = load_script(filename)
+        except Exception as exc:
+            print(f"[{name}] Error: could not load {filename}: {exc}", file=sys.stderr)
+            outcomes[name] = "failure"
+            continue
+        jobs.append(
+            {
+                "name": name,
+                "endpoints": endpoints(module),
+                "publish": lambda results, publish=publish, module=module: publish(module, results),
+            }
+        )
+    return jobs, outcomes
+
+
+def publish_job(job, results):
+    try:
+        job["publish"](results)
+    except SystemExit as exc:
+        # update_stats_file() exits on data regressions; contain that to this source.
+        return "success" if exc.code in (None, 0) else "failure"
+    except Exception as exc:
+        print(f"[{job['name']}] Error: {exc}", file=sys.stderr)
+        return "failure"
+    return "success"
+
+
+def run_sources(jobs, workers=DEFAULT_WORKERS):
+    """Run every endpoint of every job on one bounded pool and publish each job once complete."""
+    outcomes = {}
+    pending = {}
+    results = {}
+    failed = set()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {}
+        for job in jobs:
+            pending[job["name"]] = len(job["endpoints"])
+            results[job["name"]] = {}
+            for endpoint, call in job["endpoints"].items():
+                futures[executor.submit(call)] = (job, endpoint)
+
+        for future in as_completed(futures):
+            job, endpoint = futures[future]
+            name = job["name"]
+            try:
+                results[name][endpoint] = future.result()
+            except Exception:
+                print(f"[{name}] Error in {endpoint}:", file=sys.stderr)
+                traceback.print_exc()
+                failed.add(name)
+            pending[name] -= 1
+            if pending[name] == 0:
+                outcomes[name] = "failure" if name in failed else publish_job(job, results[name])
+
+    return outcomes
+
+
+def write_github_outputs(outcomes):
+    output_path = os.environ.get("GITHUB_OUTPUT")
+    if not output_path:
+        return
+    with open(output_path, "a", encoding="utf-8") as handle:
+        for name, outcome in outcomes.items():
+            handle.write(f"{name}={outcome}\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Fetch all profile stats sources concurrently.")
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=sorted(SOURCES),
+        help="Fetch only this source (repeatable). Defaults to every source.",
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    names = args.only or list(SOURCES)
+
+    started = time.monotonic()
+    jobs, outcomes = build_jobs(names)
+    outcomes.update(run_sources(jobs, workers=args.workers))
+    elapsed = time.monotonic() - started
+
+    ordered = {name: outcomes.get(name, "failure") for name in names}
+    write_github_outputs(ordered)
+    print(f"\nFetched {len(names)} sources in {elapsed:.1f}s:")
+    for name, outcome in ordered.items():
+        print(f"  {name}: {outcome}")
+    return 0 if all(outcome == "success" for outcome in ordered.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
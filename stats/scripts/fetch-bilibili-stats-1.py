@@ -5,13 +5,18 @@ Fetch Bilibili statistics and update data/bilibili-stats.json
 通过配置 Repository secrets -> Cookie
 """
 
+import argparse
 import json
 import os
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import http_client
+import snapshot_store
+import stats_history
+
 # Bilibili User ID
 BILIBILI_UID = "3546602400647622"
 
@@ -37,13 +42,41 @@ HEADERS = {
 BILI_SESSDATA = re.sub(r'\s+', '', os.environ.get('BILI_SESSDATA', ''))
 BILI_BILI_JCT = re.sub(r'\s+', '', os.environ.get('BILI_BILI_JCT', ''))
 
+SNAPSHOTS = snapshot_store.SnapshotStore()
+STATS_FILE = Path(__file__).parent.parent / 'data' / 'bilibili-stats.json'
+
+# 每个主机的请求预算；登录态失效（-101）后同一次运行内的登录接口直接快速失败
+http_client.configure('api.bilibili.com', rate=2, burst=3)
+AUTH_SCOPE = 'bilibili-auth'
+http_client.configure(AUTH_SCOPE, cooldown=3600)
+
+
+def auth_cookies():
+    """构建登录态 Cookie（未配置的项不发送）"""
+    cookies = {}
+    if BILI_SESSDATA:
+        cookies['SESSDATA'] = BILI_SESSDATA
+    if BILI_BILI_JCT:
+        cookies['bili_jct'] = BILI_BILI_JCT
+    return cookies
+
+
+def load_api_json(url, snapshot_name, **kwargs):
+    """请求接口并解析 JSON；响应变化或 code 非 0 时归档原始响应"""
+    response = http_client.get(url, headers=HEADERS, timeout=10, **kwargs)
+    try:
+        data = response.json()
+    except ValueError:
+        SNAPSHOTS.record(snapshot_name, response.content, parse_failed=True)
+        raise
+    SNAPSHOTS.record(snapshot_name, response.content, parse_failed=data.get('code') != 0)
+    return data
+
 
 def fetch_follower_count():
     """获取粉丝数"""
     try:
-        response = requests.get(FOLLOWER_API, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = load_api_json(FOLLOWER_API, 'bilibili-followers')
 
         if data.get('code') == 0:
             return data.get('data', {}).get('follower', 0)
@@ -58,16 +91,9 @@ def fetch_follower_count():
 def fetch_views_and_likes():
     """获取播放数和获赞数（需要登录态）"""
     try:
-        # 构建 Cookie 字符串
-        cookies = {}
-        if BILI_SESSDATA:
-            cookies['SESSDATA'] = BILI_SESSDATA
-        if BILI_BILI_JCT:
-            cookies['bili_jct'] = BILI_BILI_JCT
-
-        response = requests.get(STATS_API, headers=HEADERS, cookies=cookies, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        cookies = auth_cookies()
+
+        data = load_api_json(STATS_API, 'bilibili-upstat', cookies=cookies, scope=AUTH_SCOPE)
 
         if data.get('code') == 0:
             stats_data = data.get('data', {})
@@ -78,8 +104,12 @@ def fetch_views_and_likes():
             error_msg = data.get('message', 'Unknown error')
             print(f"Error fetching views and likes: {error_msg}")
             if data.get('code') == -101:
+                http_client.trip(AUTH_SCOPE, 'login rejected with -101')
                 print("Tip: This API requires login. Please set BILI_SESSDATA and BILI_BILI_JCT environment variables.")
             return None, None
+    except http_client.CircuitOpenError as e:
+        print(f"Skipped views and likes: {e}")
+        return None, None
     except Exception as e:
         print(f"Exception when fetching views and likes: {e}")
         import traceback
@@ -90,16 +120,9 @@ def fetch_views_and_likes():
 def fetch_creations_count():
     """获取作品数量（需要登录态）"""
     try:
-        # 构建 Cookie 字符串
-        cookies = {}
-        if BILI_SESSDATA:
-            cookies['SESSDATA'] = BILI_SESSDATA
-        if BILI_BILI_JCT:
-            cookies['bili_jct'] = BILI_BILI_JCT
-
-        response = requests.get(CREATIONS_API, headers=HEADERS, cookies=cookies, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        cookies = auth_cookies()
+
+        data = load_api_json(CREATIONS_API, 'bilibili-navnum', cookies=cookies, scope=AUTH_SCOPE)
 
         if data.get('code') == 0:
             creations_data = data.get('data', {})
@@ -109,8 +132,12 @@ def fetch_creations_count():
             error_msg = data.get('message', 'Unknown error')
             print(f"Error fetching creations count: {error_msg}")
             if data.get('code') == -101:
+                http_client.trip(AUTH_SCOPE, 'login rejected with -101')
                 print("Tip: This API requires login. Please set BILI_SESSDATA and BILI_BILI_JCT environment variables.")
             return None
+    except http_client.CircuitOpenError as e:
+        print(f"Skipped creations count: {e}")
+        return None
     except Exception as e:
         print(f"Exception when fetching creations count: {e}")
         import traceback
@@ -118,9 +145,15 @@ def fetch_creations_count():
         return None
 
 
-def update_stats_file(followers, views, likes, creations):
+def fetch_login_stats():
+    """依次请求两个登录态接口，前一个返回 -101 时后一个直接快速失败，不再发送"""
+    views, likes = fetch_views_and_likes()
+    creations = fetch_creations_count()
+    return views, likes, creations
+
+
+def update_stats_file(followers, views, likes, creations, stats_file=STATS_FILE):
     """更新stats JSON文件，只有当新值>=旧值时才覆盖"""
-    stats_file = Path(__file__).parent.parent / 'data' / 'bilibili-stats.json'
 
     # Read existing data
     if stats_file.exists():
@@ -200,6 +233,12 @@ def update_stats_file(followers, views, likes, creations):
     with open(stats_file, 'w', encoding='utf-8') as f:
         json.dump(existing_data, f, ensure_ascii=False, indent=2)
 
+    # 每次成功抓取都追加一条历史样本（只记录本次拿到的字段）
+    stats_history.HistoryStore(stats_file.parent / 'history').append(
+        'bilibili',
+        {'followers': followers, 'views': views, 'likes': likes, 'creations': creations},
+    )
+
     print(f"\nStats updated successfully!")
     print(f"followers: {existing_data.get('followers', 'N/A')}")
     print(f"Views: {existing_data.get('views', 'N/A')}")
@@ -209,16 +248,23 @@ def update_stats_file(followers, views, likes, creations):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch Bilibili statistics.")
+    # 配合 STATS_HTTP_MODE=replay 离线回放时写到临时文件，不动正式数据
+    parser.add_argument('--output', type=Path, default=STATS_FILE)
+    args = parser.parse_args()
+
     print("Fetching Bilibili statistics...")
 
-    # Fetch data
-    followers = fetch_follower_count()
-    views, likes = fetch_views_and_likes()
-    creations = fetch_creations_count()
+    # 粉丝数接口无需登录，与两个登录态接口并发；登录态接口之间串行，让 -101 能拦住后一个
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        followers_future = executor.submit(fetch_follower_count)
+        login_future = executor.submit(fetch_login_stats)
+        followers = followers_future.result()
+        views, likes, creations = login_future.result()
 
     # Update file
     if followers is not None or views is not None or likes is not None or creations is not None:
-        update_stats_file(followers, views, likes, creations)
+        update_stats_file(followers, views, likes, creations, args.output)
     else:
         print("Failed to fetch any data. No updates made.")
         exit(1)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Crawl every upload of the Bilibili account with per-video views, likes, coins and favorites.
+
+The upload list is walked page by page through the WBI-signed ``space/wbi/arc/search``
+endpoint, then ``web-interface/archive/stat`` is queried for each video on a bounded
+worker pool. Every request to the API host passes the shared client's per-host token
+bucket and circuit breaker, and anti-crawl rejections (codes -352/-412/-799) are retried
+with its backoff. Listed pages and fetched stats are checkpointed, so an interrupted crawl
+resumes without asking for them again. Cookies come from ``BILI_SESSDATA`` /
+``BILI_BILI_JCT`` exactly as in ``fetch-bilibili-stats-1.py``.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from urllib.parse import urlencode, urlsplit
+
+import http_client
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_API_BASE = "https://api.bilibili.com"
+DEFAULT_OUTPUT = SCRIPTS_DIR.parent / "data" / "bilibili-videos.json"
+DEFAULT_CHECKPOINT = SCRIPTS_DIR.parent / ".cache" / "bilibili-videos-checkpoint.json"
+DEFAULT_WORKERS = 4
+# Requests per second to the API host, and how many may go out back to back.
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 3
+PAGE_SIZE = 30
+CHECKPOINT_EVERY = 10
+# -352 risk control, -412 request intercepted, -799 too many requests.
+THROTTLE_CODES = frozenset({-352, -412, -799})
+MIXIN_KEY_ENC_TAB = (
+    46, 47, 18, 2, 53, 8, 23, 32, 15, 50, 10, 31, 58, 3, 45, 35, 27, 43, 5, 49,
+    33, 9, 42, 19, 29, 28, 14, 39, 12, 38, 41, 13, 37, 48, 7, 16, 24, 55, 40,
+    61, 26, 17, 0, 1, 60, 51, 30, 4, 22, 25, 54, 21, 56, 59, 6, 63, 57, 62, 11,
+    36, 20, 34, 44, 52,
+)
+STAT_FIELDS = {
+    "views": "view",
+    "likes": "like",
+    "coins": "coin",
+    "favorites": "favorite",
+    "danmaku": "danmaku",
+    "replies": "reply",
+    "shares": "share",
+}
+
+
+def load_stats_module():
+    """Import fetch-bilibili-stats-1.py for its UID, headers and cookie handling."""
+    path = SCRIPTS_DIR / "fetch-bilibili-stats-1.py"
+    spec = importlib.util.spec_from_file_location("fetch_bilibili_stats_1", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def mixin_key(img_key, sub_key):
+    raw = img_key + sub_key
+    return "".join(raw[index] for index in MIXIN_KEY_ENC_TAB)[:32]
+
+
+def sign_params(params, key, wts=None):
+    """Return ``params`` with the WBI ``wts`` timestamp and ``w_rid`` signature added."""
+    signed = dict(params, wts=int(time.time()) if wts is None else wts)
+    query = urlencode(
+        sorted((name, "".join(char for char in str(value) if char not in "!'()*")) for name, value in signed.items())
+    )
+    signed["w_rid"] = hashlib.md5((query + key).encode("utf-8")).hexdigest()
+    return signed
+
+
+def check_throttle(response):
+    try:
+        code = response.json().get("code")
+    except ValueError:
+        return
+    if code in THROTTLE_CODES:
+        raise http_client.RetryableError(f"Bilibili throttled {urlsplit(response.url).path} (code {code})")
+
+
+class VideoCrawler:
+    def __init__(self, uid, headers, cookies, api_base=DEFAULT_API_BASE, page_size=PAGE_SIZE):
+        self.uid = uid
+        self.headers = headers
+        self.cookies = cookies
+        self.api_base = api_base.rstrip("/")
+        self.page_size = page_size
+        self.key = None
+
+    def call(self, path, params, require_ok=True):
+        response = http_client.get(
+            self.api_base + path,
+            params=params,
+            headers=self.headers,
+            cookies=self.cookies,
+            timeout=10,
+            check=check_throttle,
+        )
+        data = response.json()
+        if require_ok and data.get("code") != 0:
+            raise RuntimeError(f"{path} returned code {data.get('code')}: {data.get('message')}")
+        return data
+
+    def load_key(self):
+        # nav answers -101 without a login but still carries the WBI key images.
+        images = self.call("/x/web-interface/nav", {}, require_ok=False).get("data", {}).get("wbi_img", {})
+        img_key, sub_key = (Path(urlsplit(images.get(name, "")).path).stem for name in ("img_url", "sub_url"))
+        if not img_key or not sub_key:
+            raise RuntimeError("Bilibili nav response has no WBI keys")
+        self.key = mixin_key(img_key, sub_key)
+
+    def page(self, number):
+        """Return ``(count, videos)`` for one page of the upload list, newest first."""
+        params = {
+            "mid": self.uid,
+            "ps": self.page_size,
+            "pn": number,
+            "order": "pubdate",
+            "platform": "web",
+            "web_location": "1550101",
+        }
+        data = self.call("/x/space/wbi/arc/search", sign_params(params, self.key))["data"]
+        videos = [
+            {
+                "bvid": item["bvid"],
+                "aid": item.get("aid"),
+                "title": item.get("title", ""),
+                "created": datetime.fromtimestamp(item.get("created", 0), timezone.utc).strftime("%Y-%m-%d"),
+                "length": item.get("length", ""),
+            }
+            for item in data.get("list", {}).get("vlist") or []
+        ]
+        return data.get("page", {}).get("count", 0), videos
+
+    def stats(self, bvid):
+        data = self.call("/x/web-interface/archive/stat", {"bvid": bvid})["data"]
+        return {field: int(data.get(source, 0)) for field, source in STAT_FIELDS.items()}
+
+
+def load_checkpoint(path, uid):
+    try:
+        checkpoint = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        checkpoint = {}
+    if checkpoint.get("uid") != uid:
+        checkpoint = {}
+    return {
+        "uid": uid,
+        "listing": checkpoint.get("listing"),
+        "pages": checkpoint.get("pages", {}),
+        "stats": checkpoint.get("stats", {}),
+    }
+
+
+def write_json(path, data, **kwargs):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as handle:
+        json.dump(data, handle, ensure_ascii=False, **kwargs)
+        handle.write("\n")
+        temporary_path = Path(handle.name)
+    os.replace(temporary_path, path)
+
+
+def crawl(crawler, checkpoint_path, workers=DEFAULT_WORKERS):
+    """Return every upload with its stats, or raise after checkpointing what was fetched."""
+    checkpoint = load_checkpoint(checkpoint_path, crawler.uid)
+    completed = [0]
+
+    # Results are collected on this thread, so the checkpoint is never written concurrently.
+    def save(force=False):
+        completed[0] += 1
+        if force or completed[0] % CHECKPOINT_EVERY == 0:
+            write_json(checkpoint_path, checkpoint)
+
+    crawler.load_key()
+    count, first_page = crawler.page(1)
+    listing = [count, crawler.page_size]
+    if checkpoint["listing"] != listing:
+        # A new or removed upload shifts every page, so only per-video stats stay valid.
+        checkpoint["listing"], checkpoint["pages"] = listing, {}
+    checkpoint["pages"]["1"] = first_page
+    pages = max(1, math.ceil(count / crawler.page_size))
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(crawler.page, number): number
+            for number in range(2, pages + 1)
+            if str(number) not in checkpoint["pages"]
+        }
+        for future in as_completed(futures):
+            try:
+                checkpoint["pages"][str(futures[future])] = future.result()[1]
+                save()
+            except Exception as exc:
+                errors.append(f"page {futures[future]}: {exc}")
+
+        videos = [video for number in range(1, pages + 1) for video in checkpoint["pages"].get(str(number), [])]
+        pending = [video["bvid"] for video in videos if video["bvid"] not in checkpoint["stats"]]
+        print(f"Listed {len(videos)} of {count} uploads; fetching stats for {len(pending)}")
+        futures = {executor.submit(crawler.stats, bvid): bvid for bvid in pending}
+        for future in as_completed(futures):
+            try:
+                checkpoint["stats"][futures[future]] = future.result()
+                save()
+            except Exception as exc:
+                errors.append(f"{futures[future]}: {exc}")
+
+    if errors:
+        save(force=True)
+        raise RuntimeError(f"{len(errors)} requests failed; re-run to resume from {checkpoint_path}: " + "; ".join(errors[:5]))
+
+    seen = set()
+    result = []
+    for video in videos:
+        if video["bvid"] not in seen:
+            seen.add(video["bvid"])
+            result.append({**video, **checkpoint["stats"][video["bvid"]]})
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Crawl per-video Bilibili statistics.")
+    parser.add_argument("--uid", help="Uploader mid. Defaults to the account in fetch-bilibili-stats-1.py.")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Requests per second to the API host.")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--api-base", default=DEFAULT_API_BASE)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    stats_module = load_stats_module()
+    uid = args.uid or stats_module.BILIBILI_UID
+    http_client.configure(urlsplit(args.api_base).netloc, rate=args.rate, burst=args.burst)
+    crawler = VideoCrawler(
+        uid,
+        stats_module.HEADERS,
+        stats_module.auth_cookies(),
+        api_base=args.api_base,
+        page_size=args.page_size,
+    )
+
+    started = time.monotonic()
+    try:
+        videos = crawl(crawler, args.checkpoint, workers=args.workers)
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    totals = {field: sum(video[field] for video in videos) for field in STAT_FIELDS}
+    write_json(
+        args.output,
+        {
+            "uid": uid,
+            "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "count": len(videos),
+            "totals": totals,
+            "videos": videos,
+        },
+        indent=2,
+    )
+    args.checkpoint.unlink(missing_ok=True)
+    print(f"Bilibili stats for {len(videos)} videos written to {args.output} in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
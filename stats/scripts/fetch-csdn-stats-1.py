@@ -5,10 +5,12 @@ Fetch CSDN statistics and update data/csdn-stats.json
 
 import json
 import re
-import requests
 from datetime import datetime
 from pathlib import Path
 
+import http_client
+import snapshot_store
+
 # CSDN User ID
 CSDN_USERNAME = "2301_78856868"
 
@@ -22,12 +24,13 @@ HEADERS = {
     'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
 }
 
+SNAPSHOTS = snapshot_store.SnapshotStore()
+
 
 def fetch_csdn_stats():
     """获取CSDN统计数据"""
     try:
-        response = requests.get(CSDN_BLOG_URL, headers=HEADERS, timeout=15)
-        response.raise_for_status()
+        response = http_client.get(CSDN_BLOG_URL, headers=HEADERS, timeout=15)
         html_content = response.text
 
         # 使用正则表达式提取数据
@@ -58,6 +61,8 @@ def fetch_csdn_stats():
         if fans_match:
             stats['fans'] = int(fans_match.group(1))
 
+        SNAPSHOTS.record('csdn-v1', html_content, parse_failed=not stats)
+
         print(f"Successfully fetched CSDN stats:")
         print(f"Original: {stats.get('original', 'N/A')}")
         print(f"Likes: {stats.get('likes', 'N/A')}")
@@ -5,14 +5,18 @@ Fetch CSDN statistics (v2) and update data/csdn-stats.json
 使用 cloudscraper 绕过 Cloudflare 保护
 """
 
+import argparse
 import json
-import re
+import os
 import time
 from datetime import datetime
+from html.parser import HTMLParser
 from pathlib import Path
+from tempfile import NamedTemporaryFile
 
-import cloudscraper
-from bs4 import BeautifulSoup
+import http_client
+import snapshot_store
+import stats_history
 
 # CSDN User ID
 CSDN_USERNAME = "2301_78856868"
@@ -20,13 +24,200 @@ CSDN_USERNAME = "2301_78856868"
 # CSDN Blog URL
 CSDN_BLOG_URL = f"https://blog.csdn.net/{CSDN_USERNAME}"
 
+# user-profile-statistics-name 标签 -> 字段
+PROFILE_LABELS = {
+    '总访问量': 'views',
+    '原创': 'original',
+    '粉丝': 'fans',
+}
+# aside-common-box-content-text 文本后缀 -> 字段
+ACHIEVEMENT_SUFFIXES = {
+    '次点赞': 'likes',
+    '次收藏': 'collect',
+}
+STAT_FIELDS = frozenset(PROFILE_LABELS.values()) | frozenset(ACHIEVEMENT_SUFFIXES.values())
+PARSE_CHUNK_SIZE = 16 * 1024
+
+SNAPSHOTS = snapshot_store.SnapshotStore()
+STATS_FILE = Path(__file__).parent.parent / 'data' / 'csdn-stats.json'
+# CSDN 只抓一个页面，限速主要防止批量运行时触发 Cloudflare
+http_client.configure('blog.csdn.net', rate=0.5, burst=1)
+
+# Cloudflare clearance cookie + 指纹 UA 跨运行持久化，有效期内复用即可跳过挑战
+SESSION_STATE_FILE = Path(__file__).resolve().parent.parent / '.cache' / 'csdn-session.json'
+SESSION_MAX_AGE = 7 * 24 * 3600  # seconds
+CLEARANCE_COOKIE = 'cf_clearance'
+
+
+def parse_count(text):
+    raw = text.strip().replace(',', '')
+    return int(raw) if raw.isdigit() else None
+
+
+class CsdnStatsParser(HTMLParser):
+    """单遍事件解析：只跟踪两类 class，五个字段齐全后即可停止喂数据
+
+    页面结构：
+      <div class="user-profile-statistics-num">数值</div>
+      <div class="user-profile-statistics-name">标签</div>
+      <div class="aside-common-box-content-text">获得<span>N</span>次点赞</div>
+    属性顺序、data-v-* 等额外属性不影响匹配，新旧两种 HTML 格式都能覆盖。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stats = {}
+        self.capture = None  # 'num' / 'name' / 'achievement'
+        self.div_depth = 0
+        self.text = []
+        self.span_text = []
+        self.in_span = False
+        self.pending_num = None
+
+    @property
+    def complete(self):
+        return STAT_FIELDS <= self.stats.keys()
+
+    def handle_starttag(self, tag, attrs):
+        if self.capture is not None:
+            if tag == 'div':
+                self.div_depth += 1
+            elif tag == 'span' and self.capture == 'achievement':
+                self.in_span = True
+            return
+        if tag != 'div':
+            return
+        classes = (dict(attrs).get('class') or '').split()
+        if 'user-profile-statistics-num' in classes:
+            self.capture = 'num'
+        elif 'user-profile-statistics-name' in classes:
+            self.capture = 'name'
+        elif 'aside-common-box-content-text' in classes:
+            self.capture = 'achievement'
+        else:
+            return
+        self.div_depth = 1
+        self.text = []
+        self.span_text = []
+        self.in_span = False
+
+    def handle_data(self, data):
+        if self.capture is not None:
+            self.text.append(data)
+            if self.in_span:
+                self.span_text.append(data)
+
+    def handle_endtag(self, tag):
+        if self.capture is None:
+            return
+        if tag == 'span':
+            self.in_span = False
+            return
+        if tag != 'div':
+            return
+        self.div_depth -= 1
+        if self.div_depth == 0:
+            self.finish_capture()
+
+    def finish_capture(self):
+        text = ''.join(self.text).strip()
+        capture, self.capture = self.capture, None
+        if capture == 'num':
+            self.pending_num = parse_count(text)
+        elif capture == 'name':
+            key = PROFILE_LABELS.get(text)
+            if key and key not in self.stats and self.pending_num is not None:
+                self.stats[key] = self.pending_num
+            self.pending_num = None
+        else:
+            value = parse_count(''.join(self.span_text))
+            if value is None:
+                return
+            for suffix, key in ACHIEVEMENT_SUFFIXES.items():
+                if suffix in text and key not in self.stats:
+                    self.stats[key] = value
+                    break
+
+
+def parse_csdn_stats(html_content, chunk_size=PARSE_CHUNK_SIZE):
+    """逐块喂给 CsdnStatsParser，五个字段都拿到后提前结束"""
+    parser = CsdnStatsParser()
+    for offset in range(0, len(html_content), chunk_size):
+        parser.feed(html_content[offset:offset + chunk_size])
+        if parser.complete:
+            break
+    return parser.stats
+
+
+def check_page(response):
+    """拦截页 / 不完整页交给 http_client 按退避策略重试"""
+    html_content = response.text
+    # 检查是否被 Cloudflare 拦截
+    if 'Just a moment' in html_content or 'Checking your browser' in html_content:
+        raise http_client.RetryableError("Cloudflare challenge detected")
+    # 检查页面内容是否完整（关键 div 必须存在）
+    if 'user-profile-statistics-num' not in html_content:
+        raise http_client.RetryableError(
+            f"Incomplete page ({len(html_content)} bytes, missing key elements)")
+
+
+def load_session_state(session, path=SESSION_STATE_FILE, now=None):
+    """把上次保存的 UA 与 cookie 装回 session；clearance 已过期或状态太旧则返回 False"""
+    now = now or time.time()
+    try:
+        state = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return False
+
+    if now - state.get('saved_at', 0) > SESSION_MAX_AGE:
+        return False
+    stored = state.get('cookies', [])
+    cookies = [cookie for cookie in stored if cookie.get('expires') is None or cookie['expires'] > now]
+    had_clearance = any(cookie['name'] == CLEARANCE_COOKIE for cookie in stored)
+    has_clearance = any(cookie['name'] == CLEARANCE_COOKIE for cookie in cookies)
+    if (had_clearance and not has_clearance) or not state.get('user_agent'):
+        return False
+
+    # clearance 与 UA 绑定，必须一起恢复
+    session.headers['User-Agent'] = state['user_agent']
+    for cookie in cookies:
+        session.cookies.set(
+            cookie['name'], cookie['value'],
+            domain=cookie.get('domain', ''), path=cookie.get('path', '/'),
+            expires=cookie.get('expires'), secure=cookie.get('secure', False))
+    return True
+
+
+def save_session_state(session, path=SESSION_STATE_FILE, now=None):
+    """成功抓取后保存 UA 与 cookie（含 cf_clearance），供下次运行复用"""
+    path = Path(path)
+    state = {
+        'saved_at': now or time.time(),
+        'user_agent': session.headers.get('User-Agent'),
+        'cookies': [
+            {
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'expires': cookie.expires,
+                'secure': bool(cookie.secure),
+            }
+            for cookie in session.cookies
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile('w', encoding='utf-8', dir=path.parent, delete=False) as handle:
+        json.dump(state, handle, ensure_ascii=False, indent=2)
+        temporary_path = Path(handle.name)
+    os.replace(temporary_path, path)
+
 
 def fetch_csdn_stats():
     """获取CSDN统计数据（包含访问量）- 使用 cloudscraper 绕过 Cloudflare"""
-    max_retries = 3
-    retry_delay = 5  # seconds
+    import cloudscraper
 
-    # 创建 cloudscraper 实例
+    # 创建 cloudscraper 实例，重试时复用同一实例与连接池（不再重建、重新过挑战）
     scraper = cloudscraper.create_scraper(
         browser={
             'browser': 'chrome',
@@ -34,159 +225,33 @@ def fetch_csdn_stats():
             'desktop': True
         }
     )
+    if load_session_state(scraper):
+        print("Reusing saved Cloudflare clearance session")
 
-    for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                print(f"Retry attempt {attempt + 1}/{max_retries} after {retry_delay}s delay...")
-                time.sleep(retry_delay)
-                # 每次重试创建新的 scraper 实例
-                scraper = cloudscraper.create_scraper(
-                    browser={
-                        'browser': 'chrome',
-                        'platform': 'darwin',
-                        'desktop': True
-                    }
-                )
-
-            print(f"Fetching {CSDN_BLOG_URL} ...")
-            response = scraper.get(CSDN_BLOG_URL, timeout=30)
-            response.raise_for_status()
-            html_content = response.text
-
-            # 检查是否被 Cloudflare 拦截
-            if 'Just a moment' in html_content or 'Checking your browser' in html_content:
-                print(f"Cloudflare challenge detected on attempt {attempt + 1}")
-                if attempt == max_retries - 1:
-                    print("Failed to bypass Cloudflare protection.")
-                    return None
-                continue
-
-            # 检查页面内容是否完整（关键 div 必须存在）
-            if 'user-profile-statistics-num' not in html_content:
-                print(f"Incomplete page on attempt {attempt + 1} ({len(html_content)} bytes, missing key elements)")
-                if attempt == max_retries - 1:
-                    print("All retry attempts returned incomplete page.")
-                    return None
-                continue
-
-            # 如果成功获取，跳出重试循环
-            break
-
-        except Exception as e:
-            print(f"Error on attempt {attempt + 1}: {e}")
-            if attempt == max_retries - 1:
-                print("All retry attempts failed.")
-                return None
-            continue
-    else:
+    try:
+        print(f"Fetching {CSDN_BLOG_URL} ...")
+        response = http_client.get(
+            CSDN_BLOG_URL, session=scraper, timeout=30, attempts=3, budget=120, check=check_page,
+            retry_on=(cloudscraper.exceptions.CloudflareException,))
+        html_content = response.text
+    except Exception as e:
+        print(f"All retry attempts failed: {e}")
         return None
 
     try:
-        # Debug: Save HTML content to file for inspection
-        debug_file = Path(__file__).parent.parent / 'StatRequest' / 'CSDN' / 'version2' / 'debug_csdn_page.html'
-        debug_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(debug_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"Debug: HTML content saved to {debug_file}")
-        print(f"Debug: HTML length = {len(html_content)} bytes")
+        save_session_state(scraper)
+    except OSError as e:
+        print(f"Warning: could not save Cloudflare session: {e}")
 
-        stats = {}
-        soup = BeautifulSoup(html_content, 'html.parser')
+    try:
+        print(f"Debug: HTML length = {len(html_content)} bytes")
 
-        # ── 方式1: BeautifulSoup 解析 user-profile-statistics-num/name ──
-        # 页面结构：<div class="user-profile-statistics-num">数值</div>
-        #           <div class="user-profile-statistics-name">标签</div>
-        label_map = {
-            '总访问量': 'views',
-            '原创': 'original',
-            '粉丝': 'fans',
-        }
-        num_divs = soup.find_all('div', class_='user-profile-statistics-num')
-        print(f"Debug: Found {len(num_divs)} user-profile-statistics-num divs")
-        for num_div in num_divs:
-            # 找紧跟的 sibling
-            name_div = num_div.find_next_sibling('div', class_='user-profile-statistics-name')
-            if name_div:
-                label = name_div.get_text(strip=True)
-                key = label_map.get(label)
-                if key:
-                    raw = num_div.get_text(strip=True).replace(',', '')
-                    if raw.isdigit():
-                        stats[key] = int(raw)
-                        print(f"Debug: Parsed {key} = {stats[key]} (label='{label}')")
-
-        # ── 方式2: 正则兜底（兼容新旧两种 HTML 格式） ──
-        # 新格式：class 属性在前，后跟 data-v-* 等属性
-        # 旧格式：<div class="user-profile-statistics-num">数字</div> 无额外属性
-        _regex_patterns = {
-            'views':    (r'总访问量', 'views'),
-            'original': (r'原创',    'original'),
-            'fans':     (r'粉丝',    'fans'),
-        }
-        for field, (label, key) in _regex_patterns.items():
-            if key in stats:
-                continue
-            # 宽松写法：兼容 class 前后有其他属性、数字前后有空白
-            m = re.search(
-                r'class="user-profile-statistics-num"[^>]*>\s*([0-9,]+)\s*</div>\s*'
-                r'<div[^>]*class="user-profile-statistics-name"[^>]*>\s*' + label + r'\s*</div>',
-                html_content, re.UNICODE)
-            if m:
-                stats[key] = int(m.group(1).replace(',', ''))
-                print(f"Debug: {key} via regex (new-format) = {stats[key]}")
-                continue
-            # 原始写法（旧格式保留）：<div[^>]*class=...>数字</div>
-            m = re.search(
-                r'<div[^>]*class="user-profile-statistics-num"[^>]*>([0-9,]+)</div>\s*'
-                r'<div[^>]*class="user-profile-statistics-name"[^>]*>' + label + r'</div>',
-                html_content, re.UNICODE)
-            if m:
-                stats[key] = int(m.group(1).replace(',', ''))
-                print(f"Debug: {key} via regex (old-format) = {stats[key]}")
-            else:
-                print(f"Debug: {key} all regex patterns failed")
-
-        # ── 点赞 / 收藏：个人成就区段文本 ──
-        # 结构: <div class="aside-common-box-content-text">获得<span>N</span>次点赞</div>
-        achievement_texts = soup.find_all('div', class_='aside-common-box-content-text')
-        print(f"Debug: Found {len(achievement_texts)} aside-common-box-content-text divs")
-        for div in achievement_texts:
-            text = div.get_text(strip=True)
-            span = div.find('span')
-            if not span:
-                continue
-            val_str = span.get_text(strip=True).replace(',', '')
-            if not val_str.isdigit():
-                continue
-            val = int(val_str)
-            if '次点赞' in text and 'likes' not in stats:
-                stats['likes'] = val
-                print(f"Debug: Parsed likes = {val}")
-            elif '次收藏' in text and 'collect' not in stats:
-                stats['collect'] = val
-                print(f"Debug: Parsed collect = {val}")
-
-        # 正则兜底 likes/collect（新旧格式一致，均为原始正则）
-        if 'likes' not in stats:
-            m = re.search(r'获得<span>([0-9,]+)</span>次点赞', html_content, re.UNICODE)
-            if not m:
-                # 兼容 span 含其他属性的情况
-                m = re.search(r'获得<span[^>]*>([0-9,]+)</span>次点赞', html_content, re.UNICODE)
-            if m:
-                stats['likes'] = int(m.group(1).replace(',', ''))
-                print(f"Debug: likes via regex fallback = {stats['likes']}")
-            else:
-                print("Debug: likes all regex patterns failed")
-        if 'collect' not in stats:
-            m = re.search(r'获得<span>([0-9,]+)</span>次收藏', html_content, re.UNICODE)
-            if not m:
-                m = re.search(r'获得<span[^>]*>([0-9,]+)</span>次收藏', html_content, re.UNICODE)
-            if m:
-                stats['collect'] = int(m.group(1).replace(',', ''))
-                print(f"Debug: collect via regex fallback = {stats['collect']}")
-            else:
-                print("Debug: collect all regex patterns failed")
+        stats = parse_csdn_stats(html_content)
+        missing = sorted(STAT_FIELDS - stats.keys())
+        if missing:
+            print(f"Debug: fields not found in page: {', '.join(missing)}")
+        # 页面有变化或解析不全时才归档原始页面（压缩、按内容去重）
+        SNAPSHOTS.record('csdn', html_content, parse_failed=bool(missing))
 
         print(f"Successfully fetched CSDN stats:")
         print(f"Views: {stats.get('views', 'N/A')}")
@@ -201,17 +266,16 @@ def fetch_csdn_stats():
         print(f"Exception when fetching CSDN stats: {e}")
         import traceback
         traceback.print_exc()
+        SNAPSHOTS.record('csdn', html_content, parse_failed=True)
         return None
 
 
-def update_stats_file(stats):
+def update_stats_file(stats, stats_file=STATS_FILE):
     """更新stats JSON文件，只有当新值>=旧值时才覆盖"""
     if not stats:
         print("No stats to update")
         return False
 
-    stats_file = Path(__file__).parent.parent / 'data' / 'csdn-stats.json'
-
     # Read existing data
     if stats_file.exists():
         with open(stats_file, 'r', encoding='utf-8') as f:
@@ -261,6 +325,9 @@ def update_stats_file(stats):
     with open(stats_file, 'w', encoding='utf-8') as f:
         json.dump(existing_data, f, ensure_ascii=False, indent=2)
 
+    # 文件写入成功才算一次成功抓取，即使数值没变也记一条历史样本
+    stats_history.HistoryStore(stats_file.parent / 'history').append('csdn', stats)
+
     print(f"\nStats file updated successfully!")
     print(f"Updated fields: {', '.join(updated_fields)}")
     print(f"Last Updated: {existing_data['last_updated']}")
@@ -268,6 +335,11 @@ def update_stats_file(stats):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch CSDN statistics.")
+    # 配合 STATS_HTTP_MODE=replay 离线回放时写到临时文件，不动正式数据
+    parser.add_argument('--output', type=Path, default=STATS_FILE)
+    args = parser.parse_args()
+
     print("Fetching CSDN statistics (v2 with views)...")
 
     # Fetch data
@@ -275,7 +347,7 @@ def main():
 
     # Update file
     if stats and len(stats) > 0:
-        update_stats_file(stats)
+        update_stats_file(stats, args.output)
     else:
         print("Failed to fetch data. No updates made.")
         exit(1)
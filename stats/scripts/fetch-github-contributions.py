@@ -4,20 +4,32 @@ Fetch GitHub contribution calendar data for the profile README.
 """
 
 import argparse
+import codecs
 import html
 import json
 import os
 import re
 import sys
-from collections import defaultdict
-from datetime import datetime, time, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, time, timedelta, timezone
 from pathlib import Path
-from urllib.request import Request, urlopen
+from tempfile import NamedTemporaryFile
+
+import contribution_store
+import github_graphql
+import http_client
+import snapshot_store
 
 
 DEFAULT_USERNAME = "ceilf6"
 DEFAULT_OUTPUT = Path(__file__).parent.parent / "data" / "github-contributions.json"
-GRAPHQL_ENDPOINT = "https://api.github.com/graphql"
+DEFAULT_HISTORY_OUTPUT = Path(__file__).parent.parent / "data" / "github-contributions-history.json"
+BACKFILL_CHECKPOINT_DIR = Path(__file__).resolve().parent.parent / ".cache" / "contributions-backfill"
+DEFAULT_BACKFILL_WORKERS = 4
+# Days re-fetched before the last stored day in incremental mode, to pick up late contributions.
+DEFAULT_OVERLAP_DAYS = 2
+PARSE_CHUNK_SIZE = 16 * 1024
+SNAPSHOTS = snapshot_store.SnapshotStore()
 
 
 def parse_utc_datetime(value):
@@ -57,53 +69,32 @@ def determine_window(now=None, days=365, guard_minutes=30):
     }
 
 
+def post_graphql(token, query, variables):
+    return github_graphql.post_graphql(token, query, variables, SNAPSHOTS, "github-contributions-graphql")
+
+
 def graphql_query(username, token, window):
-    try:
-        import requests
-    except ImportError as exc:
-        raise RuntimeError("Missing Python dependency: requests") from exc
+    profile = github_graphql.fetch_profiles(
+        [username], token, ("calendar",), window=window, snapshots=SNAPSHOTS, snapshot_name="github-contributions-graphql"
+    )[username]
+    if profile is None:
+        raise RuntimeError(f"GitHub GraphQL response has no user {username}")
+    return {"data": {"user": {"contributionsCollection": {"contributionCalendar": profile["calendar"]}}}}
+
 
+def account_created_date(username, token):
     query = """
-    query ProfileContributionCalendar($login: String!, $from: DateTime!, $to: DateTime!) {
+    query ProfileCreatedAt($login: String!) {
       user(login: $login) {
-        contributionsCollection(from: $from, to: $to) {
-          contributionCalendar {
-            totalContributions
-            weeks {
-              firstDay
-              contributionDays {
-                date
-                contributionCount
-              }
-            }
-          }
-        }
+        createdAt
       }
     }
     """
-    response = requests.post(
-        GRAPHQL_ENDPOINT,
-        json={
-            "query": query,
-            "variables": {
-                "login": username,
-                "from": window["from_datetime"],
-                "to": window["to_datetime"],
-            },
-        },
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.github+json",
-            "User-Agent": "ceilf6-readme-contribution-graph",
-        },
-        timeout=20,
-    )
-    response.raise_for_status()
-    payload = response.json()
-    if payload.get("errors"):
-        messages = "; ".join(error.get("message", "unknown error") for error in payload["errors"])
-        raise RuntimeError(f"GitHub GraphQL API returned errors: {messages}")
-    return payload
+    payload = post_graphql(token, query, {"login": username})
+    try:
+        return parse_utc_datetime(payload["data"]["user"]["createdAt"]).date()
+    except (TypeError, KeyError) as exc:
+        raise RuntimeError(f"GitHub GraphQL response has no createdAt for {username}") from exc
 
 
 def normalize_graphql_payload(payload, username, window):
@@ -135,74 +126,137 @@ def normalize_graphql_payload(payload, username, window):
     }
 
 
-def parse_attrs(tag):
-    return dict(re.findall(r'([a-zA-Z0-9_-]+)="([^"]*)"', tag))
+TOOLTIP_COUNT_PATTERN = re.compile(r"([\d,]+)\s+contributions?")
+YEARLY_TOTAL_PATTERN = re.compile(r"([\d,]+)\s+contributions\s+in the last year")
 
 
 def parse_tooltip_count(text):
-    clean = html.unescape(re.sub(r"\s+", " ", text)).strip()
+    clean = html.unescape(" ".join(text.split()))
     if clean.startswith("No contribution"):
         return 0
-    match = re.search(r"([\d,]+)\s+contributions?", clean)
+    match = TOOLTIP_COUNT_PATTERN.search(clean)
     if not match:
         return None
     return int(match.group(1).replace(",", ""))
 
 
+class ContributionCalendarParser:
+    """Chunked tokenizer that streams the public contributions page into a week x weekday grid.
+
+    Only ``<td>`` cells and ``tool-tip`` labels are matched, and a tag cut off at the end of a
+    chunk is carried over to the next ``feed``. The table is laid out one row per weekday, so
+    each cell is placed by its date instead of being collected and sorted afterwards.
+    Tooltips are linked to cells through ``for``/``id`` wherever they appear, and
+    ``data-level`` is kept when a cell has no readable tooltip.
+    """
+
+    TOKEN_PATTERN = re.compile(r'<td\b([^>]*)>|<tool-tip\b[^>]*?\bfor="([^"]*)"[^>]*>([^<]*)</tool-tip>')
+    DATE_PATTERN = re.compile(r'data-date="([^"]*)"')
+    LEVEL_PATTERN = re.compile(r'data-level="([^"]*)"')
+    ID_PATTERN = re.compile(r'\sid="([^"]*)"')
+
+    def __init__(self, window):
+        self.start = date.fromisoformat(window["from_date"])
+        self.end = date.fromisoformat(window["to_date"])
+        self.first_sunday = self.start.toordinal() - (self.start.weekday() + 1) % 7
+        week_count = (self.end.toordinal() - self.first_sunday) // 7 + 1
+        self.grid = [[None] * 7 for _ in range(week_count)]
+        self.cells = {}
+        self.total = 0
+        self.buffer = ""
+
+    def feed(self, chunk):
+        buffer = self.buffer + chunk
+        if not self.total:
+            match = YEARLY_TOTAL_PATTERN.search(buffer)
+            if match:
+                self.total = int(match.group(1).replace(",", ""))
+
+        start, end, first_sunday, grid, cells = self.start, self.end, self.first_sunday, self.grid, self.cells
+        consumed = 0
+        for match in self.TOKEN_PATTERN.finditer(buffer):
+            consumed = match.end()
+            cell_attrs, tooltip_for, tooltip_text = match.groups()
+            if tooltip_for is not None:
+                cell = cells.pop(tooltip_for, None)
+                count = parse_tooltip_count(tooltip_text) if cell is not None else None
+                if count is not None:
+                    grid[cell[0]][cell[1]] = count
+                continue
+            if "ContributionCalendar-day" not in cell_attrs:
+                continue
+            raw_date = self.DATE_PATTERN.search(cell_attrs)
+            if raw_date is None:
+                continue
+            day_date = date.fromisoformat(raw_date.group(1))
+            if day_date < start or day_date > end:
+                continue
+            week, weekday = divmod(day_date.toordinal() - first_sunday, 7)
+            level = self.LEVEL_PATTERN.search(cell_attrs)
+            grid[week][weekday] = int(level.group(1) or 0) if level else 0
+            cell_id = self.ID_PATTERN.search(cell_attrs)
+            if cell_id:
+                cells[cell_id.group(1)] = (week, weekday)
+
+        # Carry an unfinished tag over; a tooltip may be cut anywhere after its opening tag.
+        carry = buffer.rfind("<tool-tip", consumed)
+        if carry == -1:
+            carry = buffer.rfind("<", consumed)
+        if not self.total:
+            # The yearly total may also be split across chunks.
+            carry = min(carry if carry != -1 else len(buffer), max(consumed, len(buffer) - 64))
+        self.buffer = buffer[carry:] if carry != -1 else ""
+
+    def close(self):
+        self.buffer = ""
+
+    def weeks(self):
+        weeks = []
+        for week, counts in enumerate(self.grid):
+            first_day = date.fromordinal(self.first_sunday + week * 7)
+            days = [
+                {"date": (first_day + timedelta(days=weekday)).isoformat(), "contribution_count": count}
+                for weekday, count in enumerate(counts)
+                if count is not None
+            ]
+            if days:
+                weeks.append({"first_day": first_day.isoformat(), "days": days})
+        return weeks
+
+
+def parse_contributions_page(chunks, window):
+    """Feed decoded text ``chunks`` through ``ContributionCalendarParser``; return ``(weeks, total)``."""
+    parser = ContributionCalendarParser(window)
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return parser.weeks(), parser.total
+
+
 def fetch_public_contributions(username, window):
     url = f"https://github.com/users/{username}/contributions"
-    request = Request(
+    response = http_client.get(
         url,
         headers={
             "Accept": "text/html",
             "User-Agent": "ceilf6-readme-contribution-graph",
         },
+        params={"from": window["from_date"], "to": window["to_date"]},
+        timeout=20,
+        stream=True,
     )
-    with urlopen(request, timeout=20) as response:
-        content = response.read().decode("utf-8")
-
-    total_match = re.search(r"([\d,]+)\s+contributions\s+in the last year", content)
-    total = int(total_match.group(1).replace(",", "")) if total_match else 0
+    raw_chunks = []
+    decoder = codecs.getincrementaldecoder("utf-8")()
 
-    day_pattern = re.compile(
-        r"(<td\b(?=[^>]*ContributionCalendar-day)[^>]*></td>)\s*"
-        r"<tool-tip\b[^>]*>(.*?)</tool-tip>",
-        re.DOTALL,
-    )
-    start_date = datetime.fromisoformat(window["from_date"]).date()
-    end_date = datetime.fromisoformat(window["to_date"]).date()
-    grouped_days = defaultdict(list)
-
-    for match in day_pattern.finditer(content):
-        attrs = parse_attrs(match.group(1))
-        raw_date = attrs.get("data-date")
-        if not raw_date:
-            continue
-        day_date = datetime.fromisoformat(raw_date).date()
-        if day_date < start_date or day_date > end_date:
-            continue
-        count = parse_tooltip_count(match.group(2))
-        if count is None:
-            count = int(attrs.get("data-level", 0))
-
-        github_weekday = (day_date.weekday() + 1) % 7
-        first_day = day_date - timedelta(days=github_weekday)
-        grouped_days[first_day.isoformat()].append(
-            {
-                "date": day_date.isoformat(),
-                "contribution_count": count,
-            }
-        )
+    def decoded_chunks():
+        for chunk in response.iter_content(chunk_size=PARSE_CHUNK_SIZE):
+            raw_chunks.append(chunk)
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
 
-    weeks = []
-    for first_day in sorted(grouped_days):
-        weeks.append(
-            {
-                "first_day": first_day,
-                "days": sorted(grouped_days[first_day], key=lambda day: day["date"]),
-            }
-        )
+    weeks, total = parse_contributions_page(decoded_chunks(), window)
 
+    SNAPSHOTS.record("github-contributions-page", b"".join(raw_chunks), parse_failed=not weeks)
     if weeks:
         total = sum(day["contribution_count"] for week in weeks for day in week["days"])
 
@@ -217,46 +271,252 @@ def fetch_public_contributions(username, window):
     }
 
 
-def write_json(path, data):
+def group_weeks(counts):
+    """Group a ``{date: count}`` mapping into Sunday-based weeks, GraphQL-style."""
+    weeks = []
+    current_week = None
+    for day in sorted(counts):
+        day_date = date.fromisoformat(day)
+        week_start = day_date.toordinal() - (day_date.weekday() + 1) % 7
+        if week_start != current_week:
+            current_week = week_start
+            weeks.append({"first_day": day, "days": []})
+        weeks[-1]["days"].append({"date": day, "contribution_count": counts[day]})
+    return weeks
+
+
+def load_existing(path, username):
+    try:
+        data = contribution_store.load(path)
+    except (OSError, ValueError):
+        return None
+    if data.get("username") != username or not any(contribution_store.iter_days(data)):
+        return None
+    return data
+
+
+def incremental_window(window, existing, overlap_days=DEFAULT_OVERLAP_DAYS):
+    """Narrow ``window`` to the days from the end of ``existing`` onward, or return it unchanged.
+
+    The full window is kept when the stored data does not reach back to the window start or
+    ends before it, since merging could not produce a complete year in either case.
+    """
+    if existing["from"] > window["from_date"] or existing["to"] < window["from_date"]:
+        return window
+    start = date.fromisoformat(min(existing["to"], window["to_date"])) - timedelta(days=overlap_days)
+    start = max(start, date.fromisoformat(window["from_date"]))
+    return {
+        **window,
+        "from_date": start.isoformat(),
+        "from_datetime": format_utc_datetime(datetime.combine(start, time.min, tzinfo=timezone.utc)),
+    }
+
+
+def merge_contributions(existing, fresh, window):
+    """Overlay freshly fetched days on ``existing`` and roll the result forward to ``window``."""
+    return combine_contributions([existing, fresh], window)
+
+
+def combine_contributions(parts, window):
+    """Merge ``parts`` into one dataset limited to ``window``; later parts win on shared days."""
+    counts = {}
+    for part in parts:
+        counts.update((day["date"], int(day["contribution_count"])) for day in contribution_store.iter_days(part))
+    counts = {day: count for day, count in counts.items() if window["from_date"] <= day <= window["to_date"]}
+    latest = parts[-1]
+    return {
+        "username": latest["username"],
+        "source": latest["source"],
+        "generated_at": latest["generated_at"],
+        "from": window["from_date"],
+        "to": window["to_date"],
+        "total_contributions": sum(counts.values()),
+        "weeks": group_weeks(counts),
+    }
+
+
+def fetch_calendar(username, window, token, public_fallback=False):
+    if token:
+        return normalize_graphql_payload(graphql_query(username, token, window), username, window)
+    if public_fallback:
+        return fetch_public_contributions(username, window)
+    raise RuntimeError("GH_PROFILE_TOKEN is required. Use --public-fallback only for local bootstrap.")
+
+
+def year_windows(start, window):
+    """Split ``start`` .. ``window["to_date"]`` into calendar-year windows; the last ends with ``window``."""
+    end = date.fromisoformat(window["to_date"])
+    windows = []
+    for year in range(start.year, end.year + 1):
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        to_datetime = datetime.combine(last, time.max, tzinfo=timezone.utc).replace(microsecond=0)
+        windows.append(
+            {
+                "from_date": first.isoformat(),
+                "to_date": last.isoformat(),
+                "from_datetime": format_utc_datetime(datetime.combine(first, time.min, tzinfo=timezone.utc)),
+                "to_datetime": window["to_datetime"] if last == end else format_utc_datetime(to_datetime),
+            }
+        )
+    return windows
+
+
+def load_checkpoint(path, window):
+    try:
+        checkpoint = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("window") != window:
+        return None
+    return checkpoint.get("data")
+
+
+def save_checkpoint(path, window, data):
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    with NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as handle:
+        json.dump({"window": window, "data": data}, handle, ensure_ascii=False)
+        temporary_path = Path(handle.name)
+    os.replace(temporary_path, path)
+
+
+def backfill_history(username, start, window, fetch, checkpoint_dir=BACKFILL_CHECKPOINT_DIR, workers=DEFAULT_BACKFILL_WORKERS):
+    """Fetch ``start`` .. ``window`` as concurrent year windows and merge them into one dataset.
+
+    Each finished year is checkpointed under ``checkpoint_dir/<username>/`` and reused by
+    later runs while its window is unchanged, so an interrupted backfill resumes where it
+    stopped and only the still-open current year is fetched again. ``fetch(window)`` returns
+    one year of normalized contribution data.
+    """
+    windows = year_windows(start, window)
+    checkpoint_dir = Path(checkpoint_dir) / username
+    results = {}
+    pending = []
+    for year_window in windows:
+        data = load_checkpoint(checkpoint_dir / f"{year_window['from_date'][:4]}.json", year_window)
+        if data is None:
+            pending.append(year_window)
+        else:
+            results[year_window["from_date"]] = data
+    print(f"Backfilling {len(pending)} of {len(windows)} year windows ({len(results)} from checkpoints)")
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(fetch, year_window): year_window for year_window in pending}
+        for future in as_completed(futures):
+            year_window = futures[future]
+            try:
+                data = future.result()
+            except Exception as exc:
+                errors.append(f"{year_window['from_date']}..{year_window['to_date']}: {exc}")
+                continue
+            save_checkpoint(checkpoint_dir / f"{year_window['from_date'][:4]}.json", year_window, data)
+            results[year_window["from_date"]] = data
+    if errors:
+        raise RuntimeError(f"Backfill failed for {len(errors)} year windows: " + "; ".join(sorted(errors)))
+
+    history_window = {**window, "from_date": windows[0]["from_date"], "from_datetime": windows[0]["from_datetime"]}
+    return combine_contributions([results[key] for key in sorted(results)], history_window)
 
 
 def build_parser():
     parser = argparse.ArgumentParser(description="Fetch GitHub contribution calendar data.")
     parser.add_argument("--username", default=DEFAULT_USERNAME)
-    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help=f"Defaults to {DEFAULT_OUTPUT.name}, or {DEFAULT_HISTORY_OUTPUT.name} with --backfill.",
+    )
     parser.add_argument("--now", help="UTC timestamp for deterministic window calculation.")
     parser.add_argument("--guard-minutes", type=int, default=30)
     parser.add_argument("--print-window", action="store_true")
     parser.add_argument("--public-fallback", action="store_true")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch the days after the existing --output data and merge them in.",
+    )
+    parser.add_argument("--overlap-days", type=int, default=DEFAULT_OVERLAP_DAYS)
+    parser.add_argument(
+        "--format",
+        choices=contribution_store.FORMATS,
+        default=None,
+        help=(
+            "Output layout: week-grouped JSON, compact columnar JSON, or JSON header + binary counts. "
+            "Defaults to weeks, the existing file's layout with --incremental, or columnar with --backfill."
+        ),
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Fetch the full history since --since (default: account creation) as concurrent year windows.",
+    )
+    parser.add_argument("--since", type=date.fromisoformat, help="First day to backfill, as YYYY-MM-DD.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BACKFILL_WORKERS)
+    parser.add_argument("--checkpoint-dir", type=Path, default=BACKFILL_CHECKPOINT_DIR)
     return parser
 
 
 def main():
-    args = build_parser().parse_args()
+    parser = build_parser()
+    args = parser.parse_args()
     now = parse_utc_datetime(args.now) if args.now else None
     window = determine_window(now=now, guard_minutes=args.guard_minutes)
+    if args.since and args.since.isoformat() > window["to_date"]:
+        parser.error(f"--since {args.since} is after the last day of the window ({window['to_date']})")
+    token = os.environ.get("GH_PROFILE_TOKEN", "").strip()
+    if args.backfill:
+        return run_backfill(args, window, token)
+
+    output = args.output or DEFAULT_OUTPUT
+    existing = load_existing(output, args.username) if args.incremental else None
+    fetch_window = incremental_window(window, existing, args.overlap_days) if existing else window
 
     if args.print_window:
-        print(json.dumps(window, ensure_ascii=False))
+        print(json.dumps(fetch_window, ensure_ascii=False))
         return 0
 
-    token = os.environ.get("GH_PROFILE_TOKEN", "").strip()
     try:
-        if token:
-            payload = graphql_query(args.username, token, window)
-            data = normalize_graphql_payload(payload, args.username, window)
-        elif args.public_fallback:
-            data = fetch_public_contributions(args.username, window)
-        else:
-            raise RuntimeError("GH_PROFILE_TOKEN is required. Use --public-fallback only for local bootstrap.")
+        data = fetch_calendar(args.username, fetch_window, token, args.public_fallback)
 
         if not any(week.get("days") for week in data["weeks"]):
             raise RuntimeError("No contribution days found in fetched data")
+        if fetch_window is not window:
+            print(f"Fetched {fetch_window['from_date']}..{fetch_window['to_date']}; merging into existing data")
+            data = merge_contributions(existing, data, window)
 
-        write_json(args.output, data)
-        print(f"GitHub contribution data written to {args.output}")
+        fmt = args.format or (contribution_store.stored_format(output) if existing else "weeks")
+        contribution_store.write(output, data, fmt)
+        print(f"GitHub contribution data written to {output}")
+        return 0
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+
+def run_backfill(args, window, token):
+    output = args.output or DEFAULT_HISTORY_OUTPUT
+    try:
+        if args.since is None and not token:
+            raise RuntimeError("--backfill needs --since or GH_PROFILE_TOKEN to look up the account creation date")
+        start = args.since or account_created_date(args.username, token)
+        if args.print_window:
+            print(json.dumps(year_windows(start, window), ensure_ascii=False))
+            return 0
+
+        data = backfill_history(
+            args.username,
+            start,
+            window,
+            lambda year_window: fetch_calendar(args.username, year_window, token, args.public_fallback),
+            checkpoint_dir=args.checkpoint_dir,
+            workers=args.workers,
+        )
+        if not any(week.get("days") for week in data["weeks"]):
+            raise RuntimeError("No contribution days found in fetched data")
+        contribution_store.write(output, data, args.format or "columnar")
+        print(f"GitHub contribution history {data['from']}..{data['to']} written to {output}")
         return 0
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Fetch contribution calendars and stats card numbers for many GitHub users in batched queries.
+
+Every user is an aliased field of a shared GraphQL query (see ``github_graphql``), so a
+team-wide refresh takes a handful of requests rather than one or more per user and metric.
+Writes one JSON document keyed by login; calendars use the same week layout as
+``github-contributions.json``. Needs ``GH_PROFILE_TOKEN``.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import github_graphql
+import snapshot_store
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = SCRIPTS_DIR.parent / "data" / "github-profiles.json"
+
+
+def load_contributions_module():
+    """Import fetch-github-contributions.py for its window and calendar normalisation."""
+    path = SCRIPTS_DIR / "fetch-github-contributions.py"
+    spec = importlib.util.spec_from_file_location("fetch_github_contributions", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_logins(args):
+    logins = list(args.login or [])
+    if args.logins_file:
+        logins += [
+            line.strip()
+            for line in args.logins_file.read_text(encoding="utf-8").splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+    return list(dict.fromkeys(logins))
+
+
+def build_document(profiles, window, contributions):
+    document = {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "from": window["from_date"],
+        "to": window["to_date"],
+        "profiles": {},
+    }
+    for login, profile in profiles.items():
+        if profile is None:
+            document["profiles"][login] = None
+            continue
+        entry = {}
+        if "stats" in profile:
+            entry["stats"] = profile["stats"]
+        if "calendar" in profile:
+            payload = {"data": {"user": {"contributionsCollection": {"contributionCalendar": profile["calendar"]}}}}
+            calendar = contributions.normalize_graphql_payload(payload, login, window)
+            entry["total_contributions"] = calendar["total_contributions"]
+            entry["weeks"] = calendar["weeks"]
+        document["profiles"][login] = entry
+    return document
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as handle:
+        json.dump(data, handle, ensure_ascii=False, indent=2)
+        handle.write("\n")
+        temporary_path = Path(handle.name)
+    os.replace(temporary_path, path)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Fetch GitHub profiles in batched GraphQL queries.")
+    parser.add_argument("--login", action="append", help="GitHub login to fetch (repeatable).")
+    parser.add_argument("--logins-file", type=Path, help="File with one login per line.")
+    parser.add_argument("--metric", action="append", choices=github_graphql.METRICS, help="Defaults to every metric.")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--now", help="UTC timestamp for deterministic window calculation.")
+    parser.add_argument("--max-nodes", type=int, default=github_graphql.DEFAULT_MAX_NODES)
+    parser.add_argument("--max-users", type=int, default=github_graphql.DEFAULT_MAX_USERS)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    logins = read_logins(args)
+    token = os.environ.get("GH_PROFILE_TOKEN", "").strip()
+    if not logins:
+        print("Error: pass --login or --logins-file", file=sys.stderr)
+        return 1
+    if not token:
+        print("Error: GH_PROFILE_TOKEN is required", file=sys.stderr)
+        return 1
+
+    contributions = load_contributions_module()
+    now = contributions.parse_utc_datetime(args.now) if args.now else None
+    window = contributions.determine_window(now=now)
+    metrics = tuple(args.metric or github_graphql.METRICS)
+    try:
+        profiles = github_graphql.fetch_profiles(
+            logins,
+            token,
+            metrics,
+            window=window,
+            now=now,
+            snapshots=snapshot_store.SnapshotStore(),
+            max_nodes=args.max_nodes,
+            max_users=args.max_users,
+        )
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    write_json(args.output, build_document(profiles, window, contributions))
+    missing = sorted(login for login, profile in profiles.items() if profile is None)
+    if missing:
+        print(f"Warning: no GitHub user {', '.join(missing)}", file=sys.stderr)
+    print(f"GitHub profiles for {len(profiles) - len(missing)} users written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
-"""Fetch the upstream GitHub stats SVG and replace its GitHub mark with an S badge."""
+"""Build the GitHub stats card with an S badge in place of the GitHub mark.
+
+With ``GH_PROFILE_TOKEN`` set (or ``--source graphql``) the numbers come straight from the
+GitHub GraphQL API and the card is rendered locally from ``stats_card()``. Otherwise the
+upstream github-profile-summary-cards SVG is fetched, validated and rewritten.
+"""
 
 import argparse
 import os
 import sys
 import xml.etree.ElementTree as ElementTree
+from collections import defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from urllib.request import Request, urlopen
+
+import card_templates
+import github_graphql
+import http_cache
+import snapshot_store
 
 
 DEFAULT_URL = (
@@ -16,17 +26,24 @@ DEFAULT_URL = (
     "username=ceilf6&theme=tokyonight"
 )
 DEFAULT_OUTPUT = Path(__file__).resolve().parents[2] / "assets" / "github-stats-card.svg"
+DEFAULT_USERNAME = "ceilf6"
 RIGHT_SIDE_TRANSFORM = "translate(220,20)"
 LEFT_SIDE_TRANSFORM = "translate(30,20)"
-EXPECTED_LABELS = (
-    "Total Stars:",
-    f"{datetime.now(timezone.utc).year} Commits:",
-    "Total PRs:",
-    "Total Issues:",
-    "Contributed to:",
-)
+# The commits row counts from January 1, so its label names the current year; see expected_labels().
+LABEL_TEMPLATES = ("Total Stars:", "{year} Commits:", "Total PRs:", "Total Issues:", "Contributed to:")
 OUTPUT_TITLE = "ceilf6's Github Stats"
 OUTPUT_TITLE_STYLE = "font-size: 18px; fill: #70a5fd;"
+SNAPSHOT_NAME = "github-stats-card"
+
+
+def card_year(now=None):
+    return (now or datetime.now(timezone.utc)).astimezone(timezone.utc).year
+
+
+def expected_labels(now=None):
+    """The row labels of a card rendered at ``now``: the commits label carries that year."""
+    year = card_year(now)
+    return tuple(label.format(year=year) for label in LABEL_TEMPLATES)
 
 
 def local_name(tag):
@@ -44,35 +61,62 @@ def register_default_namespace(root):
         ElementTree.register_namespace("", root.tag[1:].split("}", 1)[0])
 
 
-def load_source(input_path, url):
+def load_source(input_path, url, cache=None, conditional=False):
+    """Return the upstream SVG bytes, or None when the upstream reports it unchanged."""
     if input_path is not None:
         return input_path.read_bytes()
 
-    request = Request(url, headers={"User-Agent": "ceilf6-github-stats-card"})
-    with urlopen(request, timeout=30) as response:
-        return response.read()
-
-
-def find_right_side_group(root):
-    matches = []
-    for parent in root.iter():
-        for child in parent:
-            if local_name(child.tag) == "g" and child.get("transform") == RIGHT_SIDE_TRANSFORM:
-                matches.append((parent, child))
+    response = http_cache.conditional_get(
+        url, cache, conditional, headers={"User-Agent": "ceilf6-github-stats-card"}, timeout=30
+    )
+    return None if response is None else response.content
+
+
+class CardIndex:
+    """The nodes the rewriter needs, gathered in one walk over the card.
+
+    ``texts`` maps stripped text content to its ``<text>`` elements, ``groups`` maps a
+    ``transform`` to its ``<g>`` elements, ``parents`` / ``positions`` locate each of those
+    groups in its parent, and ``group_texts`` holds the text contents inside each group.
+    """
+
+    def __init__(self, root):
+        self.parents = {}
+        self.positions = {}
+        self.texts = defaultdict(list)
+        self.groups = defaultdict(list)
+        self.group_texts = defaultdict(set)
+
+        text_tag = qualified_tag(root, "text")
+        group_tag = qualified_tag(root, "g")
+        stack = [(root, ())]
+        while stack:
+            element, enclosing = stack.pop()
+            for position, child in enumerate(element):
+                if child.tag == text_tag:
+                    content = "".join(child.itertext()).strip()
+                    self.texts[content].append(child)
+                    for group in enclosing:
+                        self.group_texts[group].add(content)
+                    continue
+                transform = child.get("transform") if child.tag == group_tag else None
+                if transform is None:
+                    stack.append((child, enclosing))
+                    continue
+                self.groups[transform].append(child)
+                self.parents[child] = element
+                self.positions[child] = position
+                stack.append((child, enclosing + (child,)))
+
+
+def find_right_side_group(index):
+    matches = [(index.parents[group], group) for group in index.groups[RIGHT_SIDE_TRANSFORM]]
     if len(matches) != 1:
         raise ValueError("Could not find the expected right-side group")
     return matches[0]
 
 
-def text_values(element):
-    return {
-        "".join(child.itertext()).strip()
-        for child in element.iter()
-        if local_name(child.tag) == "text"
-    }
-
-
-def validate_card(root):
+def validate_card(root, index=None, now=None):
     if local_name(root.tag) != "svg":
         raise ValueError("Upstream card root is not an SVG")
 
@@ -80,24 +124,17 @@ def validate_card(root):
     if dimensions != ("340", "200", "0 0 340 200"):
         raise ValueError("Upstream card dimensions do not match the expected 340x200 layout")
 
-    title_matches = [
-        element
-        for element in root.iter()
-        if local_name(element.tag) == "text" and "".join(element.itertext()).strip() == "Stats"
-    ]
+    index = index or CardIndex(root)
+    title_matches = index.texts["Stats"]
     if len(title_matches) != 1:
         raise ValueError("Upstream card title does not match the expected Stats title")
 
-    label_groups = [
-        element
-        for element in root.iter()
-        if local_name(element.tag) == "g" and element.get("transform") == LEFT_SIDE_TRANSFORM
-    ]
-    if len(label_groups) != 1 or not set(EXPECTED_LABELS).issubset(text_values(label_groups[0])):
+    label_groups = index.groups[LEFT_SIDE_TRANSFORM]
+    if len(label_groups) != 1 or not set(expected_labels(now)) <= index.group_texts[label_groups[0]]:
         raise ValueError("Upstream card field labels do not match the expected stats layout")
 
-    parent, target = find_right_side_group(root)
-    if list(parent)[-1] is not target:
+    parent, target = find_right_side_group(index)
+    if index.positions[target] != len(parent) - 1:
         raise ValueError("Upstream card right-side group is not the final group")
     return title_matches[0], parent, target
 
@@ -107,7 +144,8 @@ def replace_title(title):
     title.set("style", OUTPUT_TITLE_STYLE)
 
 
-def replace_right_side_group(root, parent, target):
+def badge_group(root):
+    """The S badge group that takes the place of the upstream GitHub mark."""
     replacement = ElementTree.Element(
         qualified_tag(root, "g"), {"transform": RIGHT_SIDE_TRANSFORM}
     )
@@ -144,9 +182,11 @@ def replace_right_side_group(root, parent, target):
         },
     )
     badge_text.text = "S"
+    return replacement
 
-    parent.insert(list(parent).index(target), replacement)
-    parent.remove(target)
+
+def replace_right_side_group(root, parent, target, index):
+    parent[index.positions[target]] = badge_group(root)
 
 
 def write_atomically(output, content):
@@ -161,23 +201,104 @@ def write_atomically(output, content):
         raise
 
 
+def render_card(source, snapshots=None, now=None):
+    try:
+        root = ElementTree.fromstring(source)
+        index = CardIndex(root)
+        title, parent, target = validate_card(root, index, now)
+    except Exception:
+        if snapshots is not None:
+            snapshots.record(SNAPSHOT_NAME, source, parse_failed=True)
+        raise
+    if snapshots is not None:
+        snapshots.record(SNAPSHOT_NAME, source)
+    replace_title(title)
+    replace_right_side_group(root, parent, target, index)
+    register_default_namespace(root)
+    return ElementTree.tostring(root, encoding="unicode")
+
+
+ROW_FIELDS = (
+    ("stars", "star"),
+    ("commits", "git-commit"),
+    ("prs", "git-pull-request"),
+    ("issues", "issue-opened"),
+    ("contributed_to", "repo"),
+)
+BADGE_MARKUP = "".join(
+    ElementTree.tostring(child, encoding="unicode") for child in badge_group(ElementTree.Element("svg"))
+)
+_stats_cards = {}
+
+
+def stats_card(now=None):
+    """The card spec for the year of ``now``; one spec object per year, so its compiled template is reused."""
+    year = card_year(now)
+    spec = _stats_cards.get(year)
+    if spec is None:
+        spec = _stats_cards[year] = {
+            "title": OUTPUT_TITLE,
+            "rows": tuple((field, label, icon) for (field, icon), label in zip(ROW_FIELDS, expected_labels(now))),
+            "value_x": 130,
+            "mark": {
+                # The upstream mark sits at translate(220,20) inside the translate(0,40) body group.
+                "transform": "translate(220,60)",
+                "markup": BADGE_MARKUP,
+            },
+        }
+    return spec
+
+
+def fetch_profile_stats(username, token, snapshots=None, now=None):
+    return github_graphql.profile_stats(username, token, now=now, snapshots=snapshots)
+
+
+def render_local_card(stats, theme=card_templates.TOKYO_NIGHT, now=None):
+    """Render the card from GraphQL profile stats, without the upstream renderer."""
+    return card_templates.compile_card(stats_card(now), theme).render(stats)
+
+
+def parse_now(value):
+    """Parse a ``--now`` UTC timestamp such as ``2026-08-22T12:00:00Z``."""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
 def build_parser():
     parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--source",
+        choices=("auto", "graphql", "upstream"),
+        default="auto",
+        help="graphql renders locally from GitHub GraphQL data; auto uses it when GH_PROFILE_TOKEN is set.",
+    )
+    parser.add_argument("--username", default=DEFAULT_USERNAME)
     parser.add_argument("--input", type=Path, help="Use a local upstream SVG instead of downloading it.")
     parser.add_argument("--url", default=DEFAULT_URL, help="Upstream stats card URL.")
     parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--cache", type=Path, default=http_cache.DEFAULT_PATH, help="ETag / Last-Modified cache file.")
+    parser.add_argument("--now", type=parse_now, help="UTC timestamp whose year the commits row counts and names.")
     return parser
 
 
 def main():
     args = build_parser().parse_args()
+    token = os.environ.get("GH_PROFILE_TOKEN", "").strip()
+    source = args.source
+    if source == "auto":
+        source = "graphql" if token and args.input is None else "upstream"
+    if source == "graphql":
+        return write_local_card(args.username, token, args.output, args.now)
+
+    cache = http_cache.ValidatorCache(args.cache)
+    snapshots = snapshot_store.SnapshotStore() if args.input is None else None
     try:
-        root = ElementTree.fromstring(load_source(args.input, args.url))
-        title, parent, target = validate_card(root)
-        replace_title(title)
-        replace_right_side_group(root, parent, target)
-        register_default_namespace(root)
-        write_atomically(args.output, ElementTree.tostring(root, encoding="unicode"))
+        source = load_source(args.input, args.url, cache, conditional=args.output.exists())
+        if source is None:
+            print(f"Upstream stats card not modified; keeping {args.output}")
+            return 0
+        write_atomically(args.output, render_card(source, snapshots, args.now))
+        cache.commit(args.url)
         print(f"GitHub stats card written to {args.output}")
         return 0
     except Exception as exc:
@@ -185,5 +306,19 @@ def main():
         return 1
 
 
+def write_local_card(username, token, output, now=None):
+    try:
+        if not token:
+            raise RuntimeError("GH_PROFILE_TOKEN is required for --source graphql")
+        now = now or datetime.now(timezone.utc)
+        stats = fetch_profile_stats(username, token, snapshot_store.SnapshotStore(), now)
+        write_atomically(output, render_local_card(stats, now=now))
+        print(f"GitHub stats card for {username} rendered locally to {output}")
+        return 0
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
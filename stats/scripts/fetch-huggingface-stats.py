@@ -9,25 +9,31 @@ from datetime import datetime
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 
-import requests
+import http_cache
+import snapshot_store
+import stats_history
 
 
 DEFAULT_URL = "https://huggingface.co/api/users/ceilf6/overview"
 DEFAULT_OUTPUT = Path(__file__).parent.parent / "data" / "huggingface-stats.json"
 FIELDS = ("numFollowers", "numLikes", "numModels", "numDatasets", "numSpaces")
+SNAPSHOT_NAME = "huggingface-overview"
+HISTORY_SOURCE = "huggingface"
 
 
-def load_source(input_path, url):
+def load_source(input_path, url, cache=None, conditional=False):
+    """Return the overview JSON text, or None when the upstream reports it unchanged."""
     if input_path is not None:
         return input_path.read_text(encoding="utf-8")
 
-    response = requests.get(
+    response = http_cache.conditional_get(
         url,
+        cache,
+        conditional,
         headers={"User-Agent": "ceilf6-huggingface-card"},
         timeout=30,
     )
-    response.raise_for_status()
-    return response.text
+    return None if response is None else response.text
 
 
 def parse_overview(source):
@@ -44,6 +50,19 @@ def parse_overview(source):
     return stats
 
 
+def build_stats(source, snapshots=None):
+    try:
+        stats = parse_overview(source)
+    except Exception:
+        if snapshots is not None:
+            snapshots.record(SNAPSHOT_NAME, source, parse_failed=True)
+        raise
+    if snapshots is not None:
+        snapshots.record(SNAPSHOT_NAME, source)
+    stats["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return stats
+
+
 def write_atomically(output, stats):
     output.parent.mkdir(parents=True, exist_ok=True)
     with NamedTemporaryFile("w", encoding="utf-8", dir=output.parent, delete=False) as handle:
@@ -57,17 +76,36 @@ def write_atomically(output, stats):
         raise
 
 
+def record_history(output, stats):
+    """Append the fetched totals to the history kept next to ``output``."""
+    stats_history.HistoryStore(output.parent / "history").append(HISTORY_SOURCE, stats)
+
+
+def record_unchanged(output):
+    """Record a 304 as a successful fetch: the stored totals are still the current ones."""
+    record_history(output, json.loads(output.read_text(encoding="utf-8")))
+
+
 def main():
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--input", type=Path, help="Use a local overview JSON instead of downloading it.")
     parser.add_argument("--url", default=DEFAULT_URL)
     parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--cache", type=Path, default=http_cache.DEFAULT_PATH, help="ETag / Last-Modified cache file.")
     args = parser.parse_args()
 
+    cache = http_cache.ValidatorCache(args.cache)
+    snapshots = snapshot_store.SnapshotStore() if args.input is None else None
     try:
-        stats = parse_overview(load_source(args.input, args.url))
-        stats["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        source = load_source(args.input, args.url, cache, conditional=args.output.exists())
+        if source is None:
+            record_unchanged(args.output)
+            print(f"Hugging Face overview not modified; keeping {args.output}")
+            return 0
+        stats = build_stats(source, snapshots)
         write_atomically(args.output, stats)
+        record_history(args.output, stats)
+        cache.commit(args.url)
         print(f"Hugging Face stats written to {args.output}")
         return 0
     except Exception as exc:
@@ -11,13 +11,23 @@ import argparse
 import json
 import math
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from html import escape
 from pathlib import Path
 
+import contribution_store
+import render_cache
+
 
 DEFAULT_INPUT = Path(__file__).parent.parent / "data" / "github-contributions.json"
-DEFAULT_OUTPUT = Path(__file__).resolve().parents[2] / "assets" / "github-contribution-graph.svg"
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_OUTPUT = REPO_ROOT / "assets" / "github-contribution-graph.svg"
+DEFAULT_WEEKS = 53
+# Anything that changes the rendered SVG: these sources plus the data and layout.
+GENERATOR_SOURCES = (Path(__file__).resolve(), Path(contribution_store.__file__).resolve())
+# Data fields that never reach the SVG, so they do not invalidate the render cache.
+RENDER_IGNORED_FIELDS = ("generated_at", "source")
 
 TITLE_TEXT = "ceilf6's Github Contribution"
 BACKGROUND = "#1a1b27"
@@ -40,6 +50,7 @@ MAIN_LAYOUT = {
     "width": 1020,
     "height": 184,
     "bottom_margin": 0,
+    "optimize": False,
 }
 
 # Compact copy: width/height fit the content and stay within the 700x220 budget.
@@ -57,54 +68,94 @@ COMPACT_LAYOUT = {
     "width": None,
     "height": None,
     "bottom_margin": 16,
+    "optimize": False,
 }
 
 
+BASE_LAYOUTS = {"main": MAIN_LAYOUT, "compact": COMPACT_LAYOUT}
+
+
 def load_data(path):
-    return json.loads(path.read_text(encoding="utf-8"))
+    return contribution_store.load(path)
 
 
 def flatten_days(data):
-    days = []
-    for week in data.get("weeks", []):
-        for day in week.get("days", []):
-            days.append(
-                {
-                    "date": day["date"],
-                    "contribution_count": int(day.get("contribution_count", 0)),
-                }
-            )
-    return sorted(days, key=lambda day: day["date"])
-
+    """Return ``(start_date, counts)``: one count per day, None where ``weeks`` data has no entry."""
+    return contribution_store.day_counts(data)
 
-def group_days_by_week(days):
-    weeks = []
-    current_week = None
-    current_days = []
-    for day in days:
-        date = datetime.fromisoformat(day["date"]).date()
-        github_weekday = (date.weekday() + 1) % 7
-        first_day = date.toordinal() - github_weekday
-        if current_week is None:
-            current_week = first_day
-        if first_day != current_week:
-            weeks.append(current_days)
-            current_days = []
-            current_week = first_day
-        current_days.append(day)
-    if current_days:
-        weeks.append(current_days)
-    return weeks[-53:]
 
+def group_days_by_week(start, counts, limit=DEFAULT_WEEKS):
+    """Split the day series into Sunday-based weeks of ``(weekday, date, count)``; keep the last ``limit``.
 
-def color_for_count(count, max_count):
+    ``limit=None`` keeps every week.
+    """
+    lead = (start.weekday() + 1) % 7
+    week_count = (lead + len(counts) + 6) // 7
+    first_week = 0 if limit is None else max(0, week_count - limit)
+    weeks = []
+    for week in range(first_week, week_count):
+        days = []
+        for weekday in range(7):
+            index = week * 7 + weekday - lead
+            if 0 <= index < len(counts) and counts[index] is not None:
+                days.append((weekday, start + timedelta(days=index), counts[index]))
+        if days:
+            weeks.append(days)
+    return weeks
+
+
+def level_for_count(count, max_count):
     if count <= 0:
-        return LEVEL_COLORS[0]
+        return 0
     if max_count <= 1:
-        return LEVEL_COLORS[1]
+        return 1
     ratio = math.log(count + 1) / math.log(max_count + 1)
-    level = min(4, max(1, math.ceil(ratio * 4)))
-    return LEVEL_COLORS[level]
+    return min(4, max(1, math.ceil(ratio * 4)))
+
+
+def color_for_count(count, max_count):
+    return LEVEL_COLORS[level_for_count(count, max_count)]
+
+
+def compute_levels(counts, max_count):
+    """Map every count to its color level, evaluating the log scale once per distinct count."""
+    cache = {}
+    levels = []
+    for count in counts:
+        level = cache.get(count)
+        if level is None:
+            level = cache[count] = level_for_count(count, max_count)
+        levels.append(level)
+    return levels
+
+
+def build_day_grid(data, limit=DEFAULT_WEEKS):
+    """Lay the days out once for every layout: week index, weekday, ISO date, count and level per cell.
+
+    Statistics cover every day in ``data``; the cells cover the last ``limit`` weeks (all of
+    them when ``limit`` is None).
+    """
+    start, counts = flatten_days(data)
+    present = [count for count in counts if count is not None]
+    if not present:
+        raise ValueError("No contribution days found")
+
+    max_count = max(present)
+    weeks = group_days_by_week(start, counts, limit)
+    days = [day for week in weeks for day in week]
+    levels = compute_levels([count for _, _, count in days], max_count)
+    cells = []
+    position = 0
+    for week_index, week in enumerate(weeks):
+        for weekday, day_date, count in week:
+            cells.append((week_index, weekday, day_date.isoformat(), count, levels[position]))
+            position += 1
+    return {
+        "week_count": len(weeks),
+        "cells": cells,
+        "max_count": max_count,
+        "active_days": sum(1 for count in present if count > 0),
+    }
 
 
 def format_cell_count(value):
@@ -121,14 +172,74 @@ def cell_text_size(value):
     return "8px"
 
 
-def render_svg(data, layout):
-    days = flatten_days(data)
-    if not days:
-        raise ValueError("No contribution days found")
+def inline_cells(grid, cell, gap, graph_x, graph_y, show_counts):
+    day_cells = []
+    for week_index, github_weekday, iso_date, count, level in grid["cells"]:
+        x = graph_x + week_index * (cell + gap)
+        y = graph_y + github_weekday * (cell + gap)
+        label = escape(f"{count} contributions on {iso_date}")
+        markup = (
+            f'<rect x="{x}" y="{y}" width="{cell}" height="{cell}" rx="2" fill="{LEVEL_COLORS[level]}">'
+            f"<title>{label}</title></rect>"
+        )
+        if show_counts:
+            text_size = cell_text_size(count)
+            markup += (
+                f'<text x="{x + cell / 2}" y="{y + cell / 2 + 2.4}" text-anchor="middle" '
+                f'style="font-size: {text_size}; font-weight: 800; fill: {CELL_TEXT}; pointer-events: none;">'
+                f"{escape(format_cell_count(count))}</text>"
+            )
+        day_cells.append(markup)
+    return "".join(day_cells)
+
+
+# Optimized emit: class per smaller count size; 8px is the default in the shared text rule.
+TEXT_SIZE_CLASSES = {"6.7px": "s1", "5.9px": "s2", "4.8px": "s3"}
 
-    max_count = max(day["contribution_count"] for day in days)
-    active_days = sum(1 for day in days if day["contribution_count"] > 0)
-    weeks = group_days_by_week(days)
+
+def short_number(value):
+    return f"{value:g}"
+
+
+def optimized_cells(grid, cell, gap, graph_x, graph_y, show_counts):
+    """Return ``(style_rules, markup)`` drawing each cell as a ``<use>`` of its level's shared rect.
+
+    Fills live on one ``<defs>`` rect per level, count text takes its styling from a rule on
+    the translated group (plus a class for the smaller sizes), and coordinates are offsets
+    inside that group. Per-cell ``<title>`` tooltips are dropped: the assets are embedded
+    with ``<img>``, where SVG tooltips never show.
+    """
+    pitch = cell + gap
+    rules = ""
+    if show_counts:
+        rules = f".g text{{font-size:8px;font-weight:800;fill:{CELL_TEXT};pointer-events:none;text-anchor:middle}}"
+        rules += "".join(f".{name}{{font-size:{size}}}" for size, name in TEXT_SIZE_CLASSES.items())
+
+    shapes = "".join(
+        f'<rect id="c{level}" width="{cell}" height="{cell}" rx="2" fill="{color}"/>'
+        for level, color in enumerate(LEVEL_COLORS)
+    )
+    markup = [f'<defs>{shapes}</defs><g class="g" transform="translate({graph_x},{graph_y})">']
+    for week_index, github_weekday, _, count, level in grid["cells"]:
+        x = week_index * pitch
+        y = github_weekday * pitch
+        position = (f' x="{x}"' if x else "") + (f' y="{y}"' if y else "")
+        markup.append(f'<use href="#c{level}"{position}/>')
+        if show_counts:
+            size_class = TEXT_SIZE_CLASSES.get(cell_text_size(count))
+            class_attr = f' class="{size_class}"' if size_class else ""
+            markup.append(
+                f'<text x="{short_number(x + cell / 2)}" y="{short_number(y + cell / 2 + 2.4)}"{class_attr}>'
+                f"{escape(format_cell_count(count))}</text>"
+            )
+    markup.append("</g>")
+    return rules, "".join(markup)
+
+
+def render_svg(data, layout, grid=None):
+    grid = grid or build_day_grid(data, layout.get("weeks", DEFAULT_WEEKS))
+    week_count = grid["week_count"]
+    active_days = grid["active_days"]
 
     cell = layout["cell"]
     gap = layout["gap"]
@@ -136,34 +247,17 @@ def render_svg(data, layout):
     graph_y = layout["graph_y"]
     show_counts = layout["show_counts"]
 
-    graph_width = len(weeks) * cell + max(0, len(weeks) - 1) * gap
+    graph_width = week_count * cell + max(0, week_count - 1) * gap
     graph_height = 7 * cell + 6 * gap
     width = layout["width"] or graph_width + 2 * margin_x
     height = layout["height"] or graph_y + graph_height + layout["bottom_margin"]
     graph_x = max(6, (width - graph_width) // 2)
 
-    day_cells = []
-    for week_index, week in enumerate(weeks):
-        for day in week:
-            date = datetime.fromisoformat(day["date"]).date()
-            github_weekday = (date.weekday() + 1) % 7
-            x = graph_x + week_index * (cell + gap)
-            y = graph_y + github_weekday * (cell + gap)
-            count = day["contribution_count"]
-            color = color_for_count(count, max_count)
-            label = escape(f'{count} contributions on {day["date"]}')
-            markup = (
-                f'<rect x="{x}" y="{y}" width="{cell}" height="{cell}" rx="2" fill="{color}">'
-                f"<title>{label}</title></rect>"
-            )
-            if show_counts:
-                text_size = cell_text_size(count)
-                markup += (
-                    f'<text x="{x + cell / 2}" y="{y + cell / 2 + 2.4}" text-anchor="middle" '
-                    f'style="font-size: {text_size}; font-weight: 800; fill: {CELL_TEXT}; pointer-events: none;">'
-                    f"{escape(format_cell_count(count))}</text>"
-                )
-            day_cells.append(markup)
+    if layout.get("optimize"):
+        style_rules, cells_markup = optimized_cells(grid, cell, gap, graph_x, graph_y, show_counts)
+        style_rules = f"\n        {style_rules}" if style_rules else ""
+    else:
+        style_rules, cells_markup = "", inline_cells(grid, cell, gap, graph_x, graph_y, show_counts)
 
     title_size = layout["title_size"]
     meta_size = layout["meta_size"]
@@ -176,12 +270,12 @@ def render_svg(data, layout):
     <style>
         * {{
             font-family: 'Segoe UI', Ubuntu, "Helvetica Neue", Sans-Serif;
-        }}
+        }}{style_rules}
     </style>
     <rect x="1" y="1" rx="5" ry="5" width="{width - 2}" height="{height - 2}" stroke="{BACKGROUND}" stroke-width="1" fill="{BACKGROUND}" />
     <text x="{margin_x}" y="{title_y}" style="font-size: {title_size}px; fill: {TITLE};">{TITLE_TEXT}</text>
     <text x="{meta_x}" y="{title_y}" text-anchor="end" style="font-size: {meta_size}px; fill: {TEXT};">active {active_days} days</text>
-    {''.join(day_cells)}
+    {cells_markup}
 </svg>'''
 
 
@@ -189,6 +283,70 @@ def compact_path_for(output):
     return output.with_name(f"{output.stem}-compact{output.suffix}")
 
 
+def load_layouts(path):
+    """Read ``[(output_path, layout)]`` from a layout config file.
+
+    Each entry names a ``base`` layout (``main`` or ``compact``), an ``output`` path relative
+    to the repository root, and any layout keys to override, plus ``weeks`` (how many recent
+    weeks to draw, ``null`` for the whole history).
+    """
+    config = json.loads(Path(path).read_text(encoding="utf-8"))
+    targets = []
+    for entry in config.get("layouts", []):
+        entry = dict(entry)
+        name = entry.pop("name", entry.get("output"))
+        base = entry.pop("base", "main")
+        if base not in BASE_LAYOUTS:
+            raise ValueError(f"Layout {name}: unknown base layout {base!r}")
+        if "output" not in entry:
+            raise ValueError(f"Layout {name}: missing output path")
+        output = REPO_ROOT / entry.pop("output")
+        unknown = sorted(set(entry) - set(MAIN_LAYOUT) - {"weeks"})
+        if unknown:
+            raise ValueError(f"Layout {name}: unknown keys {', '.join(unknown)}")
+        targets.append((output, {**BASE_LAYOUTS[base], **entry}))
+    if not targets:
+        raise ValueError(f"No layouts defined in {path}")
+    return targets
+
+
+def render_layouts(data, targets, workers=None, cache=None):
+    """Build one day grid per distinct week count, then render and write every target in parallel.
+
+    Returns ``(path, size, unoptimized_size)`` per target; ``unoptimized_size`` is None unless
+    the layout uses the optimized emit mode. With a ``cache``, targets whose data, layout and
+    generator are unchanged are not rendered at all and come back with ``size`` None.
+    """
+    rendered_data = {field: value for field, value in data.items() if field not in RENDER_IGNORED_FIELDS}
+    keys = {path: render_cache.render_key(*GENERATOR_SOURCES, rendered_data, layout) for path, layout in targets}
+    pending = [(path, layout) for path, layout in targets if cache is None or not cache.is_fresh(path, keys[path])]
+
+    grids = {}
+    for _, layout in pending:
+        weeks = layout.get("weeks", DEFAULT_WEEKS)
+        if weeks not in grids:
+            grids[weeks] = build_day_grid(data, weeks)
+
+    def render_target(target):
+        path, layout = target
+        grid = grids[layout.get("weeks", DEFAULT_WEEKS)]
+        svg = render_svg(data, layout, grid).encode("utf-8")
+        baseline = None
+        if layout.get("optimize"):
+            baseline = len(render_svg(data, {**layout, "optimize": False}, grid).encode("utf-8"))
+        render_cache.write_if_changed(path, svg)
+        if cache is not None:
+            cache.record(path, keys[path])
+        return path, len(svg), baseline
+
+    results = {path: (path, None, None) for path, _ in targets}
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers or min(8, len(pending))) as executor:
+            for result in executor.map(render_target, pending):
+                results[result[0]] = result
+    return [results[path] for path, _ in targets]
+
+
 def build_parser():
     parser = argparse.ArgumentParser(description="Generate GitHub contribution graph SVGs.")
     parser.add_argument("--input", type=Path, default=DEFAULT_INPUT)
@@ -199,6 +357,19 @@ def build_parser():
         default=None,
         help="Path for the compact (<=700x220) copy. Defaults to '<output>-compact.svg'.",
     )
+    parser.add_argument(
+        "--layouts",
+        type=Path,
+        default=None,
+        help="JSON layout config to render instead of --output/--compact-output.",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Emit every layout with shared <defs>/CSS classes instead of inline cell styles.",
+    )
+    parser.add_argument("--force", action="store_true", help="Render every layout even if its inputs are unchanged.")
+    parser.add_argument("--manifest", type=Path, default=render_cache.DEFAULT_MANIFEST)
     return parser
 
 
@@ -206,15 +377,27 @@ def main():
     args = build_parser().parse_args()
     try:
         data = load_data(args.input)
-        targets = [
-            (args.output, MAIN_LAYOUT),
-            (args.compact_output or compact_path_for(args.output), COMPACT_LAYOUT),
-        ]
-        for path, layout in targets:
-            svg = render_svg(data, layout)
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(svg, encoding="utf-8")
-            print(f"GitHub contribution graph written to {path}")
+        if args.layouts:
+            targets = load_layouts(args.layouts)
+        else:
+            targets = [
+                (args.output, MAIN_LAYOUT),
+                (args.compact_output or compact_path_for(args.output), COMPACT_LAYOUT),
+            ]
+        if args.optimize:
+            targets = [(path, {**layout, "optimize": True}) for path, layout in targets]
+        cache = None if args.force else render_cache.RenderCache(args.manifest)
+        results = render_layouts(data, targets, cache=cache)
+        if cache is not None:
+            cache.save()
+        for path, size, baseline in results:
+            if size is None:
+                print(f"GitHub contribution graph unchanged, skipped {path}")
+                continue
+            report = f"{size:,} bytes"
+            if baseline:
+                report += f"; {baseline:,} unoptimized, {baseline / size:.1f}x smaller"
+            print(f"GitHub contribution graph written to {path} ({report})")
         return 0
     except Exception as exc:
         print(f"Error: {exc}", file=sys.stderr)
@@ -0,0 +1,250 @@
+"""Shared GitHub GraphQL access: an authenticated POST helper and a batched profile query builder.
+
+``fetch_profiles`` fetches the contribution calendar and the stats card numbers (owned-repository
+stars, this year's commits, PRs, issues and repositories contributed to) for many users at
+once. Each user is one aliased ``user`` field (``u0``, ``u1``, ...) of a single query, and
+batches are sized from an estimate of the nodes each user costs so one request stays well
+under GitHub's node limit and rate-limit cost. A batch GitHub still rejects for its size,
+or that times out, is split in half and retried. Users with more than one page of
+repositories get their remaining star pages through the same builder, again batched
+across users.
+"""
+
+from datetime import datetime, timezone
+
+import http_client
+
+
+ENDPOINT = "https://api.github.com/graphql"
+TIMEOUT = 20
+USER_AGENT = "ceilf6-readme-contribution-graph"
+METRICS = ("calendar", "stats")
+STARS_PAGE_SIZE = 100
+# GitHub rejects queries over 500,000 nodes and charges about one point per 100 nodes; a
+# contribution calendar is also slow to compute, so batches stay far below both limits.
+DEFAULT_MAX_NODES = 2_000
+DEFAULT_MAX_USERS = 20
+LIMIT_ERROR_TYPES = frozenset({"MAX_NODE_LIMIT_EXCEEDED", "RESOURCE_LIMITS_EXCEEDED", "TIMEOUT"})
+# A query that takes too long usually comes back as a bare 502/504 rather than a TIMEOUT error.
+TIMEOUT_STATUSES = frozenset({502, 504})
+
+CALENDAR_SELECTION = """
+    calendar: contributionsCollection(from: $from, to: $to) {
+      contributionCalendar {
+        totalContributions
+        weeks { firstDay contributionDays { date contributionCount } }
+      }
+    }"""
+STATS_SELECTION = """
+    year: contributionsCollection(from: $year) { totalCommitContributions restrictedContributionsCount }
+    pullRequests { totalCount }
+    issues { totalCount }
+    repositoriesContributedTo(contributionTypes: [COMMIT, ISSUE, PULL_REQUEST, REPOSITORY]) { totalCount }"""
+STARS_SELECTION = """
+    repositories(ownerAffiliations: OWNER, isFork: false, first: %d%s) {
+      nodes { stargazerCount }
+      pageInfo { hasNextPage endCursor }
+    }"""
+
+
+class GraphQLLimitError(RuntimeError):
+    """GitHub refused a query for its size or cost; a smaller batch may succeed."""
+
+
+def request_graphql(token, query, variables, snapshots=None, snapshot_name=None, batched=False):
+    """POST ``query`` and return the decoded payload, ``errors`` included.
+
+    Gateway timeouts raise ``GraphQLLimitError`` once the client gives up. A ``batched`` query
+    for several users gives up on its first gateway or client timeout, without counting it
+    against the host's breaker, since splitting the batch is the better retry; other
+    transient failures are retried as usual.
+    """
+    try:
+        response = http_client.post(
+            ENDPOINT,
+            json={"query": query, "variables": variables},
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "User-Agent": USER_AGENT,
+            },
+            timeout=TIMEOUT,
+            slow_statuses=TIMEOUT_STATUSES if batched else None,
+        )
+    except http_client.RetryableError as exc:
+        if isinstance(exc, http_client.SlowRequestError) or exc.status in TIMEOUT_STATUSES:
+            raise GraphQLLimitError(f"GitHub GraphQL API timed out the query: {exc}") from exc
+        raise
+    payload = response.json()
+    if snapshots is not None:
+        snapshots.record(snapshot_name, response.content, parse_failed=bool(payload.get("errors")))
+    return payload
+
+
+def raise_for_errors(errors):
+    if not errors:
+        return
+    messages = "; ".join(error.get("message", "unknown error") for error in errors)
+    if any(error.get("type") in LIMIT_ERROR_TYPES for error in errors):
+        raise GraphQLLimitError(f"GitHub GraphQL API rejected the query size: {messages}")
+    raise RuntimeError(f"GitHub GraphQL API returned errors: {messages}")
+
+
+def post_graphql(token, query, variables, snapshots=None, snapshot_name=None):
+    payload = request_graphql(token, query, variables, snapshots, snapshot_name)
+    raise_for_errors(payload.get("errors"))
+    return payload
+
+
+def year_start(now=None):
+    now = now or datetime.now(timezone.utc)
+    return f"{now.astimezone(timezone.utc).year}-01-01T00:00:00Z"
+
+
+def estimate_nodes(metrics):
+    """Nodes one aliased user adds to a query: the user itself plus a page of repositories."""
+    return 1 + (STARS_PAGE_SIZE if "stats" in metrics else 0)
+
+
+def plan_batches(logins, metrics, max_nodes=DEFAULT_MAX_NODES, max_users=DEFAULT_MAX_USERS):
+    size = max(1, min(max_users, max_nodes // estimate_nodes(metrics)))
+    return [logins[start:start + size] for start in range(0, len(logins), size)]
+
+
+def build_query(logins, metrics, cursors=None):
+    """Return the query text fetching ``metrics`` for each login under aliases ``u0``, ``u1``, ...
+
+    With ``cursors`` (one per login) only the repository stars are selected, continuing each
+    listing after its cursor.
+    """
+    parameters = [f"$l{index}: String!" for index in range(len(logins))]
+    if cursors is not None:
+        parameters += [f"$a{index}: String" for index in range(len(logins))]
+    else:
+        if "calendar" in metrics:
+            parameters += ["$from: DateTime!", "$to: DateTime!"]
+        if "stats" in metrics:
+            parameters.append("$year: DateTime!")
+
+    fields = []
+    for index in range(len(logins)):
+        if cursors is not None:
+            selection = STARS_SELECTION % (STARS_PAGE_SIZE, f", after: $a{index}")
+        else:
+            selection = CALENDAR_SELECTION if "calendar" in metrics else ""
+            if "stats" in metrics:
+                selection += STATS_SELECTION + STARS_SELECTION % (STARS_PAGE_SIZE, "")
+        fields.append(f"  u{index}: user(login: $l{index}) {{\n    login{selection}\n  }}")
+    return "query ProfileBatch(%s) {\n%s\n}\n" % (", ".join(parameters), "\n".join(fields))
+
+
+def build_variables(logins, metrics, window=None, now=None, cursors=None):
+    variables = {f"l{index}": login for index, login in enumerate(logins)}
+    if cursors is not None:
+        variables.update((f"a{index}", cursor) for index, cursor in enumerate(cursors))
+        return variables
+    if "calendar" in metrics:
+        variables.update({"from": window["from_datetime"], "to": window["to_datetime"]})
+    if "stats" in metrics:
+        variables["year"] = year_start(now)
+    return variables
+
+
+def run_batches(batches, run):
+    """Call ``run(batch)`` for each batch, halving any batch GitHub rejects for its size."""
+    results = {}
+    pending = list(batches)
+    while pending:
+        batch = pending.pop(0)
+        try:
+            results.update(run(batch) or {})
+        except GraphQLLimitError:
+            if len(batch) == 1:
+                raise
+            middle = len(batch) // 2
+            pending[:0] = [batch[:middle], batch[middle:]]
+    return results
+
+
+def _answer(payload, logins):
+    """Map each login to its aliased user (None when GitHub has no such user)."""
+    raise_for_errors([error for error in payload.get("errors") or [] if error.get("type") != "NOT_FOUND"])
+    data = payload.get("data") or {}
+    return {login: data.get(f"u{index}") for index, login in enumerate(logins)}
+
+
+def _profile(user, metrics):
+    profile = {}
+    if "calendar" in metrics:
+        profile["calendar"] = user["calendar"]["contributionCalendar"]
+    if "stats" in metrics:
+        year = user["year"]
+        profile["stats"] = {
+            "stars": sum(node["stargazerCount"] for node in user["repositories"]["nodes"]),
+            "commits": year["totalCommitContributions"] + year.get("restrictedContributionsCount", 0),
+            "prs": user["pullRequests"]["totalCount"],
+            "issues": user["issues"]["totalCount"],
+            "contributed_to": user["repositoriesContributedTo"]["totalCount"],
+        }
+    return profile
+
+
+def fetch_profiles(
+    logins,
+    token,
+    metrics=METRICS,
+    window=None,
+    now=None,
+    snapshots=None,
+    snapshot_name="github-profiles-graphql",
+    max_nodes=DEFAULT_MAX_NODES,
+    max_users=DEFAULT_MAX_USERS,
+):
+    """Return ``{login: {"calendar": ..., "stats": ...}}`` (None for unknown users).
+
+    ``calendar`` is the raw ``contributionCalendar`` for ``window``; ``stats`` holds the stats
+    card numbers, with commits counted from January 1 of ``now``'s year.
+    """
+    logins = list(dict.fromkeys(logins))
+    profiles = {}
+    cursors = {}
+
+    def run(batch):
+        variables = build_variables(batch, metrics, window, now)
+        payload = request_graphql(
+            token, build_query(batch, metrics), variables, snapshots, snapshot_name, batched=len(batch) > 1
+        )
+        found = {}
+        for login, user in _answer(payload, batch).items():
+            found[login] = None if user is None else _profile(user, metrics)
+            if user is not None and "stats" in metrics and user["repositories"]["pageInfo"]["hasNextPage"]:
+                cursors[login] = user["repositories"]["pageInfo"]["endCursor"]
+        return found
+
+    profiles.update(run_batches(plan_batches(logins, metrics, max_nodes, max_users), run))
+
+    def run_stars(batch):
+        after = [cursors[login] for login in batch]
+        variables = build_variables(batch, metrics, cursors=after)
+        payload = request_graphql(token, build_query(batch, metrics, after), variables, batched=len(batch) > 1)
+        for login, user in _answer(payload, batch).items():
+            repositories = user["repositories"]
+            profiles[login]["stats"]["stars"] += sum(node["stargazerCount"] for node in repositories["nodes"])
+            if repositories["pageInfo"]["hasNextPage"]:
+                cursors[login] = repositories["pageInfo"]["endCursor"]
+            else:
+                del cursors[login]
+
+    while cursors:
+        run_batches(plan_batches(list(cursors), ("stats",), max_nodes, max_users), run_stars)
+    return profiles
+
+
+def profile_stats(login, token, now=None, snapshots=None):
+    """Return the stats card numbers for ``login``."""
+    profile = fetch_profiles(
+        [login], token, ("stats",), now=now, snapshots=snapshots, snapshot_name="github-profile-stats"
+    )
+    if profile[login] is None:
+        raise RuntimeError(f"GitHub GraphQL response has no user {login}")
+    return profile[login]["stats"]
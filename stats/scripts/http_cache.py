@@ -0,0 +1,74 @@
+"""On-disk ETag / Last-Modified validator cache for conditional upstream fetches."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import http_client
+
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".cache" / "http-validators.json"
+VALIDATOR_HEADERS = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+# Fetchers running in one orchestrated process share the cache file.
+_write_lock = threading.Lock()
+
+
+class ValidatorCache:
+    """Validators keyed by URL, persisted only once the caller has published the response."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.entries = self._read()
+        self.pending = {}
+
+    def _read(self):
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def headers_for(self, url):
+        entry = self.entries.get(url, {})
+        return {
+            request_header: entry[response_header]
+            for response_header, request_header in VALIDATOR_HEADERS.items()
+            if entry.get(response_header)
+        }
+
+    def observe(self, url, response):
+        entry = {name: response.headers[name] for name in VALIDATOR_HEADERS if response.headers.get(name)}
+        if entry:
+            self.pending[url] = entry
+
+    def commit(self, url):
+        """Persist the validators seen for ``url``; call after its output was written."""
+        entry = self.pending.pop(url, None)
+        if entry is None:
+            return
+        self.entries[url] = entry
+        with _write_lock:
+            merged = self._read()
+            merged[url] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, delete=False) as handle:
+                json.dump(merged, handle, ensure_ascii=False, indent=2, sort_keys=True)
+                handle.write("\n")
+                temporary_path = Path(handle.name)
+            os.replace(temporary_path, self.path)
+
+
+def conditional_get(url, cache, conditional=True, **kwargs):
+    """GET ``url`` with stored validators; return None when the upstream answers 304."""
+    headers = dict(kwargs.pop("headers", None) or {})
+    if cache is not None and conditional:
+        headers.update(cache.headers_for(url))
+    response = http_client.get(url, headers=headers, **kwargs)
+    if response.status_code == 304:
+        return None
+    if cache is not None:
+        cache.observe(url, response)
+    return response
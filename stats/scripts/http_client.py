@@ -0,0 +1,295 @@
+"""Shared HTTP client for the stats fetchers: pooled keep-alive sessions and one retry policy.
+
+Every attempt also passes a per-host token bucket (when the host has a ``rate`` configured)
+and a circuit breaker. A breaker opens after ``threshold`` consecutive failed attempts, or
+when a caller ``trip``s it, and then fails calls immediately with ``CircuitOpenError``
+until ``cooldown`` seconds have passed; one probe is let through after that.
+
+When ``cassette.active()`` selects a cassette, responses are recorded into it or replayed
+from it (see ``cassette``); replay sends nothing and skips rate limiting and backoff sleeps.
+"""
+
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import cassette
+import rate_limit
+
+
+DEFAULT_TIMEOUT = 20
+DEFAULT_ATTEMPTS = 3
+# Wall-clock cap across every attempt and backoff sleep of a single call.
+DEFAULT_BUDGET = 60
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 15.0
+POOL_SIZE = 8
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Not retried, but they mean the host is refusing us, so they count against the breaker.
+REJECT_STATUSES = frozenset({401, 403, 412})
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 60.0
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_policies = {}
+_limiters = {}
+_breakers = {}
+_guards_lock = threading.Lock()
+
+
+class RetryableError(Exception):
+    """Raised by a response check to ask for another attempt; ``status`` is set for retried HTTP statuses."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class SlowRequestError(RetryableError):
+    """The request itself took too long; a cheaper request may succeed where a retry would not."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without sending anything while a host's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name, threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN, clock=time.monotonic):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._reason = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def before(self):
+        """Raise ``CircuitOpenError`` unless a request may be sent now; True when this is the half-open probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            remaining = self.cooldown - (self._clock() - self._opened_at)
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(
+                    f"Circuit for {self.name} is open ({self._reason}); failing fast for {max(remaining, 0):.0f}s"
+                )
+            self._probing = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self, reason):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold or self._opened_at is not None:
+                self._open(reason)
+
+    def settle(self):
+        """End a half-open probe that neither succeeded nor failed in a way that counts."""
+        with self._lock:
+            self._probing = False
+
+    def trip(self, reason):
+        with self._lock:
+            self._open(reason)
+
+    def _open(self, reason):
+        self._opened_at = self._clock()
+        self._probing = False
+        self._reason = reason
+
+
+def _requests():
+    try:
+        import requests
+    except ImportError as exc:
+        raise RuntimeError("Missing Python dependency: requests") from exc
+    return requests
+
+
+def session_for(url):
+    """Return the process-wide keep-alive session for the URL's host."""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            requests = _requests()
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def configure(name, rate=None, burst=1, threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN):
+    """Set the request budget (``rate`` per second, ``burst``) and breaker policy for a host or scope."""
+    with _guards_lock:
+        _policies[name] = {"rate": rate, "burst": burst, "threshold": threshold, "cooldown": cooldown}
+        _limiters.pop(name, None)
+        _breakers.pop(name, None)
+
+
+def limiter_for(host):
+    with _guards_lock:
+        if host not in _limiters:
+            rate = _policies.get(host, {}).get("rate")
+            _limiters[host] = rate_limit.TokenBucket(rate, _policies[host]["burst"]) if rate else None
+        return _limiters[host]
+
+
+def breaker_for(name):
+    """Return the breaker called ``name``: a host, or a caller-chosen scope such as an auth realm."""
+    with _guards_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            policy = _policies.get(name, {})
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                threshold=policy.get("threshold", DEFAULT_FAILURE_THRESHOLD),
+                cooldown=policy.get("cooldown", DEFAULT_COOLDOWN),
+            )
+        return breaker
+
+
+def trip(name, reason):
+    """Open breaker ``name`` now, e.g. after an auth error that every later call would repeat."""
+    breaker_for(name).trip(reason)
+
+
+def admit(breakers):
+    """Pass every breaker or none: a probe already started is settled when a later breaker is open."""
+    probes = []
+    try:
+        for breaker in breakers:
+            if breaker.before():
+                probes.append(breaker)
+    except CircuitOpenError:
+        for breaker in probes:
+            breaker.settle()
+        raise
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff for the given zero-based retry number."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_delay(response):
+    value = response.headers.get("Retry-After", "") if response is not None else ""
+    return float(value) if value.strip().isdigit() else None
+
+
+def request(
+    method,
+    url,
+    *,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    attempts=DEFAULT_ATTEMPTS,
+    budget=DEFAULT_BUDGET,
+    check=None,
+    retry_on=(),
+    scope=None,
+    slow_statuses=None,
+    **kwargs,
+):
+    """Send a request with pooled connections, retrying transient failures with jittered backoff.
+
+    Connection errors, timeouts, ``RETRY_STATUSES`` and ``RetryableError`` raised by ``check``
+    are retried until ``attempts`` or the ``budget`` in seconds runs out, as are any extra
+    exception types listed in ``retry_on``; any other HTTP error is raised immediately.
+    ``session`` overrides the pooled per-host session (for example a cloudscraper instance).
+    ``scope`` names an extra breaker checked alongside the host's, for failures that only
+    affect some calls (such as expired cookies). With ``slow_statuses``, a read timeout or
+    one of those statuses means the request itself is too slow: it raises ``SlowRequestError``
+    at once, without a retry or a breaker failure, so the caller can send a cheaper request.
+    Extra keyword arguments are passed to ``Session.request``.
+    """
+    requests = _requests()
+    host = urlsplit(url).netloc
+    session = session or session_for(url)
+    breakers = [breaker_for(host)] + ([breaker_for(scope)] if scope else [])
+    tape = cassette.active()
+    replaying = tape is not None and tape.mode == "replay"
+    limiter = None if replaying else limiter_for(host)
+    body = kwargs.get("json", kwargs.get("data"))
+    deadline = time.monotonic() + budget
+    last_error = None
+
+    for attempt in range(attempts):
+        admit(breakers)
+        if limiter is not None:
+            limiter.acquire()
+        response = None
+        remaining = deadline - time.monotonic()
+        try:
+            if replaying:
+                response = tape.replay(method, url, kwargs.get("params"), body)
+            else:
+                response = session.request(method, url, timeout=max(1, min(timeout, remaining)), **kwargs)
+                if tape is not None:
+                    tape.record(method, url, kwargs.get("params"), response, body)
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableError(f"HTTP {response.status_code} from {url}", response.status_code)
+            if response.status_code in REJECT_STATUSES:
+                for breaker in breakers:
+                    breaker.failure(f"HTTP {response.status_code}")
+            response.raise_for_status()
+            if check is not None:
+                check(response)
+            for breaker in breakers:
+                breaker.success()
+            return response
+        except (RetryableError, requests.ConnectionError, requests.Timeout, *retry_on) as exc:
+            status = getattr(exc, "status", None)
+            if slow_statuses is not None and (isinstance(exc, requests.ReadTimeout) or status in slow_statuses):
+                for breaker in breakers:
+                    breaker.settle()
+                raise SlowRequestError(f"{url} was too slow: {exc}", status) from exc
+            last_error = exc
+            for breaker in breakers:
+                breaker.failure(type(exc).__name__)
+        except BaseException:
+            for breaker in breakers:
+                breaker.settle()
+            raise
+
+        if attempt == attempts - 1:
+            break
+        delay = retry_after_delay(response)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        if replaying:
+            delay = 0
+        if time.monotonic() + delay >= deadline:
+            print(f"Retry budget for {url} exhausted after {attempt + 1} attempts", file=sys.stderr)
+            break
+        print(
+            f"Attempt {attempt + 1}/{attempts} for {url} failed ({last_error}); retrying in {delay:.1f}s",
+            file=sys.stderr,
+        )
+        time.sleep(delay)
+
+    raise last_error
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
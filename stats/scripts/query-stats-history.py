@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Query the append-only stats history for a field's growth or its full trend series.
+
+Prints JSON: the growth summary (delta, days, per-day and percent change) over the
+selected range, plus every ``[at, value]`` point when ``--series`` is given.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import stats_history
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Query the append-only stats history.")
+    parser.add_argument("source", help="History source, e.g. bilibili, csdn or huggingface.")
+    parser.add_argument("field", help="Field to query, e.g. followers or views.")
+    parser.add_argument("--since", help="First day or timestamp to include (inclusive).")
+    parser.add_argument("--until", help="Last day or timestamp to include (inclusive).")
+    parser.add_argument("--series", action="store_true", help="Also print every sample in range.")
+    parser.add_argument("--root", type=Path, default=stats_history.DEFAULT_ROOT)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    store = stats_history.HistoryStore(args.root)
+    if not store.path(args.source).exists():
+        print(f"Error: no history for {args.source} in {args.root}", file=sys.stderr)
+        return 1
+
+    result = {"source": args.source, "field": args.field}
+    result["growth"] = store.growth(args.source, args.field, args.since, args.until)
+    if args.series:
+        result["series"] = store.series(args.source, args.field, args.since, args.until)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
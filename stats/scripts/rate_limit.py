@@ -0,0 +1,36 @@
+"""Thread-safe token bucket for pacing requests to one upstream host."""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second on average with bursts of up to ``capacity``.
+
+    ``acquire`` reserves a token under the lock and sleeps outside it, so concurrent
+    callers are released in the order they asked, each one ``1 / rate`` seconds apart
+    once the burst is spent.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available; return the seconds spent waiting."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
@@ -0,0 +1,103 @@
+"""Skip re-rendering SVG assets whose inputs have not changed since the last run.
+
+Each output is keyed by a SHA-256 over everything that shapes it: the data it renders, the
+layout/theme config and the generator source files, so editing a generator invalidates
+its entries. The manifest also stores a hash of the written file; an output that was
+edited or deleted since is rendered again. When the manifest is missing (for example on a
+cold CI cache) outputs are re-rendered, but a file whose bytes come out identical is
+still left untouched.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MANIFEST = Path(__file__).resolve().parent.parent / ".cache" / "render-manifest.json"
+
+
+def render_key(*parts):
+    """Hash ``parts``: Paths are read as bytes, dicts/lists as canonical JSON, str as UTF-8."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, Path):
+            part = part.read_bytes()
+        elif isinstance(part, (dict, list, tuple)):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False, default=list).encode("utf-8")
+        elif isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def write_if_changed(path, content):
+    """Write ``content`` unless ``path`` already holds exactly it; return True when written."""
+    path = Path(path)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+class RenderCache:
+    def __init__(self, path=DEFAULT_MANIFEST):
+        self.path = Path(path)
+        self.entries = self._read()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _name(self, output):
+        output = Path(output).resolve()
+        try:
+            return output.relative_to(REPO_ROOT).as_posix()
+        except ValueError:
+            return output.as_posix()
+
+    def is_fresh(self, output, key):
+        entry = self.entries.get(self._name(output))
+        if not entry or entry.get("key") != key:
+            return False
+        try:
+            return hashlib.sha256(Path(output).read_bytes()).hexdigest() == entry.get("sha256")
+        except OSError:
+            return False
+
+    def record(self, output, key):
+        sha256 = hashlib.sha256(Path(output).read_bytes()).hexdigest()
+        with self._lock:
+            self.entries[self._name(output)] = {"key": key, "sha256": sha256}
+            self.dirty = True
+
+    def save(self):
+        """Persist the manifest, dropping entries whose output no longer exists."""
+        if not self.dirty:
+            return
+        entries = {
+            name: entry
+            for name, entry in sorted(self.entries.items())
+            if (REPO_ROOT / name if not Path(name).is_absolute() else Path(name)).exists()
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, delete=False) as handle:
+            json.dump(entries, handle, ensure_ascii=False, indent=2)
+            handle.write("\n")
+            temporary_path = Path(handle.name)
+        os.replace(temporary_path, self.path)
+        self.dirty = False
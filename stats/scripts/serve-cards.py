@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Serve the profile cards over HTTP from memory and refresh their sources in the background.
+
+Each source (blog, vlog, Hugging Face, GitHub stats, contribution graph) is fetched and
+rendered on a background schedule. The results are kept in a ``CardStore`` as finished
+bytes with a strong ETag. Requests only look the card up, so they never touch disk or
+render anything, and ``If-None-Match`` revalidations are answered with 304. A source that
+fails keeps serving its last good card.
+
+Cards are served at the asset file names (``/blog-card.svg``, ``/github-contribution-graph.svg``,
+...). ``/`` lists them and ``/healthz`` reports the last refresh of every source.
+
+``--data-dir`` swaps the live fetchers for the JSON files the fetch scripts write
+(``csdn-stats.json``, ``bilibili-stats.json``, ``huggingface-stats.json``,
+``github-contributions.json`` and an optional ``github-stats.json`` of GraphQL profile stats).
+The live fetchers also honour ``STATS_HTTP_MODE=replay``, so the server runs fully offline.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import contribution_store
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_LAYOUTS = SCRIPTS_DIR.parent / "config" / "contribution-graph-layouts.json"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+DEFAULT_INTERVAL = 3600
+DEFAULT_MAX_AGE = 300
+SVG_CONTENT_TYPE = "image/svg+xml; charset=utf-8"
+DATA_FILES = {
+    "blog": "csdn-stats.json",
+    "vlog": "bilibili-stats.json",
+    "huggingface": "huggingface-stats.json",
+    "github-stats": "github-stats.json",
+    "contributions": "github-contributions.json",
+}
+
+
+def load_script(filename):
+    """Import a hyphen-named sibling script as a module."""
+    path = SCRIPTS_DIR / filename
+    spec = importlib.util.spec_from_file_location(path.stem.replace("-", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CardStore:
+    """Rendered cards by name, each as ``{"body", "etag", "last_modified"}``; replaced, never mutated."""
+
+    def __init__(self):
+        self._cards = {}
+        self._lock = threading.Lock()
+
+    def put(self, name, svg):
+        """Store ``svg`` under ``name``; return False when the bytes are unchanged."""
+        body = svg.encode("utf-8") if isinstance(svg, str) else bytes(svg)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+        with self._lock:
+            current = self._cards.get(name)
+            if current is not None and current["etag"] == etag:
+                return False
+            self._cards[name] = {"body": body, "etag": etag, "last_modified": formatdate(usegmt=True)}
+            return True
+
+    def get(self, name):
+        with self._lock:
+            return self._cards.get(name)
+
+    def names(self):
+        with self._lock:
+            return sorted(self._cards)
+
+
+def build_renderers(layouts=DEFAULT_LAYOUTS):
+    """Return ``{source: render(data) -> {card_name: svg}}`` using the existing generators.
+
+    The contribution graph is rendered once per entry of the ``layouts`` config, named after
+    the entry's output file.
+    """
+    cards = load_script("generate-svg-cards.py")
+    graph = load_script("generate-github-contribution-graph.py")
+    stats_card = load_script("fetch-github-stats-card.py")
+    graph_layouts = [(output.stem, layout) for output, layout in graph.load_layouts(layouts)]
+
+    def render_stats_card(data):
+        # GraphQL profile stats render locally; upstream SVG bytes go through the rewriter.
+        if isinstance(data, dict):
+            return {"github-stats-card": stats_card.render_local_card(data)}
+        return {"github-stats-card": stats_card.render_card(data)}
+
+    def render_graph(data):
+        return {name: graph.render_svg(data, layout) for name, layout in graph_layouts}
+
+    return {
+        "blog": lambda stats: {"blog-card": cards.generate_blog_card(stats)},
+        "vlog": lambda stats: {"vlog-card": cards.generate_vlog_card(stats)},
+        "huggingface": lambda stats: {"huggingface-card": cards.generate_huggingface_card(stats)},
+        "github-stats": render_stats_card,
+        "contributions": render_graph,
+    }
+
+
+def file_fetchers(data_dir):
+    """Fetchers that read the fetch scripts' JSON output; sources without a file are left out."""
+    data_dir = Path(data_dir)
+    fetchers = {}
+    for source, filename in DATA_FILES.items():
+        path = data_dir / filename
+        if not path.exists():
+            continue
+        if source == "contributions":
+            fetchers[source] = lambda path=path: contribution_store.load(path)
+        else:
+            fetchers[source] = lambda path=path: json.loads(path.read_text(encoding="utf-8"))
+    return fetchers
+
+
+def live_fetchers():
+    """Fetchers that call the upstream APIs through the existing fetch scripts."""
+    token = os.environ.get("GH_PROFILE_TOKEN", "").strip()
+    bilibili = load_script("fetch-bilibili-stats-1.py")
+    csdn = load_script("fetch-csdn-stats-2.py")
+    huggingface = load_script("fetch-huggingface-stats.py")
+    stats_card = load_script("fetch-github-stats-card.py")
+    contributions = load_script("fetch-github-contributions.py")
+
+    def fetch_csdn():
+        stats = csdn.fetch_csdn_stats()
+        if not stats:
+            raise RuntimeError("Failed to fetch CSDN data")
+        return stats
+
+    def fetch_bilibili():
+        followers = bilibili.fetch_follower_count()
+        views, likes, creations = bilibili.fetch_login_stats()
+        stats = {"followers": followers, "views": views, "likes": likes, "creations": creations}
+        if all(value is None for value in stats.values()):
+            raise RuntimeError("Failed to fetch any Bilibili data")
+        return {field: value for field, value in stats.items() if value is not None}
+
+    def fetch_huggingface():
+        return huggingface.build_stats(huggingface.load_source(None, huggingface.DEFAULT_URL))
+
+    def fetch_github_stats():
+        if token:
+            return stats_card.fetch_profile_stats(stats_card.DEFAULT_USERNAME, token)
+        return stats_card.load_source(None, stats_card.DEFAULT_URL)
+
+    def fetch_contributions():
+        window = contributions.determine_window()
+        return contributions.fetch_calendar(contributions.DEFAULT_USERNAME, window, token, public_fallback=not token)
+
+    return {
+        "blog": fetch_csdn,
+        "vlog": fetch_bilibili,
+        "huggingface": fetch_huggingface,
+        "github-stats": fetch_github_stats,
+        "contributions": fetch_contributions,
+    }
+
+
+class CardService:
+    """Fetch and render every source into ``store``, now and then every ``interval`` seconds."""
+
+    def __init__(self, fetchers, renderers, store=None, interval=DEFAULT_INTERVAL, workers=4):
+        self.fetchers = fetchers
+        self.renderers = renderers
+        self.store = store or CardStore()
+        self.interval = interval
+        self.workers = workers
+        self.status = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh_source(self, name):
+        started = time.monotonic()
+        try:
+            rendered = self.renderers[name](self.fetchers[name]())
+            changed = [card for card, svg in rendered.items() if self.store.put(card, svg)]
+            status = {"ok": True, "cards": sorted(rendered), "changed": changed}
+        except Exception as exc:
+            print(f"[{name}] refresh failed: {exc}", file=sys.stderr)
+            traceback.print_exc()
+            status = {"ok": False, "error": str(exc)}
+        status.update(at=formatdate(usegmt=True), seconds=round(time.monotonic() - started, 3))
+        self.status[name] = status
+        return status
+
+    def refresh_all(self):
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            return dict(zip(self.fetchers, executor.map(self.refresh_source, list(self.fetchers))))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh_all()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="card-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def etag_matches(header, etag):
+    if header is None:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def make_handler(service, max_age=DEFAULT_MAX_AGE):
+    store = service.store
+
+    class CardHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "ceilf6-cards"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, status, body, content_type, headers=(), include_body=True):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if include_body:
+                self.wfile.write(body)
+
+        def send_json(self, status, data, include_body=True):
+            body = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+            self.send_body(status, body, "application/json; charset=utf-8", [("Cache-Control", "no-store")], include_body)
+
+        def serve(self, include_body):
+            path = self.path.split("?", 1)[0]
+            if path == "/":
+                return self.send_json(200, {"cards": [f"/{name}.svg" for name in store.names()]}, include_body)
+            if path == "/healthz":
+                healthy = bool(service.status) and all(status["ok"] for status in service.status.values())
+                return self.send_json(200 if healthy else 503, {"sources": service.status}, include_body)
+
+            card = store.get(path[1:-4]) if path.endswith(".svg") else None
+            if card is None:
+                return self.send_json(404, {"error": f"no card at {path}"}, include_body)
+            headers = [
+                ("ETag", card["etag"]),
+                ("Last-Modified", card["last_modified"]),
+                ("Cache-Control", f"public, max-age={max_age}"),
+            ]
+            if etag_matches(self.headers.get("If-None-Match"), card["etag"]):
+                self.send_response(304)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                return None
+            return self.send_body(200, card["body"], SVG_CONTENT_TYPE, headers, include_body)
+
+        def do_GET(self):
+            self.serve(include_body=True)
+
+        def do_HEAD(self):
+            self.serve(include_body=False)
+
+    return CardHandler
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Serve the profile cards from memory.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Seconds between source refreshes.")
+    parser.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE, help="Cache-Control max-age for cards.")
+    parser.add_argument("--data-dir", type=Path, help="Read stats JSON files from here instead of fetching live.")
+    parser.add_argument("--layouts", type=Path, default=DEFAULT_LAYOUTS, help="Contribution graph layout config.")
+    parser.add_argument("--only", action="append", choices=sorted(DATA_FILES), help="Serve only this source (repeatable).")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    fetchers = file_fetchers(args.data_dir) if args.data_dir else live_fetchers()
+    if args.only:
+        fetchers = {name: fetch for name, fetch in fetchers.items() if name in args.only}
+    if not fetchers:
+        print("Error: no card sources to serve", file=sys.stderr)
+        return 1
+
+    service = CardService(fetchers, build_renderers(args.layouts), interval=args.interval)
+    for name, status in service.refresh_all().items():
+        print(f"  {name}: {'ok' if status['ok'] else 'failed'} in {status['seconds']}s")
+    service.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.max_age))
+    print(f"Serving {len(service.store.names())} cards on http://{args.host}:{server.server_port}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
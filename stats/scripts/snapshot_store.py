@@ -0,0 +1,105 @@
+"""Compressed, content-addressed archive of raw upstream responses for debugging the fetchers.
+
+A response is archived only when it differs from the source's previous snapshot or when
+parsing it failed, so unchanged daily runs write nothing. Objects are gzip files named by
+their SHA-256 and shared between runs; ``index.json`` maps each run timestamp to the
+snapshot it produced, and only the newest ``retention`` runs per source are kept.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent / ".cache" / "snapshots"
+DEFAULT_RETENTION = 20
+# One timestamp per process, so every source fetched in the same run shares it.
+RUN_AT = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+_index_lock = threading.Lock()
+
+
+class SnapshotStore:
+    def __init__(self, root=DEFAULT_ROOT, retention=DEFAULT_RETENTION):
+        self.root = Path(root)
+        self.retention = retention
+
+    @property
+    def index_path(self):
+        return self.root / "index.json"
+
+    def object_path(self, digest):
+        return self.root / "objects" / digest[:2] / f"{digest}.gz"
+
+    def read_index(self):
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"runs": []}
+        return index if isinstance(index.get("runs"), list) else {"runs": []}
+
+    def latest(self, source):
+        for run in reversed(self.read_index()["runs"]):
+            if run["source"] == source:
+                return run
+        return None
+
+    def load(self, digest):
+        return gzip.decompress(self.object_path(digest).read_bytes())
+
+    def record(self, source, content, parse_failed=False, run_at=None):
+        """Archive ``content`` for ``source``; return the index entry, or None if unchanged."""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+
+        with _index_lock:
+            index = self.read_index()
+            previous = next((run for run in reversed(index["runs"]) if run["source"] == source), None)
+            if not parse_failed and previous is not None and previous["sha256"] == digest:
+                return None
+
+            path = self.object_path(digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._write(path, gzip.compress(content, mtime=0))
+
+            entry = {
+                "run_at": run_at or RUN_AT,
+                "source": source,
+                "sha256": digest,
+                "bytes": len(content),
+                "reason": "parse-failed" if parse_failed else "changed",
+            }
+            index["runs"].append(entry)
+            self._prune(index)
+            self._write(self.index_path, (json.dumps(index, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+        print(f"Snapshot {source} ({entry['reason']}) archived as {digest[:12]}")
+        return entry
+
+    def _prune(self, index):
+        kept = []
+        per_source = {}
+        for run in reversed(index["runs"]):
+            count = per_source.get(run["source"], 0)
+            if count < self.retention:
+                kept.append(run)
+            per_source[run["source"]] = count + 1
+        kept.reverse()
+        referenced = {run["sha256"] for run in kept}
+        for run in index["runs"]:
+            if run["sha256"] not in referenced:
+                self.object_path(run["sha256"]).unlink(missing_ok=True)
+        index["runs"] = kept
+
+    def _write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile("wb", dir=path.parent, delete=False) as handle:
+            handle.write(data)
+            temporary_path = Path(handle.name)
+        os.replace(temporary_path, path)
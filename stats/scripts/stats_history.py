@@ -0,0 +1,114 @@
+"""Append-only history of every successful stats fetch, one JSON Lines file per source.
+
+Each line is ``{"at": "YYYY-MM-DDTHH:MM:SSZ", <field>: <int>, ...}`` with ``at`` first and
+fixed width, and lines are only ever appended in time order. Range queries therefore
+bisect on the raw line prefixes and decode just the lines inside the range, so reads
+stay cheap as years of daily samples accumulate. The files are plain text under
+``stats/data/history`` and are committed with the rest of the data.
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent / "data" / "history"
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# '{"at":"' precedes the 20-character timestamp on every line.
+AT_SLICE = slice(7, 27)
+
+
+def utc_timestamp(moment=None):
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def _bound(value, upper):
+    """Widen a ``YYYY-MM-DD`` bound to the whole day; pass full timestamps through."""
+    if value is None or len(value) > 10:
+        return value
+    return value + ("T23:59:59Z" if upper else "T00:00:00Z")
+
+
+class HistoryStore:
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+        self._lines = {}
+
+    def path(self, source):
+        return self.root / f"{source}.jsonl"
+
+    def _load(self, source):
+        path = self.path(source)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return [], []
+        cached = self._lines.get(source)
+        if cached is None or cached[0] != (stat.st_mtime_ns, stat.st_size):
+            lines = path.read_bytes().decode("utf-8").splitlines()
+            cached = ((stat.st_mtime_ns, stat.st_size), lines, [line[AT_SLICE] for line in lines])
+            self._lines[source] = cached
+        return cached[1], cached[2]
+
+    def append(self, source, values, at=None):
+        """Record the integer fields of ``values`` as one sample; return the written sample."""
+        at = at or utc_timestamp()
+        sample = {"at": at}
+        sample.update(
+            (field, value)
+            for field, value in values.items()
+            if isinstance(value, int) and not isinstance(value, bool)
+        )
+        _, stamps = self._load(source)
+        if stamps and at < stamps[-1]:
+            raise ValueError(f"History for {source} already has a sample after {at}")
+
+        path = self.path(source)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(sample, ensure_ascii=False, separators=(",", ":")) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        return sample
+
+    def samples(self, source, start=None, end=None):
+        """Return the samples whose ``at`` falls within ``[start, end]`` (dates or timestamps)."""
+        lines, stamps = self._load(source)
+        start, end = _bound(start, False), _bound(end, True)
+        low = bisect_left(stamps, start) if start else 0
+        high = bisect_right(stamps, end) if end else len(stamps)
+        return [json.loads(line) for line in lines[low:high]]
+
+    def series(self, source, field, start=None, end=None):
+        return [(sample["at"], sample[field]) for sample in self.samples(source, start, end) if field in sample]
+
+    def delta(self, source, field, start=None, end=None):
+        """Change of ``field`` between the first and last sample in range, or None."""
+        points = self.series(source, field, start, end)
+        if not points:
+            return None
+        return points[-1][1] - points[0][1]
+
+    def growth(self, source, field, start=None, end=None):
+        """Summarise ``field`` over the range: delta, days covered, per-day and percent growth."""
+        points = self.series(source, field, start, end)
+        if not points:
+            return None
+        (first_at, first), (last_at, last) = points[0], points[-1]
+        days = (
+            datetime.strptime(last_at, TIMESTAMP_FORMAT) - datetime.strptime(first_at, TIMESTAMP_FORMAT)
+        ).total_seconds() / 86400
+        delta = last - first
+        return {
+            "from": first_at,
+            "to": last_at,
+            "start": first,
+            "end": last,
+            "delta": delta,
+            "days": round(days, 3),
+            "per_day": round(delta / days, 3) if days else None,
+            "percent": round(delta / first * 100, 3) if first else None,
+        }
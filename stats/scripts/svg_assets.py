@@ -0,0 +1,93 @@
+"""Extract path data from the SVG marks in ``stats/svg`` once and reuse it across runs.
+
+``AssetRegistry.paths`` returns the whitespace-normalised ``d`` of every ``<path>`` in a
+source file. Results are memoised in-process and cached on disk next to the file's mtime,
+size and SHA-256: an unchanged mtime and size skip reading the file, and a touched file
+whose bytes still match the hash is not parsed again. Entries also record a hash of this
+module, so a change to the extraction reparses every file.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SVG_DIR = Path(__file__).resolve().parent.parent / "svg"
+DEFAULT_CACHE = Path(__file__).resolve().parent.parent / ".cache" / "svg-assets.json"
+EXTRACTOR = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def extract_paths(data):
+    """Return the normalised ``d`` attribute of every path element in SVG ``data``."""
+    root = ElementTree.fromstring(data)
+    return tuple(
+        " ".join(node.get("d", "").split())
+        for node in root.iter()
+        if node.tag.rsplit("}", 1)[-1] == "path" and node.get("d")
+    )
+
+
+class AssetRegistry:
+    def __init__(self, path=DEFAULT_CACHE):
+        self.path = Path(path)
+        self.entries = self._read()
+        self.dirty = False
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _name(self, source):
+        try:
+            return source.relative_to(REPO_ROOT).as_posix()
+        except ValueError:
+            return source.as_posix()
+
+    def paths(self, source):
+        source = Path(source).resolve()
+        name = self._name(source)
+        with self._lock:
+            if name in self._memo:
+                return self._memo[name]
+
+            stat = source.stat()
+            entry = self.entries.get(name)
+            if entry and entry.get("extractor") != EXTRACTOR:
+                entry = None
+            if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                paths = tuple(entry["paths"])
+            else:
+                data = source.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                paths = tuple(entry["paths"]) if entry and entry.get("sha256") == digest else extract_paths(data)
+                self.entries[name] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha256": digest,
+                    "extractor": EXTRACTOR,
+                    "paths": list(paths),
+                }
+                self.dirty = True
+            self._memo[name] = paths
+            return paths
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, delete=False) as handle:
+            json.dump(dict(sorted(self.entries.items())), handle, ensure_ascii=False, indent=2)
+            handle.write("\n")
+            temporary_path = Path(handle.name)
+        os.replace(temporary_path, self.path)
+        self.dirty = False
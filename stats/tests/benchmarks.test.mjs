@@ -0,0 +1,37 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import { mkdtempSync, readFileSync, writeFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import test from "node:test";
+
+const repoRoot = new URL("../../", import.meta.url);
+const suite = new URL("../benchmarks/run-benchmarks.py", import.meta.url);
+
+function runSuite(args) {
+  return spawnSync("python3", [suite.pathname, "--only", "card-blog", "--only", "csdn-parse", "--repeat", "1", ...args], {
+    cwd: repoRoot,
+    encoding: "utf8",
+  });
+}
+
+test("benchmark suite stores baselines and fails on regressions past the threshold", () => {
+  const baselines = join(mkdtempSync(join(tmpdir(), "stats-bench-")), "baselines.json");
+
+  const update = runSuite(["--baselines", baselines, "--update"]);
+  assert.equal(update.status, 0, update.stderr);
+  const stored = JSON.parse(readFileSync(baselines, "utf8"));
+  assert.deepEqual(Object.keys(stored.benchmarks).sort(), ["card-blog", "csdn-parse"]);
+  assert.ok(stored.benchmarks["csdn-parse"].peak_bytes > 0);
+
+  const check = runSuite(["--baselines", baselines, "--time-threshold", "100"]);
+  assert.equal(check.status, 0, check.stderr);
+  assert.match(check.stdout, /csdn-parse .* ms .*% time, .*% memory\)/);
+
+  stored.benchmarks["csdn-parse"].peak_bytes = 1;
+  writeFileSync(baselines, JSON.stringify(stored));
+  const regressed = runSuite(["--baselines", baselines, "--time-threshold", "100"]);
+  assert.equal(regressed.status, 1);
+  assert.match(regressed.stderr, /csdn-parse: peak \d+ B vs baseline 1 B/);
+  assert.doesNotMatch(regressed.stderr, /card-blog/);
+});
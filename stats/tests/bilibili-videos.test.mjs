@@ -0,0 +1,138 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import { existsSync, mkdtempSync, readFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import test from "node:test";
+
+const repoRoot = new URL("../../", import.meta.url);
+const crawlerScript = new URL("../scripts/fetch-bilibili-videos.py", import.meta.url);
+
+test("WBI signing matches the documented reference vector", () => {
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import importlib.util, json, os, sys",
+        "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+        "spec = importlib.util.spec_from_file_location('videos', sys.argv[1])",
+        "videos = importlib.util.module_from_spec(spec)",
+        "spec.loader.exec_module(videos)",
+        "key = videos.mixin_key('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45')",
+        "print(json.dumps([key, videos.sign_params({'foo': '114', 'bar': '514', 'zab': 1919810}, key, wts=1702204169)]))",
+      ].join("\n"),
+      crawlerScript.pathname,
+    ],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+
+  assert.equal(result.status, 0, result.stderr);
+  const [key, signed] = JSON.parse(result.stdout);
+  assert.equal(key, "ea1db124af3c7062474693fa704f4ff8");
+  assert.equal(signed.w_rid, "8f6f2b5b3d485fe1886cec6a0be8c5d4");
+  assert.equal(signed.wts, 1702204169);
+});
+
+test("crawler pages through uploads, survives throttling and resumes from its checkpoint", () => {
+  const dir = mkdtempSync(join(tmpdir(), "bilibili-videos-"));
+  const output = join(dir, "videos.json");
+  const checkpoint = join(dir, "checkpoint.json");
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import json, os, subprocess, sys, threading",
+        "from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer",
+        "from urllib.parse import parse_qs, urlsplit",
+        "script, output, checkpoint = sys.argv[1:4]",
+        "uploads = [{'bvid': f'BV{n}', 'aid': n, 'title': f'video {n}', 'created': 1780000000 - n * 86400, 'length': '03:00'} for n in range(1, 6)]",
+        "log = []",
+        "state = {'broken': {'BV4'}, 'throttled': {'BV2'}}",
+        "def reply(handler, body):",
+        "    data = json.dumps(body).encode()",
+        "    handler.send_response(200)",
+        "    handler.send_header('Content-Length', str(len(data)))",
+        "    handler.end_headers()",
+        "    handler.wfile.write(data)",
+        "class Handler(BaseHTTPRequestHandler):",
+        "    def log_message(self, *args): pass",
+        "    def do_GET(self):",
+        "        url = urlsplit(self.path)",
+        "        query = {k: v[0] for k, v in parse_qs(url.query).items()}",
+        "        log.append((url.path, query.get('pn') or query.get('bvid')))",
+        "        if url.path == '/x/web-interface/nav':",
+        "            return reply(self, {'code': -101, 'data': {'wbi_img': {'img_url': 'https://i0.hdslb.com/bfs/wbi/7cd084941338484aae1ad9425b84077c.png', 'sub_url': 'https://i0.hdslb.com/bfs/wbi/4932caff0ff746eab6f01bf08b70ac45.png'}}})",
+        "        if url.path == '/x/space/wbi/arc/search':",
+        "            assert len(query['w_rid']) == 32 and query['wts'] and query['mid'] == '42', query",
+        "            pn, ps = int(query['pn']), int(query['ps'])",
+        "            return reply(self, {'code': 0, 'data': {'list': {'vlist': uploads[(pn - 1) * ps:pn * ps]}, 'page': {'pn': pn, 'ps': ps, 'count': len(uploads)}}})",
+        "        bvid = query['bvid']",
+        "        if bvid in state['throttled']:",
+        "            state['throttled'].discard(bvid)",
+        "            return reply(self, {'code': -352, 'message': 'risk control'})",
+        "        if bvid in state['broken']:",
+        "            return reply(self, {'code': -404, 'message': 'gone for now'})",
+        "        n = int(bvid[2:])",
+        "        reply(self, {'code': 0, 'data': {'bvid': bvid, 'view': n * 100, 'like': n * 10, 'coin': n, 'favorite': n * 2, 'danmaku': 0, 'reply': 1, 'share': 0}})",
+        "server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)",
+        "threading.Thread(target=server.serve_forever, daemon=True).start()",
+        "base = f'http://127.0.0.1:{server.server_port}'",
+        "run = lambda: subprocess.run([sys.executable, script, '--uid', '42', '--api-base', base, '--output', output, '--checkpoint', checkpoint, '--page-size', '2', '--rate', '50', '--workers', '3'], capture_output=True, text=True)",
+        "first = run()",
+        "first_log, log[:] = list(log), []",
+        "state['broken'].clear()",
+        "second = run()",
+        "print(json.dumps({",
+        "    'first': [first.returncode, first.stderr],",
+        "    'second': [second.returncode, second.stderr],",
+        "    'first_log': sorted(map(str, first_log)),",
+        "    'second_log': sorted(map(str, log)),",
+        "    'checkpoint_left': os.path.exists(checkpoint),",
+        "}))",
+      ].join("\n"),
+      crawlerScript.pathname,
+      output,
+      checkpoint,
+    ],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+
+  assert.equal(result.status, 0, result.stderr);
+  const outcome = JSON.parse(result.stdout.trim().split("\n").pop());
+  assert.equal(outcome.first[0], 1);
+  assert.match(outcome.first[1], /1 requests failed; re-run to resume/);
+  assert.match(outcome.first[1], /BV4: .*code -404/);
+  assert.equal(outcome.first_log.filter((entry) => entry.includes("arc/search")).length, 3);
+  assert.equal(outcome.first_log.filter((entry) => entry.includes("'BV2'")).length, 2);
+
+  assert.equal(outcome.second[0], 0, outcome.second[1]);
+  assert.deepEqual(outcome.second_log, [
+    "('/x/space/wbi/arc/search', '1')",
+    "('/x/web-interface/archive/stat', 'BV4')",
+    "('/x/web-interface/nav', None)",
+  ]);
+  assert.equal(outcome.checkpoint_left, false);
+
+  const data = JSON.parse(readFileSync(output, "utf8"));
+  assert.equal(data.uid, "42");
+  assert.equal(data.count, 5);
+  assert.deepEqual(data.videos.map((video) => video.bvid), ["BV1", "BV2", "BV3", "BV4", "BV5"]);
+  assert.deepEqual(data.videos[3], {
+    bvid: "BV4",
+    aid: 4,
+    title: "video 4",
+    created: "2026-05-24",
+    length: "03:00",
+    views: 400,
+    likes: 40,
+    coins: 4,
+    favorites: 8,
+    danmaku: 0,
+    replies: 1,
+    shares: 0,
+  });
+  assert.deepEqual(data.totals, { views: 1500, likes: 150, coins: 15, favorites: 30, danmaku: 0, replies: 5, shares: 0 });
+  assert.equal(existsSync(checkpoint), false);
+});
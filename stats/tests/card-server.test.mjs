@@ -0,0 +1,101 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import { readFileSync } from "node:fs";
+import test from "node:test";
+
+const repoRoot = new URL("../../", import.meta.url);
+const scriptsDir = new URL("../scripts/", import.meta.url);
+
+function runHarness(lines) {
+  const result = spawnSync("python3", ["-c", lines.join("\n"), scriptsDir.pathname], {
+    cwd: repoRoot,
+    encoding: "utf8",
+  });
+  assert.equal(result.status, 0, result.stderr);
+  return JSON.parse(result.stdout.trim().split("\n").pop());
+}
+
+const serverPrelude = [
+  "import importlib.util, json, sys, threading, urllib.error, urllib.request",
+  "from http.server import ThreadingHTTPServer",
+  "from pathlib import Path",
+  "sys.path.insert(0, sys.argv[1])",
+  "spec = importlib.util.spec_from_file_location('serve_cards', Path(sys.argv[1]) / 'serve-cards.py')",
+  "serve_cards = importlib.util.module_from_spec(spec)",
+  "spec.loader.exec_module(serve_cards)",
+  "def request(path, method='GET', headers=None):",
+  "    req = urllib.request.Request(url + path, method=method, headers=headers or {})",
+  "    try:",
+  "        with urllib.request.urlopen(req) as response:",
+  "            return response.status, dict(response.headers), response.read().decode('utf-8')",
+  "    except urllib.error.HTTPError as error:",
+  "        return error.code, dict(error.headers), error.read().decode('utf-8')",
+  "def serve(service):",
+  "    server = ThreadingHTTPServer(('127.0.0.1', 0), serve_cards.make_handler(service, 60))",
+  "    threading.Thread(target=server.serve_forever, daemon=True).start()",
+  "    return f'http://127.0.0.1:{server.server_port}'",
+];
+
+test("card server answers from memory with ETags and keeps the last good card on failure", () => {
+  const outcome = runHarness([
+    ...serverPrelude,
+    "stats = {'count': 1, 'fail': False}",
+    "def fetch():",
+    "    if stats['fail']: raise RuntimeError('upstream down')",
+    "    return stats['count']",
+    "service = serve_cards.CardService({'demo': fetch}, {'demo': lambda n: {'demo-card': f'<svg>{n}</svg>'}})",
+    "service.refresh_all()",
+    "url = serve(service)",
+    "first = request('/demo-card.svg')",
+    "etag = first[1]['ETag']",
+    "revalidated = request('/demo-card.svg', headers={'If-None-Match': etag})",
+    "head = request('/demo-card.svg', method='HEAD')",
+    "stats['count'] = 2",
+    "service.refresh_all()",
+    "second = request('/demo-card.svg')",
+    "stale = request('/demo-card.svg', headers={'If-None-Match': etag})",
+    "healthy = request('/healthz')[0]",
+    "stats['fail'] = True",
+    "service.refresh_all()",
+    "print(json.dumps({",
+    "    'first': [first[0], first[2], first[1]['Content-Type'], first[1]['Cache-Control']],",
+    "    'revalidated': [revalidated[0], revalidated[2]],",
+    "    'head': [head[0], head[2], head[1]['Content-Length']],",
+    "    'second': [second[0], second[2], second[1]['ETag'] != etag],",
+    "    'stale': stale[0],",
+    "    'healthy': healthy,",
+    "    'unhealthy': request('/healthz')[0],",
+    "    'after_failure': request('/demo-card.svg')[2],",
+    "    'missing': request('/other.svg')[0],",
+    "    'index': json.loads(request('/')[2]),",
+    "}))",
+  ]);
+
+  assert.deepEqual(outcome, {
+    first: [200, "<svg>1</svg>", "image/svg+xml; charset=utf-8", "public, max-age=60"],
+    revalidated: [304, ""],
+    head: [200, "", "12"],
+    second: [200, "<svg>2</svg>", true],
+    stale: 200,
+    healthy: 200,
+    unhealthy: 503,
+    after_failure: "<svg>2</svg>",
+    missing: 404,
+    index: { cards: ["/demo-card.svg"] },
+  });
+});
+
+test("card server renders the committed stats data into the committed assets", () => {
+  const outcome = runHarness([
+    ...serverPrelude,
+    "service = serve_cards.CardService(serve_cards.file_fetchers('stats/data'), serve_cards.build_renderers())",
+    "service.refresh_all()",
+    "url = serve(service)",
+    "names = ['blog-card', 'vlog-card', 'huggingface-card', 'github-contribution-graph', 'github-contribution-graph-compact']",
+    "print(json.dumps({name: request(f'/{name}.svg')[2] for name in names}))",
+  ]);
+
+  for (const [name, body] of Object.entries(outcome)) {
+    assert.equal(body, readFileSync(new URL(`assets/${name}.svg`, repoRoot), "utf8"), name);
+  }
+});
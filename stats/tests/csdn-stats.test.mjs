@@ -0,0 +1,134 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import test from "node:test";
+
+const repoRoot = new URL("../../", import.meta.url);
+const fetchScript = new URL("../scripts/fetch-csdn-stats-2.py", import.meta.url);
+const recordedPage = new URL("../StatRequest/CSDN/version2/response.html", import.meta.url);
+
+function parseStats(source) {
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import importlib.util, json, os, sys",
+        "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+        "spec = importlib.util.spec_from_file_location('csdn', sys.argv[1])",
+        "csdn = importlib.util.module_from_spec(spec)",
+        "spec.loader.exec_module(csdn)",
+        "html = open(sys.argv[2], encoding='utf-8').read() if sys.argv[2] else sys.stdin.read()",
+        "print(json.dumps({'stats': csdn.parse_csdn_stats(html, chunk_size=512), 'bs4': 'bs4' in sys.modules}))",
+      ].join("\n"),
+      fetchScript.pathname,
+      source.path ?? "",
+    ],
+    { cwd: repoRoot, encoding: "utf8", input: source.html ?? "" },
+  );
+  assert.equal(result.status, 0, result.stderr);
+  return JSON.parse(result.stdout);
+}
+
+test("streaming parser extracts all five fields from the recorded profile page", () => {
+  const { stats, bs4 } = parseStats({ path: recordedPage.pathname });
+  assert.deepEqual(stats, { views: 128330, original: 182, fans: 1634, likes: 2770, collect: 1468 });
+  assert.equal(bs4, false, "the CSDN fetcher must not import BeautifulSoup");
+});
+
+test("streaming parser accepts old-format markup and ignores unrelated counters", () => {
+  const html = [
+    '<div class="user-profile-statistics-num">1,024</div><div class="user-profile-statistics-name">总访问量</div>',
+    '<div data-v-1 class="user-profile-statistics-num" id="x">9,382</div><div class="user-profile-statistics-name">排名</div>',
+    '<div class="user-profile-statistics-num">12</div> <div class="user-profile-statistics-name"> 原创 </div>',
+    '<div class="aside-common-box-content-text">内容获得<span>19</span>次评论</div>',
+    '<div class="aside-common-box-content-text">获得<span class="n">3,000</span>次点赞</div>',
+    '<div class="aside-common-box-content-text">获得<span>77</span>次收藏</div>',
+  ].join("\n");
+  const { stats } = parseStats({ html });
+  assert.deepEqual(stats, { views: 1024, original: 12, likes: 3000, collect: 77 });
+});
+
+test("Cloudflare clearance session round-trips and is dropped once it expires", () => {
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import importlib.util, json, os, sys, tempfile, time",
+        "import requests",
+        "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+        "spec = importlib.util.spec_from_file_location('csdn', sys.argv[1])",
+        "csdn = importlib.util.module_from_spec(spec)",
+        "spec.loader.exec_module(csdn)",
+        "state = os.path.join(tempfile.mkdtemp(), 'session.json')",
+        "now = time.time()",
+        "warm = requests.Session()",
+        "warm.headers['User-Agent'] = 'Fingerprint/1.0'",
+        "warm.cookies.set('cf_clearance', 'token', domain='.csdn.net', expires=int(now + 3600))",
+        "warm.cookies.set('uuid_tt_dd', 'abc', domain='.csdn.net')",
+        "csdn.save_session_state(warm, state, now=now)",
+        "fresh = requests.Session()",
+        "reused = csdn.load_session_state(fresh, state, now=now + 60)",
+        "late = requests.Session()",
+        "expired = csdn.load_session_state(late, state, now=now + 7200)",
+        "print(json.dumps({",
+        "    'reused': reused,",
+        "    'ua': fresh.headers['User-Agent'],",
+        "    'cookies': sorted(cookie.name for cookie in fresh.cookies),",
+        "    'expired': expired,",
+        "    'late_cookies': len(late.cookies),",
+        "    'missing': csdn.load_session_state(requests.Session(), state + '.missing'),",
+        "}))",
+      ].join("\n"),
+      fetchScript.pathname,
+    ],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+
+  assert.equal(result.status, 0, result.stderr);
+  assert.deepEqual(JSON.parse(result.stdout), {
+    reused: true,
+    ua: "Fingerprint/1.0",
+    cookies: ["cf_clearance", "uuid_tt_dd"],
+    expired: false,
+    late_cookies: 0,
+    missing: false,
+  });
+});
+
+test("a failed stats file write records no history sample", () => {
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import importlib.util, json, os, sys, tempfile",
+        "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+        "spec = importlib.util.spec_from_file_location('csdn', sys.argv[1])",
+        "csdn = importlib.util.module_from_spec(spec)",
+        "spec.loader.exec_module(csdn)",
+        "from pathlib import Path",
+        "stats_file = Path(tempfile.mkdtemp()) / 'csdn-stats.json'",
+        "class BrokenJson:",
+        "    load = staticmethod(json.load)",
+        "    @staticmethod",
+        "    def dump(*args, **kwargs): raise OSError('disk full')",
+        "csdn.json = BrokenJson",
+        "try:",
+        "    csdn.update_stats_file({'original': 182}, stats_file)",
+        "    error = None",
+        "except OSError as exc:",
+        "    error = str(exc)",
+        "csdn.json = json",
+        "stats_file.unlink(missing_ok=True)",
+        "csdn.update_stats_file({'original': 183}, stats_file)",
+        "history = (stats_file.parent / 'history' / 'csdn.jsonl').read_text().splitlines()",
+        "print(json.dumps({'error': error, 'history': [json.loads(line)['original'] for line in history]}))",
+      ].join("\n"),
+      fetchScript.pathname,
+    ],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+  assert.equal(result.status, 0, result.stderr);
+  assert.deepEqual(JSON.parse(result.stdout.trim().split("\n").pop()), { error: "disk full", history: [183] });
+});
@@ -0,0 +1,545 @@
+import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
+import { mkdtempSync, readFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import test from "node:test";
+
+const repoRoot = new URL("../../", import.meta.url);
+const scriptsDir = new URL("../scripts/", import.meta.url);
+
+function runHarness(lines) {
+  const result = spawnSync("python3", ["-c", lines.join("\n"), scriptsDir.pathname], {
+    cwd: repoRoot,
+    encoding: "utf8",
+  });
+  assert.equal(result.status, 0, result.stderr);
+  return JSON.parse(result.stdout.trim().split("\n").pop());
+}
+
+const serverPrelude = [
+  "import json, sys, threading",
+  "from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer",
+  "sys.path.insert(0, sys.argv[1])",
+  "import http_client",
+  "http_client.BACKOFF_BASE = 0.01",
+  "seen = {'requests': 0, 'ports': set()}",
+  "class Handler(BaseHTTPRequestHandler):",
+  "    protocol_version = 'HTTP/1.1'",
+  "    def log_message(self, *args): pass",
+  "    def do_GET(self):",
+  "        seen['requests'] += 1",
+  "        seen['ports'].add(self.client_address[1])",
+  "        self.rfile.read(int(self.headers.get('Content-Length', 0)))",
+  "        status, body = RESPONSES.pop(0) if RESPONSES else (200, b'ok')",
+  "        self.send_response(status)",
+  "        self.send_header('Content-Length', str(len(body)))",
+  "        self.end_headers()",
+  "        self.wfile.write(body)",
+  "    do_POST = do_GET",
+  "server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)",
+  "threading.Thread(target=server.serve_forever, daemon=True).start()",
+  "url = f'http://127.0.0.1:{server.server_port}/'",
+];
+
+test("client retries transient statuses and reuses one pooled connection", () => {
+  const outcome = runHarness([
+    "RESPONSES = [(503, b'busy'), (502, b'bad gateway')]",
+    ...serverPrelude,
+    "body = http_client.get(url, attempts=3, budget=5).text",
+    "for _ in range(3): http_client.get(url)",
+    "print(json.dumps({'body': body, 'requests': seen['requests'], 'connections': len(seen['ports'])}))",
+  ]);
+
+  assert.deepEqual(outcome, { body: "ok", requests: 6, connections: 1 });
+});
+
+test("client raises non-retryable errors immediately and gives up when attempts run out", () => {
+  const outcome = runHarness([
+    "RESPONSES = [(404, b'missing'), (503, b'a'), (503, b'b')]",
+    ...serverPrelude,
+    "errors = []",
+    "for _ in range(2):",
+    "    try:",
+    "        http_client.get(url, attempts=2, budget=5)",
+    "    except Exception as exc:",
+    "        errors.append(type(exc).__name__)",
+    "print(json.dumps({'errors': errors, 'requests': seen['requests']}))",
+  ]);
+
+  assert.deepEqual(outcome, { errors: ["HTTPError", "RetryableError"], requests: 3 });
+});
+
+test("snapshot store archives changed or unparseable responses once, compressed and bounded", () => {
+  const outcome = runHarness([
+    "import json, os, sys, tempfile",
+    "sys.path.insert(0, sys.argv[1])",
+    "import snapshot_store",
+    "root = tempfile.mkdtemp()",
+    "store = snapshot_store.SnapshotStore(root, retention=2)",
+    "page = '<html>' + 'x' * 10000 + '</html>'",
+    "recorded = [",
+    "    store.record('csdn', page, run_at='r1') is not None,",
+    "    store.record('csdn', page, run_at='r2') is not None,",
+    "    store.record('csdn', page, parse_failed=True, run_at='r3') is not None,",
+    "    store.record('csdn', page + '!', run_at='r4') is not None,",
+    "    store.record('csdn', page + '?', run_at='r5') is not None,",
+    "]",
+    "objects = [name for _, _, names in os.walk(os.path.join(root, 'objects')) for name in names]",
+    "runs = store.read_index()['runs']",
+    "print(json.dumps({",
+    "    'recorded': recorded,",
+    "    'runs': [(run['run_at'], run['reason']) for run in runs],",
+    "    'objects': len(objects),",
+    "    'roundtrip': store.load(runs[-1]['sha256']).decode() == page + '?',",
+    "    'compressed': all(os.path.getsize(store.object_path(run['sha256'])) < 200 for run in runs),",
+    "}))",
+  ]);
+
+  assert.deepEqual(outcome, {
+    recorded: [true, false, true, true, true],
+    runs: [["r4", "changed"], ["r5", "changed"]],
+    objects: 2,
+    roundtrip: true,
+    compressed: true,
+  });
+});
+
+test("svg asset registry parses each mark once and revalidates touched files and extractor changes", () => {
+  const outcome = runHarness([
+    "import json, os, sys, tempfile",
+    "sys.path.insert(0, sys.argv[1])",
+    "import svg_assets",
+    "parsed = []",
+    "extract = svg_assets.extract_paths",
+    "svg_assets.extract_paths = lambda data: parsed.append(len(data)) or extract(data)",
+    "root = tempfile.mkdtemp()",
+    "source = os.path.join(root, 'mark.svg')",
+    "cache = os.path.join(root, 'assets.json')",
+    "with open(source, 'w') as handle:",
+    "    handle.write('<?xml version=\"1.0\"?><svg xmlns=\"http://www.w3.org/2000/svg\"><g><path d=\"M0 0\\n   h16 v16z\" fill=\"#BF91F3\"/></g><path d=\"M1 1z\"/></svg>')",
+    "first = svg_assets.AssetRegistry(cache)",
+    "paths = [first.paths(source), first.paths(source)]",
+    "first.save()",
+    "paths.append(svg_assets.AssetRegistry(cache).paths(source))",
+    "os.utime(source, ns=(1, 1))",
+    "touched = svg_assets.AssetRegistry(cache)",
+    "paths.append(touched.paths(source))",
+    "with open(source, 'a') as handle:",
+    "    handle.write('<!-- -->')",
+    "os.utime(source, ns=(2, 2))",
+    "edited = svg_assets.AssetRegistry(cache)",
+    "paths.append(edited.paths(source))",
+    "edited.save()",
+    "svg_assets.EXTRACTOR = 'changed extraction'",
+    "paths.append(svg_assets.AssetRegistry(cache).paths(source))",
+    "parse_count = len(parsed)",
+    "import importlib.util, pathlib",
+    "spec = importlib.util.spec_from_file_location('cards', sys.argv[1] + 'generate-svg-cards.py')",
+    "cards = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(cards)",
+    "print(json.dumps({'paths': paths, 'parsed': parse_count, 'touched_dirty': touched.dirty,",
+    "                  'keyed': pathlib.Path(svg_assets.__file__).resolve() in cards.GENERATOR_SOURCES}))",
+  ]);
+
+  assert.deepEqual(outcome.paths, Array(6).fill(["M0 0 h16 v16z", "M1 1z"]));
+  assert.equal(outcome.parsed, 3);
+  assert.equal(outcome.touched_dirty, true);
+  assert.equal(outcome.keyed, true);
+});
+
+test("stats history appends samples and answers range, delta and growth queries", () => {
+  const outcome = runHarness([
+    "import json, subprocess, sys, tempfile",
+    "sys.path.insert(0, sys.argv[1])",
+    "import stats_history",
+    "root = tempfile.mkdtemp()",
+    "store = stats_history.HistoryStore(root)",
+    "for day, followers in ((1, 200), (2, 204), (3, 204), (5, 220)):",
+    "    store.append('bilibili', {'followers': followers, 'views': followers * 300, 'last_updated': 'x', 'flag': True}, at=f'2026-07-0{day}T10:00:00Z')",
+    "try:",
+    "    store.append('bilibili', {'followers': 1}, at='2026-07-04T00:00:00Z')",
+    "    rejected = False",
+    "except ValueError:",
+    "    rejected = True",
+    "cli = subprocess.run([sys.executable, sys.argv[1] + 'query-stats-history.py', 'bilibili', 'views', '--since', '2026-07-02', '--series', '--root', root], capture_output=True, text=True, check=True).stdout",
+    "print(json.dumps({",
+    "    'first': open(store.path('bilibili')).readline().strip(),",
+    "    'range': [s['at'][:10] for s in stats_history.HistoryStore(root).samples('bilibili', '2026-07-02', '2026-07-03')],",
+    "    'delta': store.delta('bilibili', 'followers', '2026-07-02T12:00:00Z'),",
+    "    'growth': store.growth('bilibili', 'followers'),",
+    "    'empty': store.growth('bilibili', 'followers', '2026-08-01'),",
+    "    'rejected': rejected,",
+    "    'cli': json.loads(cli),",
+    "}))",
+  ]);
+
+  assert.equal(outcome.first, '{"at":"2026-07-01T10:00:00Z","followers":200,"views":60000}');
+  assert.deepEqual(outcome.range, ["2026-07-02", "2026-07-03"]);
+  assert.equal(outcome.delta, 16);
+  assert.deepEqual(outcome.growth, {
+    from: "2026-07-01T10:00:00Z",
+    to: "2026-07-05T10:00:00Z",
+    start: 200,
+    end: 220,
+    delta: 20,
+    days: 4,
+    per_day: 5,
+    percent: 10,
+  });
+  assert.equal(outcome.empty, null);
+  assert.equal(outcome.rejected, true);
+  assert.equal(outcome.cli.growth.delta, 4800);
+  assert.deepEqual(outcome.cli.series.map(([at]) => at.slice(0, 10)), ["2026-07-02", "2026-07-03", "2026-07-05"]);
+});
+
+test("token bucket allows a burst and then spaces callers at the configured rate", () => {
+  const outcome = runHarness([
+    "import json, sys",
+    "sys.path.insert(0, sys.argv[1])",
+    "import rate_limit",
+    "now = [0.0]",
+    "def sleep(seconds):",
+    "    now[0] += seconds",
+    "bucket = rate_limit.TokenBucket(2, capacity=3, clock=lambda: now[0], sleep=sleep)",
+    "waits = [bucket.acquire() for _ in range(5)]",
+    "now[0] += 10",
+    "after_idle = [bucket.acquire() for _ in range(4)]",
+    "print(json.dumps({'waits': waits, 'after_idle': after_idle, 'clock': now[0]}))",
+  ]);
+
+  assert.deepEqual(outcome.waits, [0, 0, 0, 0.5, 0.5]);
+  assert.deepEqual(outcome.after_idle, [0, 0, 0, 0.5]);
+  assert.equal(outcome.clock, 11.5);
+});
+
+test("client fails fast once a host's breaker opens and paces hosts with a request budget", () => {
+  const outcome = runHarness([
+    "RESPONSES = [(503, b'down')] * 3 + [(200, b'ok')] * 6",
+    ...serverPrelude,
+    "import time",
+    "host = url.split('/')[2]",
+    "http_client.configure(host, rate=20, burst=1, threshold=3, cooldown=0.3)",
+    "http_client.configure('auth', cooldown=30)",
+    "errors = []",
+    "def call(**kwargs):",
+    "    try:",
+    "        return http_client.get(url, attempts=3, budget=5, **kwargs).text",
+    "    except Exception as exc:",
+    "        errors.append(type(exc).__name__)",
+    "call()",
+    "started = time.monotonic()",
+    "call()",
+    "fail_fast = time.monotonic() - started",
+    "sent_while_open = seen['requests']",
+    "time.sleep(0.35)",
+    "probe = call()",
+    "http_client.trip('auth', 'login rejected')",
+    "call(scope='auth')",
+    "started = time.monotonic()",
+    "paced = [call() for _ in range(5)]",
+    "print(json.dumps({",
+    "    'errors': errors,",
+    "    'sent_while_open': sent_while_open,",
+    "    'fail_fast': fail_fast < 0.05,",
+    "    'probe': probe,",
+    "    'paced': paced,",
+    "    'paced_seconds': round(time.monotonic() - started, 2),",
+    "    'requests': seen['requests'],",
+    "}))",
+  ]);
+
+  assert.deepEqual(outcome.errors, ["RetryableError", "CircuitOpenError", "CircuitOpenError"]);
+  assert.equal(outcome.sent_while_open, 3);
+  assert.equal(outcome.fail_fast, true);
+  assert.equal(outcome.probe, "ok");
+  assert.deepEqual(outcome.paced, ["ok", "ok", "ok", "ok", "ok"]);
+  assert.ok(outcome.paced_seconds >= 0.19, `five paced calls took ${outcome.paced_seconds}s`);
+  assert.equal(outcome.requests, 9);
+});
+
+test("a half-open host probe is handed back when the call's scope breaker is still open", () => {
+  const outcome = runHarness([
+    "RESPONSES = []",
+    ...serverPrelude,
+    "import time",
+    "host = url.split('/')[2]",
+    "http_client.configure(host, cooldown=0.1)",
+    "http_client.configure('auth', cooldown=30)",
+    "results = []",
+    "def call(**kwargs):",
+    "    try:",
+    "        results.append(http_client.get(url, **kwargs).text)",
+    "    except Exception as exc:",
+    "        results.append(type(exc).__name__)",
+    "http_client.trip(host, 'test')",
+    "http_client.trip('auth', 'login rejected')",
+    "time.sleep(0.15)",
+    "call(scope='auth')",
+    "call()",
+    "call()",
+    "print(json.dumps({'results': results, 'requests': seen['requests'], 'host_open': http_client.breaker_for(host).is_open}))",
+  ]);
+
+  assert.deepEqual(outcome, { results: ["CircuitOpenError", "ok", "ok"], requests: 2, host_open: false });
+});
+
+test("a Bilibili -101 from the first login-only call stops the second one from being sent", () => {
+  const outcome = runHarness([
+    "RESPONSES = [(200, b'{\"code\": -101, \"message\": \"not logged in\"}')] * 2",
+    ...serverPrelude,
+    "import importlib.util, tempfile",
+    "import snapshot_store",
+    "spec = importlib.util.spec_from_file_location('fetch_bilibili', sys.argv[1] + 'fetch-bilibili-stats-1.py')",
+    "bilibili = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(bilibili)",
+    "bilibili.SNAPSHOTS = snapshot_store.SnapshotStore(tempfile.mkdtemp())",
+    "bilibili.STATS_API, bilibili.CREATIONS_API = url + 'upstat', url + 'navnum'",
+    "stats = bilibili.fetch_login_stats()",
+    "print(json.dumps({'stats': stats, 'requests': seen['requests']}))",
+  ]);
+
+  assert.deepEqual(outcome, { stats: [null, null, null], requests: 1 });
+});
+
+test("cassettes record live responses and replay them in order without a network", () => {
+  const outcome = runHarness([
+    "RESPONSES = [(200, b'first'), (200, b'second'), (404, b'gone'), (200, b'2025'), (200, b'2026')]",
+    ...serverPrelude,
+    "import os, tempfile",
+    "import cassette",
+    "path = os.path.join(tempfile.mkdtemp(), 'tape.json')",
+    "os.environ.update(STATS_HTTP_MODE='record', STATS_HTTP_CASSETTE=path)",
+    "recorded = [http_client.get(url, params={'pn': 1, 'wts': 1, 'w_rid': 'a'}).text for _ in range(2)]",
+    "try:",
+    "    http_client.get(url + 'missing')",
+    "except Exception as exc:",
+    "    recorded.append(type(exc).__name__)",
+    "query = lambda year: {'query': 'query Q', 'variables': {'login': 'ceilf6', 'from': f'{year}-01-01'}}",
+    "recorded += [http_client.post(url, json=query(year)).text for year in (2025, 2026)]",
+    "os.environ['STATS_HTTP_MODE'] = 'replay'",
+    "replayed = [http_client.get(url, params={'pn': 1, 'wts': 2, 'w_rid': 'b'}).text for _ in range(3)]",
+    "reordered = {'query': 'query Q', 'variables': {'from': '2026-01-01', 'login': 'ceilf6'}}",
+    "replayed += [http_client.post(url, json=reordered).text, http_client.post(url, json=query(2025)).text]",
+    "try:",
+    "    http_client.get(url, params={'pn': 2})",
+    "except cassette.CassetteMiss:",
+    "    replayed.append('miss')",
+    "document = json.load(open(path))",
+    "print(json.dumps({",
+    "    'recorded': recorded,",
+    "    'replayed': replayed,",
+    "    'requests': seen['requests'],",
+    "    'version': document['version'],",
+    "    'keys': [entry['request'].replace(url, '/') for entry in document['interactions']],",
+    "}))",
+  ]);
+
+  assert.deepEqual(outcome.recorded, ["first", "second", "HTTPError", "2025", "2026"]);
+  assert.deepEqual(outcome.replayed, ["first", "second", "second", "2026", "2025", "miss"]);
+  assert.equal(outcome.requests, 5);
+  assert.equal(outcome.version, 2);
+  assert.deepEqual(outcome.keys.slice(0, 3), ["GET /?pn=1", "GET /?pn=1", "GET /missing"]);
+  assert.match(outcome.keys[3], /^POST \/ body:[0-9a-f]{16}$/);
+  assert.notEqual(outcome.keys[3], outcome.keys[4]);
+});
+
+test("fetchers run their whole fetch, parse and write path offline from a committed cassette", () => {
+  const outputDir = mkdtempSync(join(tmpdir(), "stats-replay-"));
+  const run = (script, cassetteName, output, args = [], env = {}) =>
+    spawnSync("python3", [new URL(script, scriptsDir).pathname, "--output", join(outputDir, output), ...args], {
+      cwd: repoRoot,
+      encoding: "utf8",
+      env: {
+        ...process.env,
+        ...env,
+        STATS_HTTP_MODE: "replay",
+        STATS_HTTP_CASSETTE: new URL(`../StatRequest/cassettes/${cassetteName}`, scriptsDir).pathname,
+      },
+    });
+
+  for (const [script, cassetteName, output, args, env] of [
+    ["fetch-bilibili-stats-1.py", "bilibili.json", "bilibili-stats.json"],
+    ["fetch-csdn-stats-2.py", "csdn.json", "csdn-stats.json"],
+    ["fetch-huggingface-stats.py", "huggingface.json", "huggingface-stats.json", ["--cache", join(outputDir, "validators.json")]],
+    [
+      "fetch-github-contributions.py",
+      "github-graphql.json",
+      "github-contributions.json",
+      ["--now", "2026-08-22T12:00:00Z"],
+      { GH_PROFILE_TOKEN: "replay-token" },
+    ],
+    [
+      "fetch-github-stats-card.py",
+      "github-stats-card.json",
+      "github-stats-card-upstream.svg",
+      ["--source", "upstream", "--now", "2026-10-18T12:00:00Z", "--cache", join(outputDir, "validators.json")],
+    ],
+    [
+      "fetch-github-stats-card.py",
+      "github-graphql.json",
+      "github-stats-card-graphql.svg",
+      ["--source", "graphql", "--now", "2026-10-18T12:00:00Z"],
+      { GH_PROFILE_TOKEN: "replay-token" },
+    ],
+  ]) {
+    const result = run(script, cassetteName, output, args, env);
+    assert.equal(result.status, 0, result.stdout + result.stderr);
+  }
+
+  const bilibili = JSON.parse(readFileSync(join(outputDir, "bilibili-stats.json"), "utf8"));
+  const csdn = JSON.parse(readFileSync(join(outputDir, "csdn-stats.json"), "utf8"));
+  assert.deepEqual(
+    [bilibili.followers, bilibili.views, bilibili.likes, bilibili.creations],
+    [129, 50572, 948, 22],
+  );
+  assert.equal(csdn.original, 182);
+  assert.match(readFileSync(join(outputDir, "history", "csdn.jsonl"), "utf8"), /"original":182/);
+  const huggingface = JSON.parse(readFileSync(join(outputDir, "huggingface-stats.json"), "utf8"));
+  assert.deepEqual([huggingface.numFollowers, huggingface.numLikes, huggingface.numModels], [1, 17, 7]);
+  const contributions = JSON.parse(readFileSync(join(outputDir, "github-contributions.json"), "utf8"));
+  assert.deepEqual(
+    [contributions.source, contributions.from, contributions.to, contributions.total_contributions],
+    ["github-graphql", "2025-08-23", "2026-08-22", 1444],
+  );
+  for (const mode of ["upstream", "graphql"]) {
+    const card = readFileSync(join(outputDir, `github-stats-card-${mode}.svg`), "utf8");
+    assert.match(card, />2026 Commits:</, mode);
+    assert.match(card, />12\.4k</, mode);
+  }
+});
+
+test("github profile batches alias many users per query, split oversized batches and page stars", () => {
+  const outcome = runHarness([
+    "import json, re, sys",
+    "sys.path.insert(0, sys.argv[1])",
+    "import github_graphql, http_client",
+    "REPOS = {'ada': [5] * 150, 'bob': [1], 'cy': [2], 'dee': [3], 'eve': [4]}",
+    "calls = []",
+    "class Reply:",
+    "    def __init__(self, payload): self.payload, self.content = payload, json.dumps(payload).encode()",
+    "    def json(self): return self.payload",
+    "def post(url, json=None, **kwargs):",
+    "    query, variables = json['query'], json['variables']",
+    "    logins = [variables[f'l{index}'] for index in range(len(re.findall(r'\\bu\\d+: user', query)))]",
+    "    calls.append(logins)",
+    "    if len(logins) > 2:",
+    "        return Reply({'errors': [{'type': 'MAX_NODE_LIMIT_EXCEEDED', 'message': 'too many nodes'}]})",
+    "    data, errors = {}, []",
+    "    for index, login in enumerate(logins):",
+    "        if login not in REPOS:",
+    "            data[f'u{index}'] = None",
+    "            errors.append({'type': 'NOT_FOUND', 'message': f'no user {login}'})",
+    "            continue",
+    "        start = 100 if variables.get(f'a{index}') else 0",
+    "        stars = REPOS[login][start:start + 100]",
+    "        page = {'nodes': [{'stargazerCount': count} for count in stars],",
+    "                'pageInfo': {'hasNextPage': start + 100 < len(REPOS[login]), 'endCursor': 'next'}}",
+    "        user = {'login': login, 'repositories': page}",
+    "        if 'a0' not in variables:",
+    "            user.update(year={'totalCommitContributions': 10, 'restrictedContributionsCount': 1},",
+    "                        pullRequests={'totalCount': 2}, issues={'totalCount': 3},",
+    "                        repositoriesContributedTo={'totalCount': 4},",
+    "                        calendar={'contributionCalendar': {'totalContributions': len(login), 'weeks': []}})",
+    "        data[f'u{index}'] = user",
+    "    return Reply({'data': data, 'errors': errors} if errors else {'data': data})",
+    "http_client.post = post",
+    "window = {'from_datetime': '2025-08-23T00:00:00Z', 'to_datetime': '2026-08-22T23:59:59Z'}",
+    "profiles = github_graphql.fetch_profiles(['ada', 'bob', 'cy', 'dee', 'ghost', 'eve', 'bob'], 'token', window=window,",
+    "                                        max_nodes=303, max_users=10)",
+    "query = github_graphql.build_query(['ada', 'bob'], github_graphql.METRICS)",
+    "print(json.dumps({",
+    "    'calls': calls,",
+    "    'stars': {login: profile and profile['stats']['stars'] for login, profile in profiles.items()},",
+    "    'ada': profiles['ada']['stats'],",
+    "    'calendar': profiles['cy']['calendar']['totalContributions'],",
+    "    'aliases': re.findall(r'u\\d+: user\\(login: \\$l\\d+\\)', query),",
+    "    'batch': github_graphql.plan_batches(list('abcdefg'), ('calendar',), max_nodes=303, max_users=3),",
+    "}))",
+  ]);
+
+  assert.deepEqual(outcome.calls, [
+    ["ada", "bob", "cy"],
+    ["ada"],
+    ["bob", "cy"],
+    ["dee", "ghost", "eve"],
+    ["dee"],
+    ["ghost", "eve"],
+    ["ada"],
+  ]);
+  assert.deepEqual(outcome.stars, { ada: 750, bob: 1, cy: 2, dee: 3, ghost: null, eve: 4 });
+  assert.deepEqual(outcome.ada, { stars: 750, commits: 11, prs: 2, issues: 3, contributed_to: 4 });
+  assert.equal(outcome.calendar, 2);
+  assert.deepEqual(outcome.aliases, ["u0: user(login: $l0)", "u1: user(login: $l1)"]);
+  assert.deepEqual(outcome.batch, [["a", "b", "c"], ["d", "e", "f"], ["g"]]);
+});
+
+test("github profile batches that time out are split like oversized ones while other failures are retried", () => {
+  const outcome = runHarness([
+    "import json, re, sys, threading, time",
+    "from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer",
+    "sys.path.insert(0, sys.argv[1])",
+    "import github_graphql, http_client",
+    "http_client.BACKOFF_BASE = 0.01",
+    "github_graphql.TIMEOUT = 1",
+    "sizes = {}",
+    "class Handler(BaseHTTPRequestHandler):",
+    "    protocol_version = 'HTTP/1.1'",
+    "    def log_message(self, *args): pass",
+    "    def do_POST(self):",
+    "        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))",
+    "        logins = [value for name, value in request['variables'].items() if re.fullmatch(r'l\\d+', name)]",
+    "        seen = sizes.setdefault(self.path, [])",
+    "        seen.append(len(logins))",
+    "        if self.path == '/busy' or (self.path == '/flaky' and len(seen) == 1):",
+    "            status, body = 503, b'busy'",
+    "        elif self.path == '/gateway' and len(logins) > 2:",
+    "            status, body = 504, b'gateway timeout'",
+    "        else:",
+    "            if self.path == '/slow' and len(logins) > 2:",
+    "                time.sleep(1.5)",
+    "            data = {f'u{index}': {'login': login, 'calendar': {'contributionCalendar': {'totalContributions': len(login), 'weeks': []}}}",
+    "                    for index, login in enumerate(logins)}",
+    "            status, body = 200, json.dumps({'data': data}).encode()",
+    "        try:",
+    "            self.send_response(status)",
+    "            self.send_header('Content-Length', str(len(body)))",
+    "            self.end_headers()",
+    "            self.wfile.write(body)",
+    "        except OSError:",
+    "            pass",
+    "server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)",
+    "threading.Thread(target=server.serve_forever, daemon=True).start()",
+    "base = f'http://127.0.0.1:{server.server_port}'",
+    "window = {'from_datetime': '2025-08-23T00:00:00Z', 'to_datetime': '2026-08-22T23:59:59Z'}",
+    "totals = {}",
+    "for path in ('/gateway', '/slow', '/flaky'):",
+    "    github_graphql.ENDPOINT = base + path",
+    "    profiles = github_graphql.fetch_profiles(['ada', 'bob', 'cy', 'dee'], 'token', ('calendar',), window=window)",
+    "    totals[path] = {login: profile['calendar']['totalContributions'] for login, profile in profiles.items()}",
+    "breaker = http_client.breaker_for(base.split('/')[2])",
+    "closed = not breaker.is_open",
+    "github_graphql.ENDPOINT = base + '/busy'",
+    "try:",
+    "    github_graphql.request_graphql('token', 'query', {'l0': 'ada'})",
+    "except Exception as exc:",
+    "    busy = type(exc).__name__",
+    "print(json.dumps({",
+    "    'totals': totals,",
+    "    'sizes': sizes,",
+    "    'busy': busy,",
+    "    'closed_after_splits': closed,",
+    "    'breaker_open': breaker.is_open,",
+    "}))",
+  ]);
+
+  const totals = { ada: 3, bob: 3, cy: 2, dee: 3 };
+  assert.deepEqual(outcome.totals, { "/gateway": totals, "/slow": totals, "/flaky": totals });
+  assert.deepEqual(outcome.sizes["/gateway"], [4, 2, 2], "a batch answered with 504 is sent once, then split");
+  assert.deepEqual(outcome.sizes["/slow"], [4, 2, 2], "a batch that outlasts the client timeout is split");
+  assert.deepEqual(outcome.sizes["/flaky"], [4, 4], "a 503 is retried without splitting");
+  assert.deepEqual(outcome.sizes["/busy"], [1, 1, 1]);
+  assert.equal(outcome.busy, "RetryableError");
+  assert.equal(outcome.closed_after_splits, true, "timed-out batches do not count against the host");
+  assert.equal(outcome.breaker_open, true, "single-user failures still count against the host");
+});
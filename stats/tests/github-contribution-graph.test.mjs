@@ -1,6 +1,6 @@
 import assert from "node:assert/strict";
 import { execFileSync, spawnSync } from "node:child_process";
-import { mkdtempSync, readFileSync, writeFileSync } from "node:fs";
+import { mkdtempSync, readFileSync, statSync, writeFileSync } from "node:fs";
 import { tmpdir } from "node:os";
 import { join } from "node:path";
 import test from "node:test";
@@ -41,6 +41,210 @@ test("cutoff window includes the current UTC day before rollover", () => {
   assert.equal(window.to_datetime, "2026-06-13T23:50:00Z");
 });
 
+function contributionFixture(from, to, counts) {
+  const days = [];
+  for (let day = new Date(`${from}T00:00:00Z`); day <= new Date(`${to}T00:00:00Z`); day.setUTCDate(day.getUTCDate() + 1)) {
+    const date = day.toISOString().slice(0, 10);
+    days.push({ date, contribution_count: counts[date] ?? 1 });
+  }
+  return {
+    username: "ceilf6",
+    source: "fixture",
+    generated_at: `${to}T12:00:00Z`,
+    from,
+    to,
+    total_contributions: days.reduce((sum, day) => sum + day.contribution_count, 0),
+    weeks: [{ first_day: from, days }],
+  };
+}
+
+test("incremental window only re-fetches the tail of the existing data", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-contribution-incremental-"));
+  const output = join(dir, "contributions.json");
+  writeFileSync(output, JSON.stringify(contributionFixture("2025-06-13", "2026-06-12", {})));
+
+  const args = ["--print-window", "--output", output, "--now", "2026-06-13T23:50:00Z"];
+  const window = JSON.parse(runPython(fetchScript, [...args, "--incremental"]));
+  assert.equal(window.from_date, "2026-06-10");
+  assert.equal(window.from_datetime, "2026-06-10T00:00:00Z");
+  assert.equal(window.to_date, "2026-06-13");
+
+  writeFileSync(output, JSON.stringify({ ...contributionFixture("2025-06-13", "2026-06-12", {}), username: "other" }));
+  const fallback = JSON.parse(runPython(fetchScript, [...args, "--incremental"]));
+  assert.equal(fallback.from_date, "2025-06-14");
+});
+
+test("incremental merge overlays fresh days and rolls the window forward", () => {
+  const existing = contributionFixture("2025-06-13", "2026-06-12", { "2025-06-13": 9, "2026-06-11": 2 });
+  const fresh = contributionFixture("2026-06-10", "2026-06-13", { "2026-06-11": 5, "2026-06-13": 4 });
+  const harness = [
+    "import importlib.util, json, os, sys",
+    "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+    "spec = importlib.util.spec_from_file_location('contributions', sys.argv[1])",
+    "module = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(module)",
+    "existing, fresh = json.loads(sys.argv[2]), json.loads(sys.argv[3])",
+    "window = module.determine_window(module.parse_utc_datetime('2026-06-13T23:50:00Z'))",
+    "print(json.dumps(module.merge_contributions(existing, fresh, window)))",
+  ].join("\n");
+  const merged = JSON.parse(
+    execFileSync("python3", ["-c", harness, fetchScript.pathname, JSON.stringify(existing), JSON.stringify(fresh)], {
+      cwd: repoRoot,
+      encoding: "utf8",
+    }),
+  );
+  const days = merged.weeks.flatMap((week) => week.days);
+
+  assert.equal(merged.from, "2025-06-14");
+  assert.equal(merged.to, "2026-06-13");
+  assert.equal(days.length, 365);
+  assert.equal(days[0].date, "2025-06-14");
+  assert.equal(days.at(-1).contribution_count, 4);
+  assert.equal(days.find((day) => day.date === "2026-06-11").contribution_count, 5);
+  assert.equal(merged.total_contributions, 363 + 5 + 4);
+  assert.equal(merged.weeks[0].first_day, "2025-06-14");
+  assert.ok(merged.weeks.slice(1).every((week) => new Date(`${week.first_day}T00:00:00Z`).getUTCDay() === 0));
+});
+
+test("incremental runs keep the layout of the existing file unless --format is given", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-contribution-layout-"));
+  const existing = contributionFixture("2025-06-13", "2026-06-12", {});
+  const fresh = contributionFixture("2026-06-10", "2026-06-13", { "2026-06-13": 4 });
+  const harness = [
+    "import importlib.util, json, os, sys",
+    "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+    "spec = importlib.util.spec_from_file_location('contributions', sys.argv[1])",
+    "module = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(module)",
+    "existing, fresh, dir = json.loads(sys.argv[2]), json.loads(sys.argv[3]), sys.argv[4]",
+    "module.fetch_calendar = lambda *args: fresh",
+    "layouts = {}",
+    "for fmt, flags in [('columnar', []), ('binary', []), ('binary', ['--format', 'weeks'])]:",
+    "    output = os.path.join(dir, f'{fmt}-{len(flags)}.json')",
+    "    module.contribution_store.write(output, existing, fmt)",
+    "    sys.argv = ['fetch', '--incremental', '--output', output, '--now', '2026-06-13T23:50:00Z', *flags]",
+    "    assert module.main() == 0",
+    "    data = module.contribution_store.load(output)",
+    "    layouts[f'{fmt}-{len(flags)}'] = [module.contribution_store.stored_format(output), data['to'], data['total_contributions']]",
+    "print(json.dumps(layouts))",
+  ].join("\n");
+  const output = execFileSync(
+    "python3",
+    ["-c", harness, fetchScript.pathname, JSON.stringify(existing), JSON.stringify(fresh), dir],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+  const layouts = JSON.parse(output.trim().split("\n").pop());
+
+  assert.deepEqual(layouts, {
+    "columnar-0": ["columnar", "2026-06-13", 368],
+    "binary-0": ["binary", "2026-06-13", 368],
+    "binary-2": ["weeks", "2026-06-13", 368],
+  });
+});
+
+test("public page parser streams the recorded calendar into ordered weeks", () => {
+  const page = new URL("../StatRequest/GitHub/contributions/response.html", import.meta.url);
+  const harness = [
+    "import importlib.util, json, os, re, sys",
+    "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+    "spec = importlib.util.spec_from_file_location('contributions', sys.argv[1])",
+    "module = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(module)",
+    "content = open(sys.argv[2], encoding='utf-8').read()",
+    "window = {'from_date': '2025-08-23', 'to_date': '2026-08-22'}",
+    "chunked = module.parse_contributions_page((content[i:i + 7] for i in range(0, len(content), 7)), window)",
+    "tooltips = re.findall(r'<tool-tip\\b.*?</tool-tip>', content)",
+    "detached = re.sub(r'<tool-tip\\b.*?</tool-tip>', '', content).replace('</table>', '</table>' + ''.join(tooltips))",
+    "print(json.dumps({'chunked': chunked, 'whole': module.parse_contributions_page([content], window), 'detached': module.parse_contributions_page([detached], window)}))",
+  ].join("\n");
+  const result = JSON.parse(
+    execFileSync("python3", ["-c", harness, fetchScript.pathname, page.pathname], { cwd: repoRoot, encoding: "utf8" }),
+  );
+  const [weeks, total] = result.chunked;
+  const days = weeks.flatMap((week) => week.days);
+
+  assert.deepEqual(result.whole, result.chunked);
+  assert.deepEqual(result.detached, result.chunked);
+  assert.equal(total, 1444);
+  assert.equal(days.length, 365);
+  assert.equal(days.reduce((sum, day) => sum + day.contribution_count, 0), 1444);
+  assert.deepEqual(
+    days.map((day) => day.date),
+    days.map((day) => day.date).toSorted(),
+  );
+  assert.equal(days[0].date, "2025-08-23");
+  assert.equal(weeks[0].first_day, "2025-08-17");
+  assert.ok(weeks.every((week) => new Date(`${week.first_day}T00:00:00Z`).getUTCDay() === 0));
+});
+
+test("backfill fetches year windows concurrently and resumes from checkpoints", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-contribution-backfill-"));
+  const harness = [
+    "import importlib.util, json, os, sys, threading, time",
+    "from datetime import date, timedelta",
+    "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+    "spec = importlib.util.spec_from_file_location('contributions', sys.argv[1])",
+    "module = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(module)",
+    "window = module.determine_window(module.parse_utc_datetime('2026-06-13T23:50:00Z'))",
+    "calls, active, peak, lock = [], [0], [0], threading.Lock()",
+    "def fetch(year_window, fail=None):",
+    "    with lock:",
+    "        calls.append(year_window['from_date'])",
+    "        active[0] += 1",
+    "        peak[0] = max(peak[0], active[0])",
+    "    time.sleep(0.05)",
+    "    with lock:",
+    "        active[0] -= 1",
+    "    if year_window['from_date'][:4] == fail:",
+    "        raise RuntimeError('upstream timeout')",
+    "    start = date.fromisoformat(year_window['from_date'])",
+    "    days = (date.fromisoformat(year_window['to_date']) - start).days + 1",
+    "    weeks = [{'first_day': start.isoformat(), 'days': [{'date': (start + timedelta(days=i)).isoformat(), 'contribution_count': 1} for i in range(days)]}]",
+    "    return {'username': 'ceilf6', 'source': 'fixture', 'generated_at': year_window['to_datetime'], 'weeks': weeks}",
+    "start = date(2022, 3, 5)",
+    "try:",
+    "    module.backfill_history('ceilf6', start, window, lambda w: fetch(w, fail='2024'), sys.argv[2], workers=2)",
+    "    error = None",
+    "except RuntimeError as exc:",
+    "    error = str(exc)",
+    "first_calls, first_peak = sorted(calls), peak[0]",
+    "calls.clear()",
+    "merged = module.backfill_history('ceilf6', start, window, fetch, sys.argv[2], workers=2)",
+    "days = [day for week in merged['weeks'] for day in week['days']]",
+    "print(json.dumps({'error': error, 'first_calls': first_calls, 'first_peak': first_peak, 'second_calls': calls, 'from': merged['from'], 'to': merged['to'], 'total': merged['total_contributions'], 'days': len(days), 'first': days[0]['date'], 'last': days[-1]['date']}))",
+  ].join("\n");
+  const result = JSON.parse(
+    execFileSync("python3", ["-c", harness, fetchScript.pathname, dir], { cwd: repoRoot, encoding: "utf8" }).trim().split("\n").at(-1),
+  );
+
+  assert.match(result.error, /2024-01-01\.\.2024-12-31: upstream timeout/);
+  assert.deepEqual(result.first_calls, ["2022-03-05", "2023-01-01", "2024-01-01", "2025-01-01", "2026-01-01"]);
+  assert.equal(result.first_peak, 2);
+  assert.deepEqual(result.second_calls, ["2024-01-01"]);
+  assert.equal(result.from, "2022-03-05");
+  assert.equal(result.to, "2026-06-13");
+  assert.equal(result.first, "2022-03-05");
+  assert.equal(result.last, "2026-06-13");
+  assert.equal(result.days, 1562);
+  assert.equal(result.total, 1562);
+});
+
+test("backfill rejects a --since after the last day of the window", () => {
+  const result = spawnSync(
+    "python3",
+    [fetchScript.pathname, "--backfill", "--print-window", "--since", "2026-06-14", "--now", "2026-06-13T23:50:00Z"],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+
+  assert.equal(result.status, 2);
+  assert.match(result.stderr, /--since 2026-06-14 is after the last day of the window \(2026-06-13\)/);
+  assert.doesNotMatch(result.stderr, /Traceback/);
+
+  const lastDay = runPython(fetchScript, ["--backfill", "--print-window", "--since", "2026-06-13", "--now", "2026-06-13T23:50:00Z"]);
+  assert.deepEqual(JSON.parse(lastDay).map((window) => [window.from_date, window.to_date]), [["2026-06-13", "2026-06-13"]]);
+});
+
 test("fetcher requires GH_PROFILE_TOKEN unless public fallback is explicit", () => {
   const dir = mkdtempSync(join(tmpdir(), "github-contribution-fetch-missing-token-"));
   const output = join(dir, "contributions.json");
@@ -136,6 +340,141 @@ test("generator renders a Tokyo Night SVG from contribution data", () => {
   assert.doesNotMatch(compactSvg, />15<\/text>/);
 });
 
+test("generator renders columnar and binary contribution data identically", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-contribution-columnar-"));
+  const weeksInput = join(dir, "weeks.json");
+  writeFileSync(weeksInput, JSON.stringify(contributionFixture("2025-06-14", "2026-06-13", { "2026-06-11": 15 })));
+  const harness = [
+    "import os, sys",
+    "sys.path.insert(0, sys.argv[1])",
+    "import contribution_store",
+    "data = contribution_store.load(sys.argv[2])",
+    "for fmt in ('columnar', 'binary'):",
+    "    contribution_store.write(os.path.join(sys.argv[3], fmt + '.json'), data, fmt)",
+  ].join("\n");
+  execFileSync("python3", ["-c", harness, new URL("../scripts/", import.meta.url).pathname, weeksInput, dir], {
+    cwd: repoRoot,
+  });
+
+  const columnar = JSON.parse(readFileSync(join(dir, "columnar.json"), "utf8"));
+  assert.equal(columnar.start, "2025-06-14");
+  assert.equal(columnar.counts.length, 365);
+  assert.equal(columnar.counts[362], 15);
+  assert.equal(columnar.weeks, undefined);
+  assert.equal(readFileSync(join(dir, "binary.counts")).length, 365 * 4);
+
+  const svgs = ["weeks", "columnar", "binary"].map((name) => {
+    const output = join(dir, `${name}.svg`);
+    runPython(graphScript, ["--input", join(dir, `${name}.json`), "--output", output]);
+    return readFileSync(output, "utf8");
+  });
+  assert.match(svgs[0], />15<\/text>/);
+  assert.equal(svgs[1], svgs[0]);
+  assert.equal(svgs[2], svgs[0]);
+});
+
+test("day grid lays out every day once with batched levels", () => {
+  const harness = [
+    "import importlib.util, json, os, sys",
+    "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+    "spec = importlib.util.spec_from_file_location('graph', sys.argv[1])",
+    "module = importlib.util.module_from_spec(spec)",
+    "spec.loader.exec_module(module)",
+    "data = {'start': '2016-01-01', 'counts': [(day * 7) % 23 for day in range(3653)]}",
+    "recent, full = module.build_day_grid(data), module.build_day_grid(data, limit=None)",
+    "mismatched = [cell for cell in full['cells'] if module.LEVEL_COLORS[cell[4]] != module.color_for_count(cell[3], full['max_count'])]",
+    "print(json.dumps({'recent': [recent['week_count'], recent['cells'][-1]], 'full': [full['week_count'], len(full['cells']), full['cells'][0], full['max_count'], full['active_days']], 'mismatched': len(mismatched)}))",
+  ].join("\n");
+  const result = JSON.parse(
+    execFileSync("python3", ["-c", harness, graphScript.pathname], { cwd: repoRoot, encoding: "utf8" }),
+  );
+
+  assert.deepEqual(result.recent, [53, [52, 3, "2025-12-31", 11, 4]]);
+  assert.deepEqual(result.full, [523, 3653, [0, 5, "2016-01-01", 0, 0], 22, 3494]);
+  assert.equal(result.mismatched, 0);
+});
+
+test("generator renders every layout from a config file", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-contribution-layouts-"));
+  const input = join(dir, "contributions.json");
+  const config = join(dir, "layouts.json");
+  writeFileSync(input, JSON.stringify(contributionFixture("2024-06-14", "2026-06-13", { "2026-06-11": 15 })));
+  writeFileSync(
+    config,
+    JSON.stringify({
+      layouts: [
+        { name: "readme", base: "main", output: join(dir, "main.svg") },
+        { name: "hero", base: "compact", output: join(dir, "hero.svg"), cell: 14, gap: 4 },
+        { name: "all-time", base: "compact", output: join(dir, "all.svg"), weeks: null },
+      ],
+    }),
+  );
+
+  runPython(graphScript, ["--input", input, "--layouts", config]);
+  const reference = join(dir, "reference.svg");
+  runPython(graphScript, ["--input", input, "--output", reference]);
+
+  assert.equal(readFileSync(join(dir, "main.svg"), "utf8"), readFileSync(reference, "utf8"));
+  const widthOf = (name) => Number(readFileSync(join(dir, name), "utf8").match(/width="(\d+)"/)[1]);
+  assert.equal(widthOf("hero.svg"), 53 * 14 + 52 * 4 + 48);
+  assert.equal(widthOf("all.svg"), 105 * 10 + 104 * 2 + 48);
+
+  writeFileSync(config, JSON.stringify({ layouts: [{ output: join(dir, "bad.svg"), radius: 3 }] }));
+  const result = spawnSync("python3", [graphScript.pathname, "--input", input, "--layouts", config], {
+    cwd: repoRoot,
+    encoding: "utf8",
+  });
+  assert.notEqual(result.status, 0);
+  assert.match(result.stderr, /unknown keys radius/);
+});
+
+test("optimized emit mode shares cell shapes and styles and reports the savings", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-contribution-optimized-"));
+  const input = join(dir, "contributions.json");
+  const output = join(dir, "graph.svg");
+  writeFileSync(input, JSON.stringify(contributionFixture("2025-06-14", "2026-06-13", { "2026-06-11": 150 })));
+
+  const stdout = runPython(graphScript, ["--input", input, "--output", output, "--optimize"]);
+  const svg = readFileSync(output, "utf8");
+  const compactSvg = readFileSync(join(dir, "graph-compact.svg"), "utf8");
+
+  assert.match(stdout, /graph\.svg \([\d,]+ bytes; [\d,]+ unoptimized, \d+\.\dx smaller\)/);
+  assert.match(svg, /width="1020" height="184"/);
+  assert.match(svg, /<rect id="c4" width="16" height="16" rx="2" fill="#bf91f3"\/>/);
+  assert.match(svg, /\.g text\{font-size:8px;font-weight:800;fill:#1a1b27;pointer-events:none;text-anchor:middle\}/);
+  assert.match(svg, /<text x="[\d.]+" y="[\d.]+" class="s1">150<\/text>/);
+  assert.equal(svg.match(/<use href="#c\d"/g).length, 365);
+  assert.doesNotMatch(svg, /contributions on/);
+  assert.doesNotMatch(svg, /style="font-size: 8px/);
+  assert.doesNotMatch(compactSvg, /<text x="[\d.]+" y="[\d.]+">/);
+  assert.doesNotMatch(compactSvg, /\.g text/);
+});
+
+test("generator skips outputs whose data and layout are unchanged", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-contribution-render-cache-"));
+  const input = join(dir, "contributions.json");
+  const output = join(dir, "graph.svg");
+  const manifest = join(dir, "render-manifest.json");
+  const args = ["--input", input, "--output", output, "--manifest", manifest];
+  const data = contributionFixture("2025-06-14", "2026-06-13", { "2026-06-11": 3 });
+  writeFileSync(input, JSON.stringify(data));
+
+  assert.match(runPython(graphScript, args), /written to .*graph\.svg/);
+  const renderedAt = statSync(output).mtimeMs;
+
+  writeFileSync(input, JSON.stringify({ ...data, generated_at: "2026-06-14T00:10:00Z" }));
+  const skipped = runPython(graphScript, args);
+  assert.match(skipped, /unchanged, skipped .*graph\.svg/);
+  assert.match(skipped, /unchanged, skipped .*graph-compact\.svg/);
+  assert.equal(statSync(output).mtimeMs, renderedAt);
+
+  assert.match(runPython(graphScript, [...args, "--optimize"]), /written to .*graph\.svg/);
+  assert.match(runPython(graphScript, [...args, "--optimize", "--force"]), /written to .*graph\.svg/);
+
+  writeFileSync(input, JSON.stringify(contributionFixture("2025-06-14", "2026-06-13", { "2026-06-11": 4 })));
+  assert.match(runPython(graphScript, [...args, "--optimize"]), /written to .*graph\.svg/);
+});
+
 test("generator rejects empty contribution data", () => {
   const dir = mkdtempSync(join(tmpdir(), "github-contribution-graph-empty-"));
   const input = join(dir, "contributions.json");
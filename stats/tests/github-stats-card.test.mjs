@@ -94,6 +94,19 @@ test("generator rejects malformed or incompatible cards without publishing outpu
         '    <g transform="translate(220,20)"><path id="github-mark" /></g><rect id="after-badge" />',
       ),
     ],
+    [
+      "duplicate right-side group",
+      validUpstreamCard.replace(
+        '    <g transform="translate(30,20)">',
+        '    <g transform="translate(220,20)" />\n    <g transform="translate(30,20)">',
+      ),
+    ],
+    [
+      "field label outside the label group",
+      validUpstreamCard
+        .replace('      <text x="21" y="89.6">Total Issues:</text>\n', "")
+        .replace("    <g transform=\"translate(220,20)\">", '    <text>Total Issues:</text>\n    <g transform="translate(220,20)">'),
+    ],
     ["malformed XML", "<svg>"],
   ];
 
@@ -121,6 +134,134 @@ test("generator rejects malformed or incompatible cards without publishing outpu
   }
 });
 
+test("graphql source renders the card locally from profile stats across star pages", () => {
+  const dir = mkdtempSync(join(tmpdir(), "github-stats-card-graphql-"));
+  const tape = join(dir, "graphql.json");
+  const output = join(dir, "stats.svg");
+  // Cassette keys carry a digest of the query and variables, which include this year's start.
+  const keys = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import json, sys",
+        "sys.path.insert(0, sys.argv[1])",
+        "import cassette, github_graphql as g",
+        "post = lambda cursors=None: {'query': g.build_query(['ceilf6'], ('stats',), cursors),",
+        "                             'variables': g.build_variables(['ceilf6'], ('stats',), cursors=cursors)}",
+        "bodies = [post(), post(['cursor-1'])]",
+        "print(json.dumps([cassette.request_key('POST', g.ENDPOINT, body=body) for body in bodies]))",
+      ].join("\n"),
+      new URL("../scripts/", import.meta.url).pathname,
+    ],
+    { encoding: "utf8" },
+  );
+  const [statsKey, starsKey] = JSON.parse(keys.stdout);
+  const reply = (request, data) => ({
+    request,
+    status: 200,
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ data: { u0: data } }),
+  });
+  writeFileSync(
+    tape,
+    JSON.stringify({
+      version: 2,
+      interactions: [
+        reply(statsKey, {
+          login: "ceilf6",
+          year: { totalCommitContributions: 12000, restrictedContributionsCount: 400 },
+          pullRequests: { totalCount: 1234 },
+          issues: { totalCount: 593 },
+          repositoriesContributedTo: { totalCount: 129 },
+          repositories: {
+            nodes: [{ stargazerCount: 1000 }, { stargazerCount: 200 }],
+            pageInfo: { hasNextPage: true, endCursor: "cursor-1" },
+          },
+        }),
+        reply(starsKey, {
+          repositories: { nodes: [{ stargazerCount: 300 }], pageInfo: { hasNextPage: false, endCursor: null } },
+        }),
+      ],
+    }),
+  );
+
+  const result = spawnSync("python3", [script.pathname, "--source", "graphql", "--output", output], {
+    cwd: repoRoot,
+    encoding: "utf8",
+    env: { ...process.env, GH_PROFILE_TOKEN: "token", STATS_HTTP_MODE: "replay", STATS_HTTP_CASSETTE: tape },
+  });
+
+  assert.equal(result.status, 0, result.stderr);
+  const svg = readFileSync(output, "utf8");
+  assert.match(svg, /width="340" height="200" viewBox="0 0 340 200"/);
+  assert.match(svg, /style="font-size: 18px; fill: #70a5fd;">ceilf6's Github Stats<\/text>/);
+  const rows = [...svg.matchAll(/>([^<]+:)<\/text><text x="130" y="14"[^>]*>([^<]+)</g)].map((match) => match.slice(1));
+  assert.deepEqual(rows, [
+    ["Total Stars:", "1.5k"],
+    [`${currentYear} Commits:`, "12.4k"],
+    ["Total PRs:", "1.2k"],
+    ["Total Issues:", "593"],
+    ["Contributed to:", "129"],
+  ]);
+  assert.match(svg, /<g transform="translate\(220,60\)"><circle cx="48" cy="48" r="40"[^>]*\/><text [^>]*>S<\/text><\/g>/);
+  assert.doesNotMatch(svg, /github-mark/);
+  // The repo octicon on "Contributed to:" draws its hole in the outline's direction.
+  const paths = svg.match(/<path [^>]*>/g);
+  assert.equal(paths.length, 5);
+  assert.ok(paths.every((path) => path.includes('fill-rule="evenodd"')));
+
+  const missingToken = spawnSync("python3", [script.pathname, "--source", "graphql", "--output", join(dir, "none.svg")], {
+    cwd: repoRoot,
+    encoding: "utf8",
+    env: { ...process.env, GH_PROFILE_TOKEN: "" },
+  });
+  assert.equal(missingToken.status, 1);
+  assert.match(missingToken.stderr, /GH_PROFILE_TOKEN is required/);
+  assert.equal(existsSync(join(dir, "none.svg")), false);
+});
+
+test("commits label follows the render time across a year boundary", () => {
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import importlib.util, json, sys",
+        "from datetime import datetime, timezone",
+        "spec = importlib.util.spec_from_file_location('stats_card', sys.argv[1])",
+        "card = importlib.util.module_from_spec(spec)",
+        "sys.path.insert(0, sys.argv[1].rsplit('/', 1)[0])",
+        "spec.loader.exec_module(card)",
+        "eve = datetime(2026, 12, 31, 23, 59, tzinfo=timezone.utc)",
+        "new_year = datetime(2027, 1, 1, 0, 1, tzinfo=timezone.utc)",
+        "stats = {'stars': 1, 'commits': 2, 'prs': 3, 'issues': 4, 'contributed_to': 5}",
+        "upstream = sys.stdin.read()",
+        "def rewrite(source, now):",
+        "    try:",
+        "        return 'Commits:' in card.render_card(source.encode(), now=now)",
+        "    except ValueError as exc:",
+        "        return str(exc)",
+        "print(json.dumps({",
+        "    'local': [card.render_local_card(stats, now=now).count(f'>{now.year} Commits:<') for now in (eve, new_year)],",
+        "    'spec_reused': card.stats_card(eve) is card.stats_card(datetime(2026, 1, 1, tzinfo=timezone.utc)),",
+        "    'upstream': [rewrite(upstream.replace('YEAR', '2026'), eve), rewrite(upstream.replace('YEAR', '2026'), new_year),",
+        "                 rewrite(upstream.replace('YEAR', '2027'), new_year)],",
+        "}))",
+      ].join("\n"),
+      script.pathname,
+    ],
+    { cwd: repoRoot, encoding: "utf8", input: validUpstreamCard.replace(`${currentYear} Commits:`, "YEAR Commits:") },
+  );
+
+  assert.equal(result.status, 0, result.stderr);
+  assert.deepEqual(JSON.parse(result.stdout), {
+    local: [1, 1],
+    spec_reused: true,
+    upstream: [true, "Upstream card field labels do not match the expected stats layout", true],
+  });
+});
+
 test("README and Update Stats workflow use the repository-owned stats card", () => {
   const readme = readFileSync(new URL("../../README.md", import.meta.url), "utf8");
   const workflow = readFileSync(
@@ -132,7 +273,11 @@ test("README and Update Stats workflow use the repository-owned stats card", ()
   assert.match(readme, /src="\.\/assets\/github-stats-card\.svg"/);
   assert.match(
     workflow,
-    /- name: Fetch GitHub stats card\n\s+id: fetch-github\n\s+continue-on-error: true\n\s+run: python stats\/scripts\/fetch-github-stats-card\.py/,
+    /- name: Fetch stats\n\s+id: fetch-stats\n\s+continue-on-error: true\n\s+run: python stats\/scripts\/fetch-all-stats\.py/,
+  );
+  assert.match(
+    readFileSync(new URL("../scripts/fetch-all-stats.py", import.meta.url), "utf8"),
+    /"fetch-github-stats-card\.py"/,
   );
   assert.equal(existsSync(generatedCard), true);
   const svg = readFileSync(generatedCard, "utf8");
@@ -2,7 +2,7 @@ import assert from "node:assert/strict";
 import { spawnSync } from "node:child_process";
 import { existsSync, mkdtempSync, readFileSync, writeFileSync } from "node:fs";
 import { tmpdir } from "node:os";
-import { join } from "node:path";
+import { dirname, join } from "node:path";
 import test from "node:test";
 
 const repoRoot = new URL("../../", import.meta.url);
@@ -39,6 +39,8 @@ test("fetcher writes the five required Hugging Face overview totals and update t
     validOverview,
   );
   assert.match(stats.last_updated, /^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$/);
+  const history = readFileSync(join(dirname(output), "history", "huggingface.jsonl"), "utf8");
+  assert.match(history, /^\{"at":"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z","numFollowers":12,"numLikes":34,"numModels":5,"numDatasets":6,"numSpaces":7\}\n$/);
 });
 
 test("fetcher rejects malformed, incomplete, and invalid totals without replacing output", () => {
@@ -58,13 +60,73 @@ test("fetcher rejects malformed, incomplete, and invalid totals without replacin
   assert.equal(existsSync(output), false);
 });
 
+test("fetcher skips parsing and rewriting but records history when the upstream answers 304", () => {
+  const dir = mkdtempSync(join(tmpdir(), "huggingface-conditional-"));
+  const output = join(dir, "stats.json");
+  const cache = join(dir, "validators.json");
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import json, os, subprocess, sys, threading",
+        "from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer",
+        "script, output, cache, body = sys.argv[1:5]",
+        "conditional = []",
+        "class Handler(BaseHTTPRequestHandler):",
+        "    def log_message(self, *args): pass",
+        "    def do_GET(self):",
+        "        conditional.append(self.headers.get('If-None-Match'))",
+        "        if self.headers.get('If-None-Match') == '\"v1\"':",
+        "            self.send_response(304); self.end_headers(); return",
+        "        self.send_response(200)",
+        "        self.send_header('ETag', '\"v1\"')",
+        "        self.send_header('Content-Length', str(len(body)))",
+        "        self.end_headers()",
+        "        self.wfile.write(body.encode())",
+        "server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)",
+        "threading.Thread(target=server.serve_forever, daemon=True).start()",
+        "url = f'http://127.0.0.1:{server.server_port}/overview'",
+        "run = lambda: subprocess.run([sys.executable, script, '--url', url, '--output', output, '--cache', cache], capture_output=True, text=True, check=True).stdout",
+        "first = run()",
+        "os.utime(output, (0, 0))",
+        "second = run()",
+        "print(json.dumps({'first': first, 'second': second, 'conditional': conditional, 'mtime': os.stat(output).st_mtime}))",
+      ].join("\n"),
+      fetchScript.pathname,
+      output,
+      cache,
+      JSON.stringify(validOverview),
+    ],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+
+  assert.equal(result.status, 0, result.stderr);
+  const outcome = JSON.parse(result.stdout.trim().split("\n").pop());
+  assert.deepEqual(outcome.conditional, [null, '"v1"']);
+  assert.match(outcome.first, /Hugging Face stats written/);
+  assert.match(outcome.second, /not modified/);
+  assert.equal(outcome.mtime, 0, "a 304 must leave the output file untouched");
+  assert.deepEqual(Object.values(JSON.parse(readFileSync(cache, "utf8"))), [{ ETag: '"v1"' }]);
+  const history = readFileSync(join(dir, "history", "huggingface.jsonl"), "utf8").trim().split("\n");
+  assert.equal(history.length, 2, "a 304 is a successful fetch and still records a sample");
+  assert.deepEqual(
+    history.map((line) => {
+      const { at, ...totals } = JSON.parse(line);
+      return totals;
+    }),
+    [validOverview, validOverview],
+  );
+});
+
 test("renderer creates the 340×200 card with five totals and an embedded mark", () => {
   const result = spawnSync(
     "python3",
     [
       "-c",
       [
-        "import importlib.util, json, sys",
+        "import importlib.util, json, os, sys",
+        "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
         "spec = importlib.util.spec_from_file_location('cards', sys.argv[1])",
         "cards = importlib.util.module_from_spec(spec)",
         "spec.loader.exec_module(cards)",
@@ -108,7 +170,8 @@ test("all profile card renderers use 18px titles", () => {
     [
       "-c",
       [
-        "import importlib.util, sys",
+        "import importlib.util, os, sys",
+        "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
         "spec = importlib.util.spec_from_file_location('cards', sys.argv[1])",
         "cards = importlib.util.module_from_spec(spec)",
         "spec.loader.exec_module(cards)",
@@ -130,6 +193,42 @@ test("all profile card renderers use 18px titles", () => {
   }
 });
 
+test("card engine compiles a declarative spec once per theme and fills values per render", () => {
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import json, sys",
+        "sys.path.insert(0, sys.argv[1])",
+        "import card_templates",
+        "spec = {'title': 'Forum <beta>', 'rows': (('posts', 'Posts:', 'repo'), ('karma', 'Karma:', 'star'))}",
+        "light = {'name': 'light', 'background': '#ffffff', 'title': '#2f80ed', 'text': '#434d58', 'icon': '#4c71f2'}",
+        "template = card_templates.compile_card(spec, light)",
+        "print(json.dumps({",
+        "    'cached': card_templates.compile_card(spec, light) is template,",
+        "    'other_theme': card_templates.compile_card(spec) is not template,",
+        "    'first': template.render({'posts': 3, 'karma': 1500}),",
+        "    'second': template.render({'posts': 4}),",
+        "}))",
+      ].join("\n"),
+      new URL("../scripts/", import.meta.url).pathname,
+    ],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+
+  assert.equal(result.status, 0, result.stderr);
+  const outcome = JSON.parse(result.stdout);
+  assert.equal(outcome.cached, true);
+  assert.equal(outcome.other_theme, true);
+  assert.match(outcome.first, /<text x="30" y="40" style="font-size: 18px; fill: #2f80ed;">Forum &lt;beta&gt;</);
+  assert.match(outcome.first, /<g transform="translate\(0,25\.2\)"><path fill="#4c71f2" fill-rule="evenodd" d="M8 \.25/);
+  assert.match(outcome.first, /fill: #434d58; font-size: 14px;">Karma:<\/text><text x="100" y="14" style="fill: #434d58; font-size: 14px;">1\.5k</);
+  assert.match(outcome.second, />4<\/text><\/g><g transform="translate\(0,25\.2\)">/);
+  assert.match(outcome.second, /">0<\/text><\/g><\/g>/);
+  assert.doesNotMatch(outcome.first, /\{\}/);
+});
+
 test("generated profile card assets use 18px titles", () => {
   for (const [file, title] of [
     ["../../assets/blog-card.svg", "Blog"],
@@ -144,6 +243,19 @@ test("generated profile card assets use 18px titles", () => {
   }
 });
 
+test("blog and vlog icons fill even-odd so the repo octicon keeps its hole", () => {
+  for (const [file, rows] of [
+    ["../../assets/blog-card.svg", 5],
+    ["../../assets/vlog-card.svg", 4],
+  ]) {
+    const svg = readFileSync(new URL(file, import.meta.url), "utf8");
+    const rowPaths = svg.match(/<g transform="translate\(0,[\d.]+\)"><path [^>]*>/g);
+    assert.equal(rowPaths.length, rows, file);
+    assert.ok(rowPaths.every((path) => path.includes('fill-rule="evenodd"')), file);
+    assert.match(svg, /<g transform="translate\(2\d\d,\d+\) scale\([\d.]+\)" fill-rule="evenodd">/, file);
+  }
+});
+
 test("README and daily workflow publish the ordered two-by-two card layout", () => {
   const readme = readFileSync(new URL("../../README.md", import.meta.url), "utf8");
   const workflow = readFileSync(
@@ -178,7 +290,11 @@ test("README and daily workflow publish the ordered two-by-two card layout", ()
   );
   assert.match(
     workflow,
-    /- name: Fetch Hugging Face stats\n\s+id: fetch-huggingface\n\s+continue-on-error: true\n\s+run: python stats\/scripts\/fetch-huggingface-stats\.py/,
+    /- name: Fetch stats\n\s+id: fetch-stats\n\s+continue-on-error: true\n\s+run: python stats\/scripts\/fetch-all-stats\.py/,
+  );
+  assert.match(
+    readFileSync(new URL("../scripts/fetch-all-stats.py", import.meta.url), "utf8"),
+    /"fetch-huggingface-stats\.py"/,
   );
   assert.equal(existsSync(generatedCard), true);
 });
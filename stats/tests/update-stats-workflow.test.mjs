@@ -1,35 +1,49 @@
 import assert from "node:assert/strict";
+import { spawnSync } from "node:child_process";
 import { readFileSync } from "node:fs";
 import test from "node:test";
 
+const repoRoot = new URL("../../", import.meta.url);
+const orchestratorScript = new URL("../scripts/fetch-all-stats.py", import.meta.url);
+
 const workflow = readFileSync(
   new URL("../../.github/workflows/update-stats-schedule.yml", import.meta.url),
   "utf8",
 );
 
 test("stats sources continue independently and report failures after publishing", () => {
-  const fetchSteps = [
-    ["Fetch Bilibili stats", "fetch-bilibili", "python stats/scripts/fetch-bilibili-stats-1.py"],
-    ["Fetch CSDN stats", "fetch-csdn", "python stats/scripts/fetch-csdn-stats-2.py"],
-    ["Fetch GitHub stats card", "fetch-github", "python stats/scripts/fetch-github-stats-card.py"],
-    ["Fetch Hugging Face stats", "fetch-huggingface", "python stats/scripts/fetch-huggingface-stats.py"],
+  const orchestrator = readFileSync(
+    new URL("../scripts/fetch-all-stats.py", import.meta.url),
+    "utf8",
+  );
+  const sources = [
+    ["bilibili", "fetch-bilibili-stats-1.py"],
+    ["csdn", "fetch-csdn-stats-2.py"],
+    ["github", "fetch-github-stats-card.py"],
+    ["huggingface", "fetch-huggingface-stats.py"],
   ];
 
-  for (const [name, id, command] of fetchSteps) {
-    assert.match(
-      workflow,
-      new RegExp(
-        `- name: ${name}\\n\\s+id: ${id}\\n\\s+continue-on-error: true\\n\\s+run: ${command.replaceAll(".", "\\.")}`,
-      ),
-      `${name} must allow the remaining sources to run`,
+  assert.match(
+    workflow,
+    /- name: Fetch stats\n\s+id: fetch-stats\n\s+continue-on-error: true\n\s+run: python stats\/scripts\/fetch-all-stats\.py/,
+    "the concurrent fetch step must allow publishing to continue",
+  );
+  for (const [name, script] of sources) {
+    assert.ok(
+      orchestrator.includes(`"${name}": ("${script}"`),
+      `${script} must be registered with the orchestrator as ${name}`,
     );
     const outcomeLine =
-      `${id.toUpperCase().replaceAll("-", "_")}_OUTCOME: ` +
-      "${{ steps." +
-      id +
-      ".outcome }}";
+      `FETCH_${name.toUpperCase()}_OUTCOME: ` +
+      "${{ steps.fetch-stats.outputs." +
+      name +
+      " }}";
     assert.ok(workflow.includes(outcomeLine), `${name} outcome must be included in the final report`);
   }
+  assert.ok(
+    workflow.includes("FETCH_STATS_OUTCOME: ${{ steps.fetch-stats.outcome }}"),
+    "an orchestrator crash must still be reported",
+  );
 
   const publishIndex = workflow.indexOf("- name: Commit and push if changed");
   const reportIndex = workflow.indexOf("- name: Report fetch failures");
@@ -38,3 +52,57 @@ test("stats sources continue independently and report failures after publishing"
   assert.match(workflow.slice(reportIndex), /if: always\(\)/);
   assert.match(workflow.slice(reportIndex), /exit 1/);
 });
+
+test("orchestrator overlaps endpoints and isolates a failing source", () => {
+  const result = spawnSync(
+    "python3",
+    [
+      "-c",
+      [
+        "import importlib.util, json, os, sys, time",
+        "sys.path.insert(0, os.path.dirname(sys.argv[1]))",
+        "spec = importlib.util.spec_from_file_location('orchestrator', sys.argv[1])",
+        "orchestrator = importlib.util.module_from_spec(spec)",
+        "spec.loader.exec_module(orchestrator)",
+        "published = []",
+        "slow = lambda: time.sleep(0.4) or 1",
+        "def broken(): raise RuntimeError('upstream down')",
+        "def regressed(results): sys.exit(1)",
+        "jobs = [",
+        "  {'name': 'a', 'endpoints': {'x': slow, 'y': slow, 'z': slow}, 'publish': published.append},",
+        "  {'name': 'b', 'endpoints': {'x': slow}, 'publish': published.append},",
+        "  {'name': 'c', 'endpoints': {'x': slow, 'y': broken}, 'publish': published.append},",
+        "  {'name': 'd', 'endpoints': {'x': slow}, 'publish': regressed},",
+        "]",
+        "started = time.monotonic()",
+        "outcomes = orchestrator.run_sources(jobs, workers=8)",
+        "print(json.dumps({'outcomes': outcomes, 'published': published, 'elapsed': time.monotonic() - started}))",
+      ].join("\n"),
+      orchestratorScript.pathname,
+    ],
+    { cwd: repoRoot, encoding: "utf8" },
+  );
+
+  assert.equal(result.status, 0, result.stderr);
+  const { outcomes, published, elapsed } = JSON.parse(result.stdout.trim().split("\n").pop());
+  assert.deepEqual(outcomes, { a: "success", b: "success", c: "failure", d: "failure" });
+  assert.deepEqual(
+    published.map((results) => Object.keys(results).sort().join(",")).sort(),
+    ["x", "x,y,z"],
+  );
+  assert.ok(elapsed < 1.2, `six 0.4s endpoints must overlap, took ${elapsed}s`);
+});
+
+test("live-site sync runs only when a pushed commit changed a card", () => {
+  for (const name of ["update-stats-schedule.yml", "update-github-contribution-graph.yml"]) {
+    const source = readFileSync(new URL(`../../.github/workflows/${name}`, import.meta.url), "utf8");
+    const commitStep = source.slice(source.indexOf("- name: Commit and push if changed"), source.indexOf("- name: Sync"));
+    assert.match(commitStep, /git diff --staged --quiet -- assets\//, `${name} must detect staged card changes`);
+    assert.ok(
+      commitStep.indexOf("-- assets/") < commitStep.indexOf("git commit"),
+      `${name} must check the cards before committing clears the index`,
+    );
+    assert.match(commitStep, /echo "cards=\$\{cards_changed:-false\}" >> "\$GITHUB_OUTPUT"/);
+    assert.match(source, /- name: Sync fresh cards to live site\n\s+if: steps\.commit\.outputs\.cards == 'true'/);
+  }
+});